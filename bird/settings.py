@@ -223,7 +223,45 @@ CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = 'django-db'
 
 # ==========================================
-# 11. MISC & LIMITS
+# 11. TIMELINES (FAN-OUT)
+# ==========================================
+TIMELINE_MAX_LENGTH = int(os.getenv('TIMELINE_MAX_LENGTH', '800'))  # IDs guardados por usuário
+TIMELINE_CELEBRITY_THRESHOLD = int(os.getenv('TIMELINE_CELEBRITY_THRESHOLD', '10000'))  # Acima disso: fan-out-on-read
+TIMELINE_FANOUT_BATCH = 1000  # Timelines por pipeline do Redis
+
+# ==========================================
+# 12. CONTADORES (LIKES / COMENTÁRIOS / SHARES)
+# ==========================================
+BIRD_COUNTER_HOT_THRESHOLD = int(os.getenv('BIRD_COUNTER_HOT_THRESHOLD', '30'))  # Eventos/min para bufferizar no Redis
+
+CELERY_BEAT_SCHEDULE = {
+    'flush-bird-counters': {
+        'task': 'core.tasks.flush_bird_counters',
+        'schedule': 10.0,  # segundos
+    },
+    'drain-tas-outbox': {
+        'task': 'core.tasks.drain_tas_outbox',
+        'schedule': 5.0,  # segundos
+    },
+}
+
+# ==========================================
+# 13. TAS ENGINE (RECOMENDAÇÃO / BUSCA)
+# ==========================================
+TAS_BASE_URL = os.getenv('TAS_BASE_URL', 'http://tas-engine:8000')  # Rede interna do Docker
+TAS_DEADLINE = float(os.getenv('TAS_DEADLINE', '0.8'))  # Orçamento total por chamada (s)
+TAS_HEDGE_AFTER = float(os.getenv('TAS_HEDGE_AFTER', '0.25'))  # Dispara 2ª tentativa após (s)
+TAS_BREAKER_FAILURES = int(os.getenv('TAS_BREAKER_FAILURES', '5'))  # Falhas seguidas para abrir
+TAS_BREAKER_RESET = float(os.getenv('TAS_BREAKER_RESET', '30'))  # Tempo aberto antes da sonda (s)
+REC_CACHE_FRESH_TTL = int(os.getenv('REC_CACHE_FRESH_TTL', '30'))  # Recomendação servida sem revalidar (s)
+REC_CACHE_STALE_TTL = int(os.getenv('REC_CACHE_STALE_TTL', '600'))  # Servida velha + refresh em background (s)
+TAS_OUTBOX_BATCH_SIZE = int(os.getenv('TAS_OUTBOX_BATCH_SIZE', '200'))  # Birds por POST de ingestão
+TAS_OUTBOX_TIMEOUT = float(os.getenv('TAS_OUTBOX_TIMEOUT', '10'))  # Prazo do POST em lote (s)
+TAS_OUTBOX_MAX_ATTEMPTS = int(os.getenv('TAS_OUTBOX_MAX_ATTEMPTS', '10'))  # Depois disso: status 'failed'
+TAS_OUTBOX_BACKOFF_BASE = int(os.getenv('TAS_OUTBOX_BACKOFF_BASE', '5'))  # 5s, 10s, 20s... (teto 1h)
+
+# ==========================================
+# 14. MISC & LIMITS
 # ==========================================
 LANGUAGE_CODE = 'pt-br'
 TIME_ZONE = 'America/Sao_Paulo'
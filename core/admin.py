@@ -1,9 +1,10 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
 from .models import (
     Profile, WorkExperience, Education, SocialBond, Connection,
     Bird, Notification, Community, CommunityMember, Evento, 
-    Room, Message, SavedPost, Comment
+    Room, Message, SavedPost, Comment, TasOutbox
 )
 
 # ==========================================
@@ -141,5 +142,19 @@ class EventoAdmin(admin.ModelAdmin):
     list_display = ('titulo', 'data_inicio', 'local', 'criador')
     search_fields = ('titulo', 'local')
 
+# ==========================================
+# 📤 OUTBOX DO TAS (INGESTÃO)
+# ==========================================
+@admin.register(TasOutbox)
+class TasOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'bird_id', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('bird_id',)
+    actions = ['retry_now']
+
+    @admin.action(description='🔁 Reenviar agora')
+    def retry_now(self, request, queryset):
+        queryset.update(status=TasOutbox.Status.PENDING, attempts=0, next_attempt_at=timezone.now())
+
 # Registro de modelos simples remanescentes
 admin.site.register(SavedPost)
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Contadores denormalizados do Bird (likes, comentários, compartilhamentos).
+
+Posts comuns atualizam a coluna direto com UPDATE ... = col + 1.
+Posts "quentes" (mais de BIRD_COUNTER_HOT_THRESHOLD eventos no minuto) acumulam
+o delta em um hash no Redis; a task `flush_bird_counters` aplica tudo em lote,
+evitando que milhares de likes disputem o lock da mesma linha.
+"""
+import logging
+import time
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from core.models import Bird, Comment
+from core.redis_client import get_redis
+
+logger = logging.getLogger('django')
+
+COUNTER_FIELDS = ('like_count', 'comment_count', 'share_count')
+DIRTY_KEY = 'counters:dirty'
+
+
+def pending_key(bird_id):
+    return f'counters:pending:{bird_id}'
+
+
+def _rate_key(bird_id):
+    return f'counters:rate:{bird_id}:{int(time.time() // 60)}'
+
+
+def bump(bird_id, field, delta=1):
+    """Soma `delta` ao contador `field` do Bird."""
+    try:
+        r = get_redis()
+        pipe = r.pipeline(transaction=False)
+        pipe.incr(_rate_key(bird_id))
+        pipe.expire(_rate_key(bird_id), 120)
+        rate, _ = pipe.execute()
+
+        if rate > settings.BIRD_COUNTER_HOT_THRESHOLD:
+            pipe = r.pipeline(transaction=False)
+            pipe.hincrby(pending_key(bird_id), field, delta)
+            pipe.sadd(DIRTY_KEY, bird_id)
+            pipe.execute()
+            return
+    except redis.RedisError as e:
+        logger.warning(f"Contadores Redis offline ({e}). Gravando direto no banco.")
+
+    Bird.objects.filter(id=bird_id).update(**{field: F(field) + delta})
+
+
+def get_pending(bird_ids):
+    """Deltas ainda não descarregados: {bird_id: {campo: delta}}."""
+    if not bird_ids:
+        return {}
+    try:
+        r = get_redis()
+        pipe = r.pipeline(transaction=False)
+        for bird_id in bird_ids:
+            pipe.hgetall(pending_key(bird_id))
+        results = pipe.execute()
+    except redis.RedisError:
+        return {}
+    return {
+        bird_id: {field: int(delta) for field, delta in pending.items()}
+        for bird_id, pending in zip(bird_ids, results) if pending
+    }
+
+
+def apply_pending(birds):
+    """Soma os deltas pendentes aos objetos já carregados (apenas em memória)."""
+    pending = get_pending([b.id for b in birds])
+    for bird in birds:
+        for field, delta in pending.get(bird.id, {}).items():
+            setattr(bird, field, getattr(bird, field) + delta)
+    return birds
+
+
+def _drain(r, bird_id):
+    """Lê e zera o hash de um Bird atomicamente."""
+    pipe = r.pipeline(transaction=True)
+    pipe.hgetall(pending_key(bird_id))
+    pipe.delete(pending_key(bird_id))
+    pending, _ = pipe.execute()
+    return {field: int(delta) for field, delta in pending.items()}
+
+
+def flush_pending(batch_size=500):
+    """
+    Descarrega os deltas do Redis no banco: um UPDATE com CASE por lote.
+    Retorna quantos Birds foram atualizados.
+    """
+    r = get_redis()
+    flushed = 0
+
+    while True:
+        bird_ids = [int(b) for b in r.spop(DIRTY_KEY, batch_size) or []]
+        if not bird_ids:
+            break
+
+        deltas = {bird_id: _drain(r, bird_id) for bird_id in bird_ids}
+        deltas = {bird_id: d for bird_id, d in deltas.items() if d}
+        if not deltas:
+            continue
+
+        updates = {}
+        for field in COUNTER_FIELDS:
+            whens = [When(id=bird_id, then=Value(d[field])) for bird_id, d in deltas.items() if d.get(field)]
+            if whens:
+                updates[field] = F(field) + Case(*whens, default=Value(0), output_field=IntegerField())
+
+        try:
+            with transaction.atomic():
+                Bird.objects.filter(id__in=list(deltas)).update(**updates)
+        except Exception:
+            # Devolve os deltas ao Redis para a próxima rodada
+            pipe = r.pipeline(transaction=False)
+            for bird_id, d in deltas.items():
+                for field, delta in d.items():
+                    pipe.hincrby(pending_key(bird_id), field, delta)
+                pipe.sadd(DIRTY_KEY, bird_id)
+            pipe.execute()
+            raise
+
+        flushed += len(deltas)
+
+    return flushed
+
+
+def rebuild_counts(queryset):
+    """
+    Recalcula like_count/comment_count a partir da tabela M2M de likes e de Comment.
+    Um único UPDATE com subqueries correlacionadas por lote de Birds.
+    share_count não tem tabela de origem e é preservado.
+    """
+    likes = (
+        Bird.likes.through.objects.filter(bird_id=OuterRef('pk'))
+        .order_by().values('bird_id').annotate(c=Count('*')).values('c')
+    )
+    comments = (
+        Comment.objects.filter(post_id=OuterRef('pk'))
+        .order_by().values('post_id').annotate(c=Count('*')).values('c')
+    )
+    return queryset.update(
+        like_count=Coalesce(Subquery(likes), 0),
+        comment_count=Coalesce(Subquery(comments), 0),
+    )
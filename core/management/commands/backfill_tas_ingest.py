@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from core.models import Bird
+from core.outbox import backfill, drain
+
+
+class Command(BaseCommand):
+    help = "Enfileira no outbox do TAS um intervalo de Birds para (re)ingestão."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-id', type=int, help="Primeiro ID do intervalo (inclusive).")
+        parser.add_argument('--end-id', type=int, help="Último ID do intervalo (inclusive).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--drain', action='store_true', help="Envia na hora em vez de esperar o Celery Beat.")
+
+    def handle(self, *args, **options):
+        bounds = Bird.objects.aggregate(lo=Min('id'), hi=Max('id'))
+        if bounds['lo'] is None:
+            self.stdout.write("Nenhum Bird encontrado.")
+            return
+
+        start = options['start_id'] or bounds['lo']
+        end = options['end_id'] or bounds['hi']
+        queued = backfill(start, end, batch_size=options['batch_size'])
+        self.stdout.write(f"📥 {queued} Birds ({start}-{end}) enfileirados no outbox.")
+
+        if options['drain']:
+            total = 0
+            while True:
+                sent = drain()
+                total += sent
+                if not sent:
+                    break
+            self.stdout.write(self.style.SUCCESS(f"✅ {total} Birds entregues ao TAS."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from core.counters import flush_pending, rebuild_counts
+from core.models import Bird
+
+
+class Command(BaseCommand):
+    help = "Recalcula like_count/comment_count dos Birds a partir de likes e Comment."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-id', type=int, help="Primeiro ID do intervalo (inclusive).")
+        parser.add_argument('--end-id', type=int, help="Último ID do intervalo (inclusive).")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        # Aplica o que ainda está no Redis antes de sobrescrever as colunas
+        try:
+            flush_pending()
+        except Exception as e:
+            self.stderr.write(f"⚠️ Não foi possível descarregar o Redis ({e}). Seguindo só com o banco.")
+
+        bounds = Bird.objects.aggregate(lo=Min('id'), hi=Max('id'))
+        if bounds['lo'] is None:
+            self.stdout.write("Nenhum Bird encontrado.")
+            return
+
+        start = options['start_id'] or bounds['lo']
+        end = options['end_id'] or bounds['hi']
+        batch = options['batch_size']
+
+        total = 0
+        for lo in range(start, end + 1, batch):
+            hi = min(lo + batch - 1, end)
+            total += rebuild_counts(Bird.objects.filter(id__gte=lo, id__lte=hi))
+            self.stdout.write(f"  Birds {lo}-{hi} recalculados")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} Birds com contadores reconstruídos."))
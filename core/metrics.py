@@ -0,0 +1,71 @@
+"""
+Métricas em processo (contadores, gauges e percentis de latência).
+
+Cada processo (Daphne, worker Celery) mantém os seus números; o endpoint
+`/internal/metrics/` expõe o snapshot do processo que atendeu a requisição.
+"""
+import threading
+from collections import defaultdict, deque
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_gauges = {}
+_latencies = {}
+
+LATENCY_WINDOW = 2048  # Últimas N amostras por série
+
+
+def incr(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def set_gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name, millis):
+    """Registra uma amostra de latência (ms) na janela deslizante da série."""
+    with _lock:
+        window = _latencies.get(name)
+        if window is None:
+            window = _latencies[name] = deque(maxlen=LATENCY_WINDOW)
+        window.append(millis)
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+def percentile(name, pct):
+    with _lock:
+        samples = sorted(_latencies.get(name, ()))
+    return _percentile(samples, pct)
+
+
+def ratio(hits_name, misses_name):
+    with _lock:
+        hits, misses = _counters[hits_name], _counters[misses_name]
+    total = hits + misses
+    return round(hits / total, 4) if total else None
+
+
+def snapshot():
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        series = {name: sorted(window) for name, window in _latencies.items()}
+    latencies = {
+        name: {
+            'count': len(samples),
+            'p50': _percentile(samples, 50),
+            'p90': _percentile(samples, 90),
+            'p99': _percentile(samples, 99),
+        }
+        for name, samples in series.items()
+    }
+    return {'counters': counters, 'gauges': gauges, 'latency_ms': latencies}
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 02:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_bird_options_alter_comment_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bird',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='bird_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bird',
+            index=models.Index(fields=['visibility', '-created_at', '-id'], name='bird_visibility_created_idx'),
+        ),
+    ]
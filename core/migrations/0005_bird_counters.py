@@ -0,0 +1,48 @@
+# Generated by Django 5.2.9 on 2026-10-18 02:31
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Bird = apps.get_model('core', 'Bird')
+    Comment = apps.get_model('core', 'Comment')
+    likes = (
+        Bird.likes.through.objects.filter(bird_id=OuterRef('pk'))
+        .order_by().values('bird_id').annotate(c=Count('*')).values('c')
+    )
+    comments = (
+        Comment.objects.filter(post_id=OuterRef('pk'))
+        .order_by().values('post_id').annotate(c=Count('*')).values('c')
+    )
+    Bird.objects.update(
+        like_count=Coalesce(Subquery(likes), 0),
+        comment_count=Coalesce(Subquery(comments), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_bird_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bird',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bird',
+            name='like_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bird',
+            name='share_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
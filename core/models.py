@@ -194,8 +194,18 @@ class Bird(models.Model):
     
     likes = models.ManyToManyField(User, related_name='liked_birds', blank=True)
 
+    # Contadores denormalizados (ver core/counters.py). Recalcular: manage.py rebuild_bird_counters
+    like_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)
+    share_count = models.IntegerField(default=0)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Paginação keyset (created_at, id): perfil e feed pública
+            models.Index(fields=['author', '-created_at', '-id'], name='bird_author_created_idx'),
+            models.Index(fields=['visibility', '-created_at', '-id'], name='bird_visibility_created_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         # Auto-detecta tipo de post
@@ -322,6 +332,51 @@ class Notification(models.Model):
     class Meta:
         ordering = ['-created_at']
 
+# ========================================================
+# 📤 OUTBOX (INGESTÃO NO TAS)
+# ========================================================
+class TasOutbox(models.Model):
+    """
+    Fila transacional de ingestão no TAS. A linha nasce na mesma transação do Bird
+    e a task `drain_tas_outbox` envia em lote, com retry e backoff.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pendente'
+        SENT = 'sent', 'Enviado'
+        FAILED = 'failed', 'Falhou'
+
+    bird_id = models.BigIntegerField(db_index=True)  # Sem FK: o envio sobrevive ao delete do post
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"Outbox #{self.id} (Bird {self.bird_id}, {self.status})"
+
+    @classmethod
+    def payload_for(cls, bird):
+        return {
+            "content_id": str(bird.id),
+            "text": bird.content or "",
+            "author_id": str(bird.author_id),
+            "tags": [bird.post_type],
+            "metadata": {
+                "author": bird.author.username,
+                "type": bird.post_type,
+                "premium": bird.author.profile.is_premium,
+            },
+        }
+
 # ========================================================
 # ⚡ SIGNALS (PERFIL AUTOMÁTICO)
 # ========================================================
@@ -0,0 +1,160 @@
+"""
+Outbox transacional da ingestão no TAS.
+
+O post_save do Bird só grava uma linha em TasOutbox (mesma transação do post),
+então o create_bird não depende mais da saúde do TAS. A task periódica
+`drain_tas_outbox` reserva as linhas pendentes e as envia em lote para
+/events/ingest fora da transação; falhas (inclusive itens ausentes da
+resposta) voltam para a fila com backoff exponencial até TAS_OUTBOX_MAX_ATTEMPTS.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core import metrics
+from core.models import Bird, TasOutbox
+from core.tas_client import tas_client
+
+logger = logging.getLogger('django')
+
+INGEST_PATH = '/api/v1/events/ingest'
+
+
+def should_ingest(bird):
+    """
+    Só o que qualquer usuário pode ver vira candidato de recomendação/busca no TAS:
+    posts públicos e que não são stories (privados e só-amigos nunca saem do Bird).
+    """
+    if bird.visibility != Bird.Visibility.PUBLIC or bird.post_type == Bird.PostType.STORY:
+        return False
+    return bool(bird.content) or bird.post_type in (Bird.PostType.IMAGE, Bird.PostType.VIDEO)
+
+
+def enqueue_bird(bird):
+    return TasOutbox.objects.create(bird_id=bird.id, payload=TasOutbox.payload_for(bird))
+
+
+def _backoff(attempts):
+    seconds = min(settings.TAS_OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), 3600)
+    return timezone.now() + timedelta(seconds=seconds)
+
+
+def _mark_failed(rows, error):
+    for row in rows:
+        row.attempts += 1
+        row.last_error = error[:1000]
+        if row.attempts >= settings.TAS_OUTBOX_MAX_ATTEMPTS:
+            row.status = TasOutbox.Status.FAILED
+            logger.error(f"Outbox: Bird {row.bird_id} desistido após {row.attempts} tentativas ({error}).")
+        else:
+            row.next_attempt_at = _backoff(row.attempts)
+    TasOutbox.objects.bulk_update(rows, ['attempts', 'last_error', 'status', 'next_attempt_at'])
+    metrics.incr('tas_outbox.failed', len(rows))
+
+
+def _mark_sent(rows):
+    now = timezone.now()
+    for row in rows:
+        row.status = TasOutbox.Status.SENT
+        row.sent_at = now
+        row.last_error = ''
+    TasOutbox.objects.bulk_update(rows, ['status', 'sent_at', 'last_error'])
+    metrics.incr('tas_outbox.sent', len(rows))
+
+
+def _claim(batch_size):
+    """
+    Reserva um lote: dentro da transação curta do select_for_update, empurra o
+    next_attempt_at das linhas para depois do prazo do envio e confirma. Os outros
+    workers deixam de vê-las, e o POST acontece sem lock aberto. Se este worker morrer
+    no meio, a reserva vence e as linhas voltam para a fila sozinhas.
+    """
+    lease = timezone.now() + timedelta(seconds=settings.TAS_OUTBOX_TIMEOUT * 3)
+    with transaction.atomic():
+        # skip_locked: vários workers drenam sem pegar as mesmas linhas (Postgres)
+        rows = list(
+            TasOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=TasOutbox.Status.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by('id')[:batch_size]
+        )
+        for row in rows:
+            row.next_attempt_at = lease
+        TasOutbox.objects.bulk_update(rows, ['next_attempt_at'])
+    return rows
+
+
+def drain(batch_size=None, max_batches=20):
+    """
+    Envia até `max_batches` lotes de linhas pendentes vencidas.
+    Retorna quantas linhas foram entregues ao TAS.
+    """
+    batch_size = batch_size or settings.TAS_OUTBOX_BATCH_SIZE
+    delivered = 0
+
+    for _ in range(max_batches):
+        rows = _claim(batch_size)
+        if not rows:
+            break
+
+        response = tas_client.request(
+            'POST', INGEST_PATH,
+            json=[row.payload for row in rows],
+            deadline=settings.TAS_OUTBOX_TIMEOUT,
+        )
+        try:
+            # Resposta por item: {"results": [{"content_id": "...", "status": "ok" | "error", ...}]}
+            results = None if response is None else {
+                str(item.get('content_id')): item
+                for item in (response.json() or {}).get('results', [])
+            }
+        except ValueError:
+            results = None
+        if results is None:
+            _mark_failed(rows, "TAS indisponível ou lote rejeitado")
+            break  # Não insiste enquanto o TAS estiver fora
+
+        ok, failed = [], {}
+        for row in rows:
+            item = results.get(str(row.bird_id))
+            if item is None:
+                # Ausente da resposta também é falha: volta para a fila em vez de sumir
+                failed.setdefault('item ausente na resposta do TAS', []).append(row)
+            elif item.get('status') == 'ok':
+                ok.append(row)
+            else:
+                failed.setdefault(str(item.get('error', 'erro no item')), []).append(row)
+        if ok:
+            _mark_sent(ok)
+        for error, failed_rows in failed.items():
+            _mark_failed(failed_rows, error)
+        delivered += len(ok)
+
+        if len(rows) < batch_size:
+            break
+
+    return delivered
+
+
+def backfill(start_id, end_id, batch_size=1000):
+    """Enfileira novamente todos os Birds ingeríveis no intervalo [start_id, end_id]."""
+    queued = 0
+    queryset = (
+        Bird.objects.filter(id__gte=start_id, id__lte=end_id)
+        .select_related('author', 'author__profile')
+        .order_by('id')
+    )
+    batch = []
+    for bird in queryset.iterator(chunk_size=batch_size):
+        if should_ingest(bird):
+            batch.append(TasOutbox(bird_id=bird.id, payload=TasOutbox.payload_for(bird)))
+        if len(batch) >= batch_size:
+            TasOutbox.objects.bulk_create(batch)
+            queued += len(batch)
+            batch = []
+    if batch:
+        TasOutbox.objects.bulk_create(batch)
+        queued += len(batch)
+    return queued
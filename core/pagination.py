@@ -0,0 +1,52 @@
+"""
+Paginação por cursor (keyset) sobre (created_at, id).
+
+Em vez de OFFSET, cada página pede "os próximos N depois deste post". O banco
+desce direto pelo índice, então a página 100 custa o mesmo que a página 1.
+O cursor é opaco para o frontend: `<microssegundos desde epoch>_<id>`.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+
+PAGE_SIZE = 20
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_cursor(created_at, bird_id):
+    micros = (created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros}_{bird_id}"
+
+
+def decode_cursor(cursor):
+    """Retorna (created_at, id) ou None se o cursor for inválido/ausente."""
+    if not cursor:
+        return None
+    try:
+        micros, bird_id = cursor.split('_', 1)
+        return _EPOCH + timedelta(microseconds=int(micros)), int(bird_id)
+    except (ValueError, OverflowError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, size=PAGE_SIZE):
+    """
+    Aplica a paginação keyset a um queryset de Bird.
+    Retorna (itens, próximo_cursor); próximo_cursor é None na última página.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    position = decode_cursor(cursor)
+    if position:
+        created_at, bird_id = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=bird_id)
+        )
+
+    # Busca um a mais para saber se existe próxima página sem um COUNT
+    items = list(queryset[:size + 1])
+    if len(items) <= size:
+        return items, None
+    items = items[:size]
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,100 @@
+"""
+Cache de recomendações por usuário/contexto entre o Django e o TAS.
+
+Guarda a lista ranqueada de IDs no Redis (`rec:<user_id>:<context>`) com a hora
+em que foi buscada:
+- até REC_CACHE_FRESH_TTL: devolve direto (hit)
+- até REC_CACHE_STALE_TTL: devolve o valor velho na hora e atualiza em segundo
+  plano (stale-while-revalidate)
+- depois disso a chave expira e a próxima leitura vai ao TAS (miss)
+
+Eventos do próprio usuário que mudam o que ele deve ver (seguir, bloquear,
+lista negra enviada ao TAS) apagam as entradas dele via `invalidate`.
+"""
+import asyncio
+import json
+import logging
+import time
+
+import redis
+from django.conf import settings
+
+from core import metrics
+from core.redis_client import get_async_redis, get_redis
+from core.tas_client import tas_client
+
+logger = logging.getLogger('django')
+
+CONTEXTS = ('YOURLIFE_FEED', 'STUDY', 'GLOBAL_SEARCH')
+
+# Referência forte às atualizações em segundo plano (evita coleta pelo GC)
+_background = set()
+
+
+def cache_key(user_id, context):
+    return f'rec:{user_id}:{context}'
+
+
+def _refresh_lock_key(user_id, context):
+    return f'rec:refresh:{user_id}:{context}'
+
+
+def _record(outcome):
+    metrics.incr(f'rec_cache.{outcome}')
+    if outcome in ('hits', 'stale_hits'):
+        metrics.incr('rec_cache.served_from_cache')
+    metrics.set_gauge('rec_cache.hit_ratio', metrics.ratio('rec_cache.served_from_cache', 'rec_cache.misses'))
+
+
+async def _fetch_and_store(r, user_id, context):
+    ids = await tas_client.arecommend(user_id, context)
+    if ids is None:
+        return None  # Falha do TAS não é cacheada
+    payload = json.dumps({'ids': ids, 'fetched_at': time.time()})
+    try:
+        await r.set(cache_key(user_id, context), payload, ex=settings.REC_CACHE_STALE_TTL)
+    except redis.RedisError as e:
+        logger.warning(f"Cache de recomendação offline ({e}).")
+    return ids
+
+
+async def _revalidate(r, user_id, context):
+    try:
+        # Só um processo atualiza cada chave por vez
+        if await r.set(_refresh_lock_key(user_id, context), 1, nx=True, ex=10):
+            await _fetch_and_store(r, user_id, context)
+    except redis.RedisError:
+        pass
+
+
+async def aget_recommendations(user_id, context='YOURLIFE_FEED'):
+    """IDs recomendados (int) para o usuário; lista vazia se o TAS estiver fora."""
+    r = get_async_redis()
+    try:
+        raw = await r.get(cache_key(user_id, context))
+    except redis.RedisError as e:
+        logger.warning(f"Cache de recomendação offline ({e}). Indo direto ao TAS.")
+        return await tas_client.arecommend(user_id, context) or []
+
+    if raw is None:
+        _record('misses')
+        return await _fetch_and_store(r, user_id, context) or []
+
+    entry = json.loads(raw)
+    if time.time() - entry['fetched_at'] > settings.REC_CACHE_FRESH_TTL:
+        _record('stale_hits')
+        task = asyncio.create_task(_revalidate(r, user_id, context))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+    else:
+        _record('hits')
+    return entry['ids']
+
+
+def invalidate(user_id):
+    """Apaga as recomendações em cache do usuário em todos os contextos."""
+    try:
+        get_redis().delete(*[cache_key(user_id, context) for context in CONTEXTS])
+        metrics.incr('rec_cache.invalidations')
+    except redis.RedisError as e:
+        logger.warning(f"Cache de recomendação offline ({e}). User {user_id} não invalidado.")
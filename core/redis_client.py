@@ -0,0 +1,42 @@
+import asyncio
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+# Pool único por processo (Daphne/Celery). Evita abrir um socket novo a cada request.
+_pool = None
+_async_clients = {}
+
+def get_redis():
+    """
+    Retorna um cliente Redis ligado ao pool compartilhado (settings.REDIS_URL).
+    A conexão é preguiçosa: nada é aberto até o primeiro comando.
+    """
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+            decode_responses=True,
+        )
+    return redis.Redis(connection_pool=_pool)
+
+
+def get_async_redis():
+    """
+    Cliente Redis assíncrono para views async (Daphne).
+    O pool do redis.asyncio fica preso ao event loop, então guardamos um por loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = redis.asyncio.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+            decode_responses=True,
+        )
+        _async_clients[loop] = client
+    return client
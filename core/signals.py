@@ -1,8 +1,13 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Profile, Bird
-import requests
+from .models import Profile, Bird, Connection
+from .outbox import enqueue_bird, should_ingest
+from .rec_cache import invalidate as invalidate_recommendations
+from .tasks import fan_out_bird, push_connections_to_tas, retract_bird
+from .timeline import backfill_follow, purge_follow
+import redis
 import logging
 
 logger = logging.getLogger('django')
@@ -11,7 +16,8 @@ logger = logging.getLogger('django')
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
-        Profile.objects.create(user=instance)
+        # core/models.py registra o mesmo receiver: o segundo não pode duplicar o perfil
+        Profile.objects.get_or_create(user=instance)
 
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
@@ -22,27 +28,90 @@ def save_user_profile(sender, instance, **kwargs):
 @receiver(post_save, sender=Bird)
 def ingest_into_tas(sender, instance, created, **kwargs):
     """
-    Envia automaticamente novos posts para o motor de IA (Container tas-engine).
+    Enfileira novos posts para o motor de IA (Container tas-engine).
     Isso alimenta a busca semântica e o sistema de recomendação.
+    A linha do outbox é gravada na mesma transação do Bird; o envio HTTP
+    acontece depois, em lote, na task drain_tas_outbox.
     """
-    if created and (instance.content or instance.post_type in ['image', 'video']):
-        payload = {
-            "content_id": instance.id,
-            "text": instance.content or "",
-            "metadata": {
-                "author": instance.author.username,
-                "type": instance.post_type,
-                "premium": instance.author.profile.is_premium
-            }
-        }
-        
-        # O endereço 'http://tas-engine:8000' é interno da rede Docker
-        tas_url = "http://tas-engine:8000/api/v1/events/ingest"
-        
+    if created and should_ingest(instance):
+        enqueue_bird(instance)
+
+# --- Signals de Timeline (Fan-out-on-write) ---
+@receiver(post_save, sender=Bird)
+def schedule_timeline_fan_out(sender, instance, created, **kwargs):
+    """Agenda o fan-out apenas após o commit, para o worker enxergar o Bird."""
+    if not created:
+        return
+
+    def enqueue():
+        try:
+            fan_out_bird.delay(instance.id)
+        except Exception as e:
+            logger.warning(f"Broker offline ({e}). Bird {instance.id} fora das timelines.")
+
+    transaction.on_commit(enqueue)
+
+@receiver(post_delete, sender=Bird)
+def schedule_timeline_retract(sender, instance, **kwargs):
+    """Bird apagado sai das timelines depois do commit (a leitura já ignora IDs órfãos)."""
+    bird_id, author_id = instance.id, instance.author_id
+
+    def enqueue():
+        try:
+            retract_bird.delay(bird_id, author_id)
+        except Exception as e:
+            logger.warning(f"Broker offline ({e}). Bird {bird_id} apagado continua nas timelines.")
+
+    transaction.on_commit(enqueue)
+
+def _enqueue_connections_push(user_id):
+    def enqueue():
         try:
-            # Timeout curto para não travar o save do Django se a IA estiver lenta
-            requests.post(tas_url, json=payload, timeout=2)
-        except requests.exceptions.RequestException:
-            # Falha silenciosa: Se a IA estiver offline, o post é salvo, mas não indexado agora.
-            # Em produção, isso iria para uma fila Celery.
-            logger.warning(f"TAS Engine offline. Bird {instance.id} not indexed.")
\ No newline at end of file
+            push_connections_to_tas.delay(user_id)
+        except Exception as e:
+            logger.warning(f"Broker offline ({e}). Conexões de {user_id} não enviadas ao TAS.")
+    transaction.on_commit(enqueue)
+
+# --- Signals do Cache de Recomendação (seguir / bloquear mudam o feed) ---
+# O Redis só é tocado depois do commit: um rollback não deixa timeline/cache
+# divergentes do banco, e a transação não fica presa esperando a rede.
+@receiver(post_save, sender=Connection)
+def invalidate_recommendations_on_follow(sender, instance, created, **kwargs):
+    follower_id = instance.follower_id
+    transaction.on_commit(lambda: invalidate_recommendations(follower_id))
+    _enqueue_connections_push(follower_id)
+
+@receiver(post_delete, sender=Connection)
+def invalidate_recommendations_on_unfollow(sender, instance, **kwargs):
+    follower_id = instance.follower_id
+    transaction.on_commit(lambda: invalidate_recommendations(follower_id))
+    _enqueue_connections_push(follower_id)
+
+@receiver(post_save, sender=Connection)
+def sync_timeline_on_follow(sender, instance, created, **kwargs):
+    connection_id, follower_id, target_id = instance.id, instance.follower_id, instance.target_id
+    blocked = instance.status == 'blocked'
+
+    def sync():
+        try:
+            if blocked:
+                purge_follow(follower_id, target_id)
+            elif created:
+                backfill_follow(follower_id, target_id)
+        except redis.RedisError as e:
+            logger.warning(f"Timeline Redis offline ({e}). Follow {connection_id} não sincronizado.")
+
+    transaction.on_commit(sync)
+
+@receiver(post_delete, sender=Connection)
+def sync_timeline_on_unfollow(sender, instance, **kwargs):
+    # O delete zera instance.id antes do commit: guarda os valores agora
+    connection_id, follower_id, target_id = instance.id, instance.follower_id, instance.target_id
+
+    def sync():
+        try:
+            purge_follow(follower_id, target_id)
+        except redis.RedisError as e:
+            logger.warning(f"Timeline Redis offline ({e}). Unfollow {connection_id} não sincronizado.")
+
+    transaction.on_commit(sync)
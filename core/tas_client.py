@@ -0,0 +1,335 @@
+"""
+Cliente compartilhado do TAS Engine (Thalamus / SARA / Accumbens).
+
+- Conexões keep-alive em pool (requests.Session no modo sync, httpx.AsyncClient no async)
+- Circuit breaker: após N falhas seguidas o TAS é pulado por TAS_BREAKER_RESET segundos,
+  e a home cai direto no fallback sem pagar o timeout
+- Orçamento de prazo (deadline) por chamada, com requisição "hedged" no modo async:
+  se a primeira tentativa não respondeu em TAS_HEDGE_AFTER, uma segunda é disparada
+  e vence quem chegar primeiro
+- Estado do circuito e percentis de latência em core.metrics
+
+Todas as chamadas devolvem None em caso de falha (falha silenciosa para o chamador).
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+from array import array
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from core import metrics
+
+logger = logging.getLogger('django')
+
+# Formatos binários do TAS (ver tas/app/core/wire.py); JSON continua aceito como fallback
+IDS_MEDIA_TYPE = 'application/x-bird-ids'          # int64 little-endian por item
+RANKED_MEDIA_TYPE = 'application/x-bird-ranked'    # int64 LE por item + float32 LE (score) por item
+ACCEPT_IDS = f'{IDS_MEDIA_TYPE}, application/json;q=0.5'
+
+
+def decode_ids(body, media_type, count=None):
+    """
+    (ids, scores) de uma resposta binária do TAS; scores é None no formato só de IDs.
+    Decodificação direta dos bytes (array do stdlib), sem JSON nem int() por item.
+    None se o corpo não tem exatamente o tamanho de `count` itens (resposta truncada).
+    """
+    width = 12 if media_type == RANKED_MEDIA_TYPE else 8
+    if count is None:
+        count, rest = divmod(len(body), width)
+        if rest:
+            return None
+    elif count < 0 or len(body) != width * count:
+        return None
+    ids = array('q')
+    ids.frombytes(body[:8 * count])
+    scores = None
+    if media_type == RANKED_MEDIA_TYPE:
+        scores = array('f')
+        scores.frombytes(body[8 * count:8 * count + 4 * count])
+    if sys.byteorder == 'big':
+        ids.byteswap()
+        if scores is not None:
+            scores.byteswap()
+    return ids.tolist(), scores.tolist() if scores is not None else None
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        metrics.set_gauge(f'{name}.circuit_state', self.CLOSED)
+
+    @property
+    def state(self):
+        return self._state
+
+    def _set_state(self, state):
+        if state != self._state:
+            logger.warning(f"[{self.name}] Circuito {self._state} -> {state}")
+            self._state = state
+            metrics.set_gauge(f'{self.name}.circuit_state', state)
+
+    def allow(self):
+        """True se a chamada pode seguir. No meio-aberto, só uma sonda por vez."""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(self.HALF_OPEN)
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def release(self):
+        """Chamada abandonada sem resultado: não conta como falha, mas libera a sonda."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+
+class TasClient:
+    def __init__(self, base_url, deadline, hedge_after, breaker, pool_size=20):
+        self.base_url = base_url.rstrip('/')
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.breaker = breaker
+        self.pool_size = pool_size
+        self._session = None
+        self._async_client = None
+        self._async_loop = None
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------
+    # Pools de conexão
+    # ----------------------------------------------------
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def async_client(self):
+        # O AsyncClient fica preso ao event loop que o criou (Daphne tem um só)
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            with self._lock:
+                old, old_loop = self._async_client, self._async_loop
+                self._async_client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    limits=httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size,
+                    ),
+                )
+                self._async_loop = loop
+            if old is not None:
+                self._close_async_client(old, old_loop)
+        return self._async_client
+
+    @staticmethod
+    def _close_async_client(client, loop):
+        """Fecha o pool antigo no loop dele; com o loop já fechado as conexões morreram junto."""
+        if loop.is_closed():
+            return
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        try:
+            loop.run_until_complete(client.aclose())
+        except RuntimeError as e:
+            logger.warning(f"TAS: pool async antigo não foi fechado ({e}).")
+
+    # ----------------------------------------------------
+    # Núcleo
+    # ----------------------------------------------------
+    def _observe(self, started, ok):
+        metrics.observe('tas.latency', (time.monotonic() - started) * 1000)
+        if ok:
+            self.breaker.record_success()
+        else:
+            metrics.incr('tas.failures')
+            self.breaker.record_failure()
+
+    def request(self, method, path, json=None, deadline=None, headers=None):
+        """Chamada síncrona com pool keep-alive e circuit breaker."""
+        if not self.breaker.allow():
+            metrics.incr('tas.short_circuited')
+            return None
+
+        metrics.incr('tas.requests')
+        started = time.monotonic()
+        try:
+            response = self.session().request(
+                method, f"{self.base_url}{path}",
+                json=json, headers=headers, timeout=deadline or self.deadline,
+            )
+        except requests.RequestException as e:
+            logger.warning(f"TAS Engine indisponível ({e}).")
+            self._observe(started, ok=False)
+            return None
+
+        self._observe(started, ok=response.status_code < 500)
+        return response if response.status_code < 400 else None
+
+    async def arequest(self, method, path, json=None, deadline=None, hedge=False, headers=None):
+        """
+        Chamada assíncrona com orçamento total `deadline`.
+        Com hedge=True (apenas para leituras idempotentes), dispara uma segunda
+        tentativa se a primeira não responder em `hedge_after`.
+        """
+        if not self.breaker.allow():
+            metrics.incr('tas.short_circuited')
+            return None
+
+        metrics.incr('tas.requests')
+        budget = deadline or self.deadline
+        started = time.monotonic()
+        client = self.async_client()
+
+        async def attempt():
+            remaining = max(budget - (time.monotonic() - started), 0.001)
+            response = await client.request(method, path, json=json, headers=headers, timeout=remaining)
+            if response.status_code >= 500:
+                response.raise_for_status()
+            return response
+
+        tasks = {asyncio.create_task(attempt())}
+        response = None
+        error = None
+        try:
+            if hedge and self.hedge_after < budget:
+                done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+                if not done:
+                    metrics.incr('tas.hedged')
+                    tasks.add(asyncio.create_task(attempt()))
+
+            while tasks and response is None:
+                remaining = budget - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                done, tasks = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        response = task.result()
+                        break
+                    error = task.exception()
+        except BaseException:
+            # Cancelado antes do resultado (ex.: o cliente do Django desistiu): sem isso a
+            # sonda do meio-aberto ficaria "em voo" para sempre e o circuito nunca fecharia
+            self.breaker.release()
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if response is None:
+            logger.warning(f"TAS Engine indisponível ({error or 'deadline estourado'}).")
+            self._observe(started, ok=False)
+            return None
+
+        self._observe(started, ok=True)
+        return response if response.status_code < 400 else None
+
+    # ----------------------------------------------------
+    # Endpoints
+    # ----------------------------------------------------
+    @staticmethod
+    def _parse_ids(response):
+        """Lista de IDs (int) ou None se o TAS falhou (para não cachear a falha)."""
+        if response is None:
+            return None
+        media_type = response.headers.get('content-type', '').split(';')[0].strip()
+        if media_type in (IDS_MEDIA_TYPE, RANKED_MEDIA_TYPE):
+            count = response.headers.get('x-item-count')
+            try:
+                decoded = decode_ids(response.content, media_type, int(count) if count else None)
+            except ValueError:
+                decoded = None
+            if decoded is None:
+                # Tratado como falha do TAS: nada é cacheado e a home usa o fallback
+                logger.warning(f"TAS: resposta binária inválida (X-Item-Count={count}, {len(response.content)} bytes).")
+                return None
+            return decoded[0]
+        # TAS sem suporte ao formato binário: JSON com IDs em string
+        try:
+            items = response.json().get('items', [])
+        except ValueError:
+            logger.warning("TAS: resposta JSON inválida.")
+            return None
+        # O TAS devolve IDs como string; descarta os que não são Birds (ex.: 'test_1')
+        return [int(i) for i in items if str(i).isdigit()]
+
+    def recommend(self, user_id, context='YOURLIFE_FEED'):
+        response = self.request(
+            'POST', '/api/v1/recommend/',
+            json={'user_id': str(user_id), 'context': context}, headers={'Accept': ACCEPT_IDS},
+        )
+        return self._parse_ids(response)
+
+    async def arecommend(self, user_id, context='YOURLIFE_FEED'):
+        response = await self.arequest(
+            'POST', '/api/v1/recommend/',
+            json={'user_id': str(user_id), 'context': context}, hedge=True, headers={'Accept': ACCEPT_IDS},
+        )
+        return self._parse_ids(response)
+
+
+    def track_impressions(self, user_id, bird_ids):
+        """Registra no TAS os Birds exibidos (o Accumbens deixa de recomendá-los como novos)."""
+        events = [
+            {'user_id': str(user_id), 'content_id': str(bird_id), 'event_type': 'impression'}
+            for bird_id in bird_ids
+        ]
+        return self.request('POST', '/api/v1/events/track', json=events) is not None
+
+    def update_profile(self, user_id, **fields):
+        """Envia listas de soberania (blacklisted_authors, followed_authors...) ao Thalamus."""
+        payload = {'user_id': str(user_id), **fields}
+        return self.request('POST', '/api/v1/user/update_profile', json=payload) is not None
+
+tas_client = TasClient(
+    base_url=settings.TAS_BASE_URL,
+    deadline=settings.TAS_DEADLINE,
+    hedge_after=settings.TAS_HEDGE_AFTER,
+    breaker=CircuitBreaker(
+        'tas',
+        failure_threshold=settings.TAS_BREAKER_FAILURES,
+        reset_timeout=settings.TAS_BREAKER_RESET,
+    ),
+)
@@ -2,7 +2,9 @@ import subprocess
 import os
 from celery import shared_task
 from django.conf import settings
-from .models import Bird
+from .models import Bird, Connection
+from . import counters, outbox, rec_cache, timeline
+from .tas_client import tas_client
 
 @shared_task
 def process_video_upload(bird_id):
@@ -69,4 +71,59 @@ def process_video_upload(bird_id):
             bird.is_processing = False
             bird.save()
         except:
-            pass
\ No newline at end of file
+            pass
+
+@shared_task(ignore_result=True)
+def fan_out_bird(bird_id):
+    """
+    Fan-out-on-write: empurra o novo Bird para as timelines dos seguidores.
+    Roda fora do request para o create_bird não pagar o custo da audiência.
+    """
+    try:
+        bird = Bird.objects.get(id=bird_id)
+    except Bird.DoesNotExist:
+        return 0
+    return timeline.fan_out_bird(bird)
+
+@shared_task(ignore_result=True)
+def retract_bird(bird_id, author_id):
+    """Tira das timelines um Bird apagado (o inverso do fan_out_bird)."""
+    return timeline.retract_bird(bird_id, author_id)
+
+@shared_task(ignore_result=True)
+def flush_bird_counters():
+    """
+    Periódica (Celery Beat): aplica no banco os likes/comentários/shares
+    acumulados no Redis pelos posts quentes.
+    """
+    return counters.flush_pending()
+
+@shared_task(bind=True, ignore_result=True, max_retries=5)
+def push_connections_to_tas(self, user_id):
+    """
+    Sincroniza com o Thalamus (user/update_profile) quem o usuário bloqueou e quem
+    ele segue (fonte "seguidos" da geração de candidatos), e invalida as
+    recomendações em cache, que podem conter os bloqueados.
+    """
+    connections = Connection.objects.filter(follower_id=user_id).values_list('target_id', 'status')
+    blocked = [str(uid) for uid, status in connections if status == 'blocked']
+    followed = [str(uid) for uid, status in connections if status != 'blocked']
+    if not tas_client.update_profile(user_id, blacklisted_authors=blocked, followed_authors=followed):
+        raise self.retry(countdown=2 ** self.request.retries * 10)
+    rec_cache.invalidate(user_id)
+
+@shared_task(ignore_result=True)
+def track_impressions(user_id, bird_ids):
+    """
+    Avisa o TAS dos Birds que a home de fato renderizou para o usuário.
+    Falha silenciosa: perder uma impressão só faz o item poder reaparecer.
+    """
+    if bird_ids:
+        tas_client.track_impressions(user_id, bird_ids)
+
+@shared_task(ignore_result=True)
+def drain_tas_outbox():
+    """
+    Periódica (Celery Beat): envia ao TAS, em lote, os Birds pendentes no outbox.
+    """
+    return outbox.drain()
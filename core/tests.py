@@ -0,0 +1,325 @@
+import importlib.util
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipUnless
+
+import fakeredis
+import httpx
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import counters, outbox, timeline
+from core.models import Bird, Connection, SocialBond, TasOutbox
+from core.pagination import decode_cursor, encode_cursor, keyset_page
+from core.tas_client import IDS_MEDIA_TYPE, RANKED_MEDIA_TYPE, TasClient, decode_ids
+
+
+class HomeRecommendationVisibilityTests(TestCase):
+    def setUp(self):
+        self.viewer = User.objects.create_user('viewer', password='pw')
+        self.stranger = User.objects.create_user('stranger', password='pw')
+        self.friend = User.objects.create_user('friend', password='pw')
+        SocialBond.objects.create(requester=self.viewer, target=self.friend, status=SocialBond.Status.ACTIVE)
+        self.client.force_login(self.viewer)
+
+    def _render_with_recommendations(self, birds):
+        async def recommendations(user_id, context='YOURLIFE_FEED'):
+            return [b.id for b in birds]
+
+        with mock.patch('core.views.feed.aget_recommendations', recommendations), \
+                mock.patch('core.views.feed.read_timeline', return_value=[]), \
+                mock.patch('core.views.feed.track_impressions'):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        return {b.id for b in response.context['birds']}
+
+    def test_private_bird_returned_by_tas_is_not_rendered(self):
+        private = Bird.objects.create(author=self.stranger, content='segredo', visibility=Bird.Visibility.PRIVATE)
+        public = Bird.objects.create(author=self.stranger, content='aberto')
+
+        rendered = self._render_with_recommendations([private, public])
+
+        self.assertEqual(rendered, {public.id})
+
+    def test_home_renders_when_the_broker_is_down(self):
+        public = Bird.objects.create(author=self.stranger, content='aberto')
+
+        async def recommendations(user_id, context='YOURLIFE_FEED'):
+            return [public.id]
+
+        with mock.patch('core.views.feed.aget_recommendations', recommendations), \
+                mock.patch('core.views.feed.read_timeline', return_value=[]), \
+                mock.patch('core.views.feed.track_impressions.apply_async', side_effect=ConnectionError('broker')):
+            response = self.client.get(reverse('home'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_friends_only_birds_need_a_bond_and_stories_never_show(self):
+        from_friend = Bird.objects.create(author=self.friend, content='amigos', visibility=Bird.Visibility.FRIENDS)
+        from_stranger = Bird.objects.create(author=self.stranger, content='amigos', visibility=Bird.Visibility.FRIENDS)
+        story = Bird.objects.create(author=self.stranger, content='story', post_type=Bird.PostType.STORY)
+
+        rendered = self._render_with_recommendations([from_friend, from_stranger, story])
+
+        self.assertEqual(rendered, {from_friend.id})
+
+
+class OutboxIngestionTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='pw')
+
+    def test_only_public_non_story_birds_are_ingested(self):
+        public = Bird.objects.create(author=self.author, content='aberto')
+        Bird.objects.create(author=self.author, content='privado', visibility=Bird.Visibility.PRIVATE)
+        Bird.objects.create(author=self.author, content='amigos', visibility=Bird.Visibility.FRIENDS)
+        Bird.objects.create(author=self.author, content='story', post_type=Bird.PostType.STORY)
+
+        self.assertEqual(list(TasOutbox.objects.values_list('bird_id', flat=True)), [public.id])
+
+
+class ConnectionSignalTests(TestCase):
+    def setUp(self):
+        self.follower = User.objects.create_user('follower', password='pw')
+        self.target = User.objects.create_user('target', password='pw')
+
+    @mock.patch('core.signals.push_connections_to_tas')
+    @mock.patch('core.signals.invalidate_recommendations')
+    @mock.patch('core.signals.backfill_follow')
+    @mock.patch('core.signals.purge_follow')
+    def test_redis_is_only_touched_after_commit(self, purge, backfill, invalidate, _push):
+        with self.captureOnCommitCallbacks() as callbacks:
+            connection = Connection.objects.create(follower=self.follower, target=self.target)
+        backfill.assert_not_called()
+        invalidate.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+        backfill.assert_called_once_with(self.follower.id, self.target.id)
+        invalidate.assert_called_once_with(self.follower.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            connection.delete()
+        purge.assert_called_once_with(self.follower.id, self.target.id)
+
+
+class TimelineRetractTests(TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        patcher = mock.patch('core.timeline.get_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.author = User.objects.create_user('author', password='pw')
+        self.follower = User.objects.create_user('follower', password='pw')
+        self.friend = User.objects.create_user('friend', password='pw')
+        Connection.objects.create(follower=self.follower, target=self.author)
+        SocialBond.objects.create(requester=self.author, target=self.friend, status=SocialBond.Status.ACTIVE)
+
+    def test_deleted_bird_leaves_every_timeline_after_commit(self):
+        bird = Bird.objects.create(author=self.author, content='apagar')
+        kept = Bird.objects.create(author=self.author, content='fica')
+        timeline.fan_out_bird(bird)
+        timeline.fan_out_bird(kept)
+        bird_id = bird.id
+
+        with mock.patch('core.signals.retract_bird') as task:
+            with self.captureOnCommitCallbacks() as callbacks:
+                bird.delete()
+            task.delay.assert_not_called()
+            for callback in callbacks:
+                callback()
+        task.delay.assert_called_once_with(bird_id, self.author.id)
+
+        timeline.retract_bird(bird_id, self.author.id)
+
+        for key in (timeline.author_posts_key(self.author.id), *(
+                timeline.timeline_key(u.id) for u in (self.author, self.follower, self.friend))):
+            self.assertNotIn(str(bird_id), self.redis.zrange(key, 0, -1))
+        self.assertEqual(timeline.read_timeline(self.follower.id), [kept.id])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='pw')
+
+    def _birds(self, n, created_at=None):
+        birds = [Bird.objects.create(author=self.author, content=f'post {i}') for i in range(n)]
+        if created_at is not None:
+            Bird.objects.filter(id__in=[b.id for b in birds]).update(created_at=created_at)
+        return birds
+
+    def test_cursor_round_trips_to_the_microsecond(self):
+        created_at = datetime(2024, 5, 17, 12, 30, 1, 123456, tzinfo=dt_timezone.utc)
+
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, 42))
+
+    def test_invalid_cursor_is_ignored(self):
+        for cursor in (None, '', 'abc', '123', 'x_1', '1_y', '9' * 30 + '_1'):
+            self.assertIsNone(decode_cursor(cursor), cursor)
+
+    def test_pages_cover_every_bird_once_even_with_equal_timestamps(self):
+        birds = self._birds(5, created_at=datetime(2024, 1, 1, tzinfo=dt_timezone.utc))
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            items, cursor = keyset_page(Bird.objects.all(), cursor, size=2)
+            seen += [b.id for b in items]
+            pages += 1
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, sorted((b.id for b in birds), reverse=True))
+
+    def test_exactly_one_full_page_has_no_next_cursor(self):
+        self._birds(3)
+
+        items, cursor = keyset_page(Bird.objects.all(), size=3)
+
+        self.assertEqual(len(items), 3)
+        self.assertIsNone(cursor)
+
+
+class BirdCounterTests(TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        patcher = mock.patch('core.counters.get_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bird = Bird.objects.create(author=User.objects.create_user('author', password='pw'), content='quente')
+
+    def _count(self, field):
+        return Bird.objects.values_list(field, flat=True).get(id=self.bird.id)
+
+    def test_cold_bird_is_updated_in_place(self):
+        counters.bump(self.bird.id, 'like_count')
+
+        self.assertEqual(self._count('like_count'), 1)
+        self.assertFalse(self.redis.exists(counters.pending_key(self.bird.id)))
+
+    @override_settings(BIRD_COUNTER_HOT_THRESHOLD=0)
+    def test_flush_applies_hot_deltas_once(self):
+        for _ in range(3):
+            counters.bump(self.bird.id, 'like_count')
+        counters.bump(self.bird.id, 'share_count', 2)
+        self.assertEqual(self._count('like_count'), 0)
+
+        self.assertEqual(counters.flush_pending(), 1)
+        self.assertEqual(counters.flush_pending(), 0)
+
+        self.assertEqual((self._count('like_count'), self._count('share_count')), (3, 2))
+        self.assertFalse(self.redis.exists(counters.pending_key(self.bird.id), counters.DIRTY_KEY))
+
+    @override_settings(BIRD_COUNTER_HOT_THRESHOLD=0)
+    def test_failed_flush_puts_the_deltas_back(self):
+        counters.bump(self.bird.id, 'comment_count')
+
+        with mock.patch('core.counters.Bird.objects.filter', side_effect=RuntimeError('db')):
+            with self.assertRaises(RuntimeError):
+                counters.flush_pending()
+        self.assertEqual(self._count('comment_count'), 0)
+
+        self.assertEqual(counters.flush_pending(), 1)
+        self.assertEqual(self._count('comment_count'), 1)
+
+
+@override_settings(TAS_OUTBOX_TIMEOUT=10, TAS_OUTBOX_BACKOFF_BASE=5, TAS_OUTBOX_MAX_ATTEMPTS=3)
+class OutboxDrainTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('author', password='pw')
+        self.birds = [Bird.objects.create(author=author, content=f'post {i}') for i in range(3)]
+
+    def _respond(self, results):
+        response = mock.Mock()
+        response.json.return_value = {'results': results}
+        return mock.patch('core.outbox.tas_client.request', return_value=response)
+
+    def test_claimed_rows_are_leased_until_the_deadline_passes(self):
+        claimed = outbox._claim(10)
+
+        self.assertEqual(len(claimed), 3)
+        self.assertEqual(outbox._claim(10), [])
+        lease = TasOutbox.objects.first().next_attempt_at
+        self.assertGreater(lease, timezone.now() + timedelta(seconds=29))
+
+        TasOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(len(outbox._claim(10)), 3)
+
+    def test_missing_and_failed_items_back_off_while_the_rest_is_sent(self):
+        first, second, third = self.birds
+        results = [
+            {'content_id': str(first.id), 'status': 'ok'},
+            {'content_id': str(second.id), 'status': 'error', 'error': 'embedding'},
+        ]
+        with self._respond(results):
+            self.assertEqual(outbox.drain(), 1)
+
+        rows = {row.bird_id: row for row in TasOutbox.objects.all()}
+        self.assertEqual(rows[first.id].status, TasOutbox.Status.SENT)
+        for bird, error in ((second, 'embedding'), (third, 'item ausente na resposta do TAS')):
+            row = rows[bird.id]
+            self.assertEqual((row.status, row.attempts, row.last_error), (TasOutbox.Status.PENDING, 1, error))
+            self.assertAlmostEqual(
+                (row.next_attempt_at - timezone.now()).total_seconds(), 5, delta=2)
+
+    def test_backoff_doubles_until_the_row_is_given_up(self):
+        with mock.patch('core.outbox.tas_client.request', return_value=None):
+            for attempt in (1, 2, 3):
+                TasOutbox.objects.update(next_attempt_at=timezone.now())
+                self.assertEqual(outbox.drain(), 0)
+                row = TasOutbox.objects.first()
+                self.assertEqual(row.attempts, attempt)
+                if attempt < 3:
+                    self.assertAlmostEqual(
+                        (row.next_attempt_at - timezone.now()).total_seconds(), 5 * 2 ** (attempt - 1), delta=2)
+
+        self.assertEqual(set(TasOutbox.objects.values_list('status', flat=True)), {TasOutbox.Status.FAILED})
+
+
+def _load_tas_wire():
+    """tas/app/core/wire.py sem subir o app do TAS (só precisa de numpy e fastapi)."""
+    spec = importlib.util.spec_from_file_location('tas_wire', settings.BASE_DIR / 'tas' / 'app' / 'core' / 'wire.py')
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError:
+        return None
+    return module
+
+
+tas_wire = _load_tas_wire()
+
+
+class BinaryIdsWireTests(TestCase):
+    def test_decode_reads_the_same_layout_the_tas_packs(self):
+        body = (1).to_bytes(8, 'little') + (2 ** 40).to_bytes(8, 'little')
+
+        self.assertEqual(decode_ids(body, IDS_MEDIA_TYPE, 2), ([1, 2 ** 40], None))
+
+    def test_count_mismatch_is_rejected(self):
+        body = (1).to_bytes(8, 'little') * 3
+
+        self.assertIsNone(decode_ids(body, IDS_MEDIA_TYPE, 2))
+        self.assertIsNone(decode_ids(body[:-1], IDS_MEDIA_TYPE))
+        self.assertIsNone(decode_ids(body, RANKED_MEDIA_TYPE, 3))
+
+    @skipUnless(tas_wire, 'numpy/fastapi do TAS não instalados')
+    def test_round_trip_through_the_tas_response(self):
+        for media_type in (tas_wire.IDS_MEDIA_TYPE, tas_wire.RANKED_MEDIA_TYPE):
+            sent = tas_wire.binary_response(media_type, ['7', 'test_1', '9000000000'], scores=[0.5, 0.1, 0.25])
+            response = httpx.Response(200, headers=dict(sent.headers), content=sent.body)
+
+            self.assertEqual(response.headers['x-item-count'], '2')
+            self.assertEqual(TasClient._parse_ids(response), [7, 9000000000])
+
+        body, count = tas_wire.pack_ids(['7', '8'], [0.5, 0.25])
+        self.assertEqual(decode_ids(body, RANKED_MEDIA_TYPE, count), ([7, 8], [0.5, 0.25]))
+
+    @skipUnless(tas_wire, 'numpy/fastapi do TAS não instalados')
+    def test_item_count_mismatch_is_treated_as_a_tas_failure(self):
+        sent = tas_wire.binary_response(tas_wire.IDS_MEDIA_TYPE, ['1', '2', '3'])
+        headers = {**dict(sent.headers), 'x-item-count': '4'}
+
+        self.assertIsNone(TasClient._parse_ids(httpx.Response(200, headers=headers, content=sent.body)))
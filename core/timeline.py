@@ -0,0 +1,231 @@
+"""
+Timelines pré-computadas (Fan-out-on-write).
+
+Cada usuário tem um sorted set no Redis (`timeline:<user_id>`) com os IDs dos
+Birds de quem ele segue, pontuados pelo timestamp de criação. Quando um Bird
+nasce, o ID é empurrado para a timeline de cada seguidor; a home só lê a lista.
+
+Autores com audiência acima de TIMELINE_CELEBRITY_THRESHOLD não fazem fan-out:
+seus posts públicos ficam apenas em `timeline:posts:<author_id>` e são
+mesclados na leitura (Fan-out-on-read).
+"""
+import heapq
+import logging
+
+import redis
+from django.conf import settings
+from django.db.models import Q
+
+from core.models import Bird, Connection, SocialBond
+from core.redis_client import get_redis
+
+logger = logging.getLogger('django')
+
+CELEBRITIES_KEY = 'timeline:celebrities'
+
+
+def timeline_key(user_id):
+    return f'timeline:{user_id}'
+
+
+def author_posts_key(author_id):
+    return f'timeline:posts:{author_id}'
+
+
+# ========================================================
+# 👥 AUDIÊNCIA
+# ========================================================
+
+def get_follower_ids(author_id):
+    return set(
+        Connection.objects.filter(target_id=author_id, status='active')
+        .values_list('follower_id', flat=True)
+    )
+
+
+def get_bond_ids(author_id):
+    """Laços ativos (amigos, família...) nos dois sentidos."""
+    bonds = SocialBond.objects.filter(
+        Q(requester_id=author_id) | Q(target_id=author_id),
+        status=SocialBond.Status.ACTIVE,
+    ).values_list('requester_id', 'target_id')
+    return {uid for pair in bonds for uid in pair if uid != author_id}
+
+
+def follower_count(author_id):
+    return Connection.objects.filter(target_id=author_id, status='active').count()
+
+
+# ========================================================
+# ✍️ ESCRITA (FAN-OUT)
+# ========================================================
+
+def _push(pipe, user_ids, bird_id, score):
+    max_len = settings.TIMELINE_MAX_LENGTH
+    for uid in user_ids:
+        key = timeline_key(uid)
+        pipe.zadd(key, {bird_id: score})
+        # Mantém apenas os N mais recentes (rank 0 = mais antigo)
+        pipe.zremrangebyrank(key, 0, -(max_len + 1))
+
+
+def fan_out_bird(bird):
+    """
+    Distribui um Bird recém-criado para as timelines da audiência.
+    Retorna quantas timelines foram escritas.
+    """
+    if bird.post_type == Bird.PostType.STORY or bird.visibility == Bird.Visibility.PRIVATE:
+        return 0
+
+    r = get_redis()
+    score = bird.created_at.timestamp()
+    batch = settings.TIMELINE_FANOUT_BATCH
+
+    if bird.visibility == Bird.Visibility.FRIENDS:
+        audience = get_bond_ids(bird.author_id)
+    else:
+        # Índice do autor: base do fan-out-on-read e do backfill ao seguir
+        posts_key = author_posts_key(bird.author_id)
+        pipe = r.pipeline(transaction=False)
+        pipe.zadd(posts_key, {bird.id: score})
+        pipe.zremrangebyrank(posts_key, 0, -(settings.TIMELINE_MAX_LENGTH + 1))
+        pipe.execute()
+
+        if follower_count(bird.author_id) > settings.TIMELINE_CELEBRITY_THRESHOLD:
+            # Celebridade: só os laços diretos recebem o push, o resto lê sob demanda
+            r.sadd(CELEBRITIES_KEY, bird.author_id)
+            audience = get_bond_ids(bird.author_id)
+        else:
+            r.srem(CELEBRITIES_KEY, bird.author_id)
+            audience = get_follower_ids(bird.author_id) | get_bond_ids(bird.author_id)
+
+    audience.add(bird.author_id)
+    audience = list(audience)
+
+    for start in range(0, len(audience), batch):
+        pipe = r.pipeline(transaction=False)
+        _push(pipe, audience[start:start + batch], bird.id, score)
+        pipe.execute()
+
+    return len(audience)
+
+
+def retract_bird(bird_id, author_id):
+    """
+    Remove um Bird apagado do índice do autor e das timelines da audiência.
+    A visibilidade pode ter mudado desde o fan-out, então limpa todos os que
+    podem tê-lo recebido (ZREM de quem não tem é no-op).
+    Retorna quantas timelines foram visitadas.
+    """
+    r = get_redis()
+    batch = settings.TIMELINE_FANOUT_BATCH
+    r.zrem(author_posts_key(author_id), bird_id)
+
+    audience = get_follower_ids(author_id) | get_bond_ids(author_id)
+    audience.add(author_id)
+    audience = list(audience)
+
+    for start in range(0, len(audience), batch):
+        pipe = r.pipeline(transaction=False)
+        for uid in audience[start:start + batch]:
+            pipe.zrem(timeline_key(uid), bird_id)
+        pipe.execute()
+
+    return len(audience)
+
+
+def backfill_follow(follower_id, target_id):
+    """Ao seguir alguém, traz os posts públicos recentes dele para a timeline."""
+    r = get_redis()
+    if r.sismember(CELEBRITIES_KEY, target_id):
+        return  # Já é mesclado na leitura
+    recent = r.zrevrange(author_posts_key(target_id), 0, settings.TIMELINE_MAX_LENGTH - 1, withscores=True)
+    if not recent:
+        return
+    key = timeline_key(follower_id)
+    pipe = r.pipeline(transaction=False)
+    pipe.zadd(key, dict(recent))
+    pipe.zremrangebyrank(key, 0, -(settings.TIMELINE_MAX_LENGTH + 1))
+    pipe.execute()
+
+
+def purge_follow(follower_id, target_id):
+    """Ao deixar de seguir (ou bloquear), remove os posts do alvo da timeline."""
+    r = get_redis()
+    ids = r.zrange(author_posts_key(target_id), 0, -1)
+    if ids:
+        r.zrem(timeline_key(follower_id), *ids)
+
+
+# ========================================================
+# 📖 LEITURA
+# ========================================================
+
+def _range(r, key, limit, before):
+    """ZREVRANGE paginado: `before` é o cursor (created_at, id) do último item visto."""
+    if before is None:
+        return r.zrevrange(key, 0, limit - 1, withscores=True)
+    created_at, last_id = before
+    max_score = created_at.timestamp()
+    # Pega uma folga para descartar empates de timestamp já exibidos
+    entries = r.zrevrangebyscore(key, max_score, '-inf', start=0, num=limit + 10, withscores=True)
+    return [
+        (member, score) for member, score in entries
+        if score < max_score or int(member) < last_id
+    ][:limit]
+
+
+def _celebrity_entries(r, user_id, limit, before):
+    celebrities = r.smembers(CELEBRITIES_KEY)
+    if not celebrities:
+        return []
+    followed = list(
+        Connection.objects.filter(
+            follower_id=user_id, target_id__in=celebrities, status='active'
+        ).values_list('target_id', flat=True)
+    )
+    if not followed:
+        return []
+    return [
+        entry for author_id in followed
+        for entry in _range(r, author_posts_key(author_id), limit, before)
+    ]
+
+
+def _fallback_ids(user_id, limit, before):
+    """Redis fora do ar: mesma semântica da timeline, direto do banco."""
+    following = Connection.objects.filter(follower_id=user_id, status='active').values('target_id')
+    queryset = Bird.objects.filter(
+        Q(author_id__in=following, visibility=Bird.Visibility.PUBLIC) | Q(author_id=user_id)
+    ).exclude(post_type=Bird.PostType.STORY).order_by('-created_at', '-id')
+    if before is not None:
+        created_at, last_id = before
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id))
+    return list(queryset.values_list('id', flat=True)[:limit])
+
+
+def read_timeline(user_id, limit=50, before=None):
+    """
+    Retorna os IDs (int) da timeline do usuário, do mais novo ao mais antigo.
+    Mescla a lista pré-computada com os posts das celebridades seguidas.
+    `before` (created_at, id) continua a partir de uma página anterior.
+    """
+    try:
+        r = get_redis()
+        entries = _range(r, timeline_key(user_id), limit, before)
+        extra = _celebrity_entries(r, user_id, limit, before)
+    except redis.RedisError as e:
+        logger.warning(f"Timeline Redis offline ({e}). Usando fallback SQL para user {user_id}.")
+        return _fallback_ids(user_id, limit, before)
+
+    if extra:
+        entries = heapq.nlargest(limit, entries + extra, key=lambda e: (e[1], int(e[0])))
+
+    seen = set()
+    ids = []
+    for member, _score in entries:
+        bird_id = int(member)
+        if bird_id not in seen:
+            seen.add(bird_id)
+            ids.append(bird_id)
+    return ids[:limit]
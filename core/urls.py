@@ -1,17 +1,19 @@
 from django.urls import path
 from core.views import (
     feed, profile, posts, interactions, settings, 
-    discovery, chat, events, groups, network, auth, general
+    discovery, chat, events, groups, network, auth, general, api
 )
 
 urlpatterns = [
     # --- Feed & Home ---
     path('', feed.home_view, name='home'),
+    path('feed/page/', feed.feed_page, name='feed_page'), # Scroll infinito (HTMX)
 
     # --- Perfis ---
     path('profile/<str:username>/', profile.profile_view, name='profile_detail'),
     path('profile/edit/submit/', profile.edit_profile, name='edit_profile'), # Rota Nova
     path('p/<str:username>/', profile.profile_view, name='profile'), # Alias
+    path('profile/<str:username>/posts/', profile.profile_posts_page, name='profile_posts_page'), # Scroll infinito (HTMX)
 
     # --- Posts (CRUD) ---
     path('bird/create/', posts.create_bird, name='create_bird'),
@@ -27,6 +29,9 @@ urlpatterns = [
     # --- Auth ---
     path('login/', auth.login_view, name='login'),
     
+    # --- Observabilidade ---
+    path('internal/metrics/', api.metrics_view, name='internal_metrics'),
+
     # --- Extras ---
     path('explore/', discovery.explore_view, name='explore'),
     path('network/', network.network_view, name='network_dashboard'),
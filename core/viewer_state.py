@@ -0,0 +1,42 @@
+"""
+Estado do visitante sobre uma página de Birds (curtiu? salvou? segue o autor?).
+
+Resolve tudo em 3 queries de pertencimento (IN sobre a página), em vez de o
+template perguntar card a card com `request.user in bird.likes.all`. O custo
+não depende de quantos likes cada post tem.
+"""
+from core.models import Bird, Connection, SavedPost
+
+
+def annotate_viewer_state(birds, user):
+    """
+    Anexa `viewer_liked`, `viewer_saved` e `viewer_follows_author` a cada Bird.
+    Aceita lista ou queryset; devolve sempre uma lista.
+    """
+    birds = list(birds)
+    if not birds or not user.is_authenticated:
+        for bird in birds:
+            bird.viewer_liked = bird.viewer_saved = bird.viewer_follows_author = False
+        return birds
+
+    bird_ids = {b.id for b in birds}
+    author_ids = {b.author_id for b in birds}
+
+    liked = set(
+        Bird.likes.through.objects.filter(user_id=user.id, bird_id__in=bird_ids)
+        .values_list('bird_id', flat=True)
+    )
+    saved = set(
+        SavedPost.objects.filter(user_id=user.id, post_id__in=bird_ids)
+        .values_list('post_id', flat=True)
+    )
+    following = set(
+        Connection.objects.filter(follower_id=user.id, target_id__in=author_ids, status='active')
+        .values_list('target_id', flat=True)
+    )
+
+    for bird in birds:
+        bird.viewer_liked = bird.id in liked
+        bird.viewer_saved = bird.id in saved
+        bird.viewer_follows_author = bird.author_id in following
+    return birds
@@ -2,6 +2,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST, require_GET
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 import json
@@ -15,6 +16,8 @@ try:
 except ImportError:
     Notification = None
 
+from core import metrics
+
 User = get_user_model()
 
 # ========================================================
@@ -169,4 +172,18 @@ def api_finalize(request):
         })
         
     except Exception as e:
-        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
+
+# ========================================================
+# 📊 MÉTRICAS INTERNAS (STAFF)
+# ========================================================
+
+@staff_member_required
+@require_GET
+def metrics_view(request):
+    """
+    Snapshot das métricas do processo: estado do circuito do TAS,
+    percentis de latência e contadores.
+    """
+    return JsonResponse(metrics.snapshot())
@@ -1,43 +1,129 @@
-import requests
+import asyncio
+import logging
+from urllib.parse import urlencode
+from asgiref.sync import sync_to_async
+from django.db.models import Q
 from django.shortcuts import render
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from core.models import Bird
+from core.pagination import PAGE_SIZE, decode_cursor, encode_cursor, keyset_page
+from core.rec_cache import aget_recommendations
+from core.tasks import track_impressions
+from core.timeline import get_bond_ids, read_timeline
+from core.viewer_state import annotate_viewer_state
+
+logger = logging.getLogger('django')
+
+def _ordered_birds(bird_ids, queryset=None):
+    """Busca os Birds em uma query e devolve na ordem dos IDs recebidos."""
+    queryset = Bird.objects.all() if queryset is None else queryset
+    birds_query = queryset.filter(id__in=bird_ids).select_related('author', 'author__profile')
+    birds_dict = {b.id: b for b in birds_query}
+    return [birds_dict[bid] for bid in bird_ids if bid in birds_dict]
+
+def _visible_to(user):
+    """
+    Birds que o usuário pode ver fora do próprio perfil: públicos, ou só-amigos de
+    quem tem laço ativo com ele; stories nunca. O TAS não conhece essas regras, então
+    toda recomendação passa por aqui antes de ser renderizada.
+    """
+    visible = Q(visibility=Bird.Visibility.PUBLIC)
+    bonds = get_bond_ids(user.id)
+    if bonds:
+        visible |= Q(visibility=Bird.Visibility.FRIENDS, author_id__in=bonds)
+    return Bird.objects.filter(visible).exclude(post_type=Bird.PostType.STORY)
+
+def _record_impressions(user_id, birds):
+    """
+    Avisa o TAS do que foi renderizado (best-effort). Sem retry de publish: com o
+    broker fora do ar a home não pode esperar o kombu nem virar 500 por isso.
+    """
+    if not birds:
+        return
+    try:
+        track_impressions.apply_async((user_id, [b.id for b in birds]), retry=False)
+    except Exception as e:
+        logger.warning(f"Broker offline ({e}). Impressões de {user_id} não registradas.")
+
+def _next_page_url(source, cursor):
+    if not cursor:
+        return None
+    return f"{reverse('feed_page')}?{urlencode({'source': source, 'cursor': cursor})}"
+
+def _timeline_page(user, cursor=None):
+    """Uma página da timeline pré-computada + cursor da próxima."""
+    bird_ids = read_timeline(user.id, limit=PAGE_SIZE, before=decode_cursor(cursor))
+    birds = _ordered_birds(bird_ids)
+    next_cursor = None
+    if len(bird_ids) == PAGE_SIZE and birds:
+        next_cursor = encode_cursor(birds[-1].created_at, birds[-1].id)
+    return birds, next_cursor
+
+def _public_page(cursor=None):
+    """Fallback cronológico (SQL padrão), também paginado por cursor."""
+    queryset = Bird.objects.filter(visibility='public').select_related('author', 'author__profile')
+    return keyset_page(queryset, cursor)
+
+def _render_home(request, user, feed_birds, next_cursor, rec_ids):
+    source = 'timeline'
+
+    # 2. Completa a primeira página com os IDs recomendados pela IA (sem repetir)
+    seen = {b.id for b in feed_birds}
+    rec_ids = [bid for bid in rec_ids if bid not in seen]
+    if rec_ids:
+        feed_birds = feed_birds + _ordered_birds(rec_ids, _visible_to(user))
+
+    # Se nada veio da timeline nem da IA, usa o fallback cronológico
+    if not feed_birds:
+        feed_birds, next_cursor = _public_page()
+        source = 'public'
+
+    # Só o que foi renderizado conta como visto pelo Accumbens (não o que o TAS devolveu)
+    _record_impressions(user.id, feed_birds)
+
+    return render(request, 'pages/feed.html', {
+        'birds': annotate_viewer_state(feed_birds, user),
+        'next_page_url': _next_page_url(source, next_cursor),
+    })
 
 @login_required
-def home_view(request):
+async def home_view(request):
     """
     Feed Híbrida (Algorítmica + Cronológica).
     Substitui a antiga feed_view/home_view.
+    Assíncrona (Daphne): a chamada ao TAS corre em paralelo com a leitura da timeline.
     """
-    user = request.user
-    
-    # URL interna do Docker para o motor de recomendação
-    recommend_url = f"http://tas-engine:8000/api/v1/recommend/?user_id={user.id}"
-    
-    feed_birds = []
-    
-    try:
-        # Tenta buscar a lista de IDs recomendados pela IA
-        response = requests.get(recommend_url, timeout=1.5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            bird_ids = data.get('recommendations', [])
-            
-            if bird_ids:
-                # Busca os objetos mantendo a ordem da IA
-                birds_query = Bird.objects.filter(id__in=bird_ids).select_related('author', 'author__profile')
-                birds_dict = {b.id: b for b in birds_query}
-                feed_birds = [birds_dict[bid] for bid in bird_ids if bid in birds_dict]
-            
-    except Exception:
-        # Falha silenciosa se a IA estiver offline ou der erro
-        pass
-
-    # Se a IA não retornou nada, usa o fallback cronológico (SQL padrão)
-    if not feed_birds:
-        feed_birds = Bird.objects.filter(
-            visibility='public'
-        ).select_related('author', 'author__profile').order_by('-created_at')[:50]
+    user = await request.auser()
+
+    recommendations = asyncio.create_task(aget_recommendations(user.id))
+
+    # 1. Timeline pré-computada (fan-out-on-write): quem eu sigo, do mais novo ao mais antigo
+    feed_birds, next_cursor = await sync_to_async(_timeline_page)(user)
+
+    # Cache com stale-while-revalidate; IA offline / circuito aberto devolve lista vazia
+    rec_ids = await recommendations
+
+    return await sync_to_async(_render_home)(request, user, feed_birds, next_cursor, rec_ids)
+
+@login_required
+def feed_page(request):
+    """
+    Scroll infinito (HTMX): devolve a próxima página de cards + o sentinela da seguinte.
+    O custo é o mesmo em qualquer profundidade (keyset, sem OFFSET).
+    """
+    source = request.GET.get('source', 'timeline')
+    cursor = request.GET.get('cursor')
+
+    if source == 'public':
+        birds, next_cursor = _public_page(cursor)
+    else:
+        source = 'timeline'
+        birds, next_cursor = _timeline_page(request.user, cursor)
+
+    _record_impressions(request.user.id, birds)
 
-    return render(request, 'pages/feed.html', {'birds': feed_birds})
\ No newline at end of file
+    return render(request, 'components/partials/bird_page.html', {
+        'birds': annotate_viewer_state(birds, request.user),
+        'next_page_url': _next_page_url(source, next_cursor),
+    })
@@ -4,6 +4,7 @@ from django.http import HttpResponse, JsonResponse
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.db.models import Q
+from core.counters import apply_pending, bump
 
 User = get_user_model()
 
@@ -34,12 +35,17 @@ def toggle_like(request, bird_id):
     bird = get_object_or_404(Bird, id=bird_id)
     user = request.user
     
-    # Verifica se já curtiu (Many-to-Many)
-    if bird.likes.filter(id=user.id).exists():
-        bird.likes.remove(user)
+    # Verifica se já curtiu (Many-to-Many). Usa a tabela intermediária direto para
+    # saber se a linha mudou de fato e manter o like_count exato sob cliques duplos.
+    Like = Bird.likes.through
+    removed, _ = Like.objects.filter(bird_id=bird.id, user_id=user.id).delete()
+    if removed:
+        bump(bird.id, 'like_count', -removed)
         user_liked = False
     else:
-        bird.likes.add(user)
+        _, created = Like.objects.get_or_create(bird_id=bird.id, user_id=user.id)
+        if created:
+            bump(bird.id, 'like_count', 1)
         user_liked = True
         
         # 🔔 Gera Notificação (apenas se não for o próprio autor)
@@ -60,11 +66,12 @@ def toggle_like(request, bird_id):
 
     # Se for uma requisição HTMX (AJAX), retorna apenas o botão atualizado
     if request.headers.get('HX-Request'):
+        bird.refresh_from_db(fields=['like_count'])
+        apply_pending([bird])
         context = {
             'bird': bird,
             'user_liked': user_liked
         }
-        # Precisamos ter este template parcial criado
         return render(request, 'components/partials/like_button.html', context)
     
     # Se for normal, recarrega a página
@@ -86,6 +93,7 @@ def add_comment(request, bird_id):
         
         if content and Comment:
             Comment.objects.create(author=request.user, post=bird, content=content)
+            bump(bird.id, 'comment_count', 1)
             
             # 🔔 Notificação
             if bird.author != request.user and Notification:
@@ -105,7 +113,10 @@ def delete_comment(request, comment_id):
         comment = get_object_or_404(Comment, id=comment_id)
         # Permissão: Dono do comentário OU Dono do post original
         if request.user == comment.author or request.user == comment.post.author:
-            comment.delete()
+            bird_id = comment.post_id
+            # Respostas encadeadas (parent) caem junto via CASCADE
+            _, per_model = comment.delete()
+            bump(bird_id, 'comment_count', -per_model.get(Comment._meta.label, 1))
             messages.success(request, "Comentário removido.")
             
     return redirect(request.META.get('HTTP_REFERER', 'home'))
@@ -211,5 +222,7 @@ def toggle_save(request, bird_id):
 @login_required
 def share_post(request, bird_id):
     # Futuramente: Criar um Bird tipo 'repost'
+    bird = get_object_or_404(Bird, id=bird_id)
+    bump(bird.id, 'share_count', 1)
     messages.success(request, "Link copiado para a área de transferência! (Simulado)")
     return redirect(request.META.get('HTTP_REFERER', 'home'))
\ No newline at end of file
@@ -1,7 +1,9 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from core.models import Bird
+from core.viewer_state import annotate_viewer_state
 
 @login_required
 def create_bird(request):
@@ -11,13 +13,15 @@ def create_bird(request):
         video = request.FILES.get('video')
         
         if content or image or video:
-            new_bird = Bird.objects.create(
-                author=request.user,
-                content=content,
-                image=image,
-                video=video,
-                post_type='image' if image else 'video' if video else 'text'
-            )
+            # Bird + linha do outbox do TAS (signal) na mesma transação
+            with transaction.atomic():
+                new_bird = Bird.objects.create(
+                    author=request.user,
+                    content=content,
+                    image=image,
+                    video=video,
+                    post_type='image' if image else 'video' if video else 'text'
+                )
             
             # Se for HTMX, retorna apenas o card do novo post para inserir na feed
             if request.headers.get('HX-Request'):
@@ -43,5 +47,6 @@ def delete_bird(request, bird_id):
 @login_required
 def bird_detail(request, bird_id):
     """View para visualizar um único post em detalhe"""
-    bird = get_object_or_404(Bird, id=bird_id)
-    return render(request, 'pages/feed.html', {'birds': [bird], 'single_mode': True})
\ No newline at end of file
+    bird = get_object_or_404(Bird.objects.select_related('author', 'author__profile'), id=bird_id)
+    birds = annotate_viewer_state([bird], request.user)
+    return render(request, 'pages/feed.html', {'birds': birds, 'single_mode': True})
\ No newline at end of file
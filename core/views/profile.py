@@ -1,16 +1,30 @@
 from django.db import models
 
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from core.models import Profile, Bird, SocialBond
+from core.pagination import keyset_page
+from core.viewer_state import annotate_viewer_state
+
+def _profile_posts_page(profile_user, viewer, cursor=None):
+    """Posts do perfil paginados por cursor (índice author, -created_at)."""
+    queryset = Bird.objects.filter(author=profile_user).select_related('author', 'author__profile')
+    posts, next_cursor = keyset_page(queryset, cursor)
+    posts = annotate_viewer_state(posts, viewer)
+    next_url = None
+    if next_cursor:
+        next_url = f"{reverse('profile_posts_page', args=[profile_user.username])}?cursor={next_cursor}"
+    return posts, next_url
 
 @login_required
 def profile_view(request, username):
     profile_user = get_object_or_404(User, username=username)
     profile = profile_user.profile
     is_own_profile = (request.user == profile_user)
+    posts, posts_next_url = _profile_posts_page(profile_user, request.user)
 
     # Estatísticas
     stats = {
@@ -28,7 +42,8 @@ def profile_view(request, username):
         'profile': profile,
         'is_own_profile': is_own_profile,
         'stats': stats,
-        'posts': Bird.objects.filter(author=profile_user).order_by('-created_at'),
+        'posts': posts,
+        'posts_next_url': posts_next_url,
         'family_members': [],
         'work_history': [],
         'education_history': [],
@@ -36,6 +51,16 @@ def profile_view(request, username):
     }
     return render(request, 'pages/profile.html', context)
 
+@login_required
+def profile_posts_page(request, username):
+    """Scroll infinito (HTMX) dos posts do perfil."""
+    profile_user = get_object_or_404(User, username=username)
+    posts, next_url = _profile_posts_page(profile_user, request.user, request.GET.get('cursor'))
+    return render(request, 'components/partials/bird_page.html', {
+        'birds': posts,
+        'next_page_url': next_url,
+    })
+
 @login_required
 def edit_profile(request):
     """Processa o upload de avatar e capa via POST"""
@@ -1,13 +1,72 @@
-from fastapi import APIRouter, Depends
+import json
+import time
+from typing import List, Union
+from fastapi import APIRouter, Depends, Request
 from app.schemas.user import UserEvent
 from app.db.session import get_db
-import aioredis # Para cache rápido de comportamento (Dopamina temporária)
+from app.services.ingestion_service import ingestion_service, INGEST_BATCH_SIZE
+from app.services.event_log import event_log
 
 router = APIRouter()
 
 @router.post("/track")
-async def track_user_behavior(event: UserEvent):
-    # Aqui, em sistemas de alta escala, salvaríamos no Redis e depois no DB
-    # Por enquanto, vamos logar que o motor recebeu o estímulo
-    print(f"🔥 [ACCUMBENS] Estímulo recebido: {event.event_type} no conteúdo {event.content_id}")
-    return {"status": "tracked", "reward_processed": True}
\ No newline at end of file
+async def track_user_behavior(payload: Union[UserEvent, List[UserEvent]]):
+    """
+    Recebe um evento ou um array de eventos. Só enfileira no log (Redis Stream);
+    a agregação, o trending, as curtidas recentes e os vetores de interesse ficam
+    com o scripts/event_consumer.py (feature store compartilhado no Redis).
+    """
+    events = payload if isinstance(payload, list) else [payload]
+    now = time.time()
+    records = []
+    for event in events:
+        record = event.model_dump()
+        record["ts"] = now
+        records.append(record)
+    event_log.append(records)
+    return {"status": "tracked", "received": len(records)}
+
+@router.get("/stats")
+async def event_log_stats():
+    """Eventos na fila deste worker e quantos já foram descartados com o log fora do ar."""
+    return event_log.stats()
+
+@router.post("/ingest")
+async def ingest_content(request: Request, db=Depends(get_db)):
+    """
+    Ingestão em lote. Aceita:
+    - JSON: um objeto ou um array de objetos
+    - NDJSON (Content-Type: application/x-ndjson): um objeto por linha, lido em streaming
+      e processado em lotes de INGEST_BATCH_SIZE
+    Devolve o status de cada item na ordem recebida.
+    """
+    results = []
+
+    if "ndjson" in request.headers.get("content-type", ""):
+        batch, pending = [], b""
+        async for chunk in request.stream():
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    batch.append(_parse_line(line))
+            if len(batch) >= INGEST_BATCH_SIZE:
+                results.extend(await ingestion_service.ingest_batch(db, batch))
+                batch = []
+        if pending.strip():
+            batch.append(_parse_line(pending))
+        if batch:
+            results.extend(await ingestion_service.ingest_batch(db, batch))
+    else:
+        payload = await request.json()
+        items = payload if isinstance(payload, list) else [payload]
+        results = await ingestion_service.ingest(db, items)
+
+    ingested = sum(1 for r in results if r["status"] == "ok")
+    return {"received": len(results), "ingested": ingested, "results": results}
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode(errors="replace")  # Vira erro de validação no item
@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
+from app.core.wire import binary_response, negotiate
+from app.db.session import query_stats
 from app.services.recommendation_service import recommendation_service
 from pydantic import BaseModel
 
@@ -8,6 +10,20 @@ class RecRequest(BaseModel):
 
 router = APIRouter()
 @router.post("/")
-async def get_recommendations(req: RecRequest):
-    ids = await recommendation_service.get_feed(req)
-    return {"user_id": req.user_id, "items": ids}
\ No newline at end of file
+async def get_recommendations(req: RecRequest, accept: str = Header(None)):
+    feed = await recommendation_service.get_feed(req)
+
+    # Django pede int64 empacotados (Accept: application/x-bird-ids): sem JSON nos dois lados
+    media_type = negotiate(accept)
+    if media_type:
+        pipeline = feed["pipeline"]
+        return binary_response(media_type, feed["items"], feed["scores"], headers={
+            "X-Pipeline-Ms": str(pipeline["total_ms"]),
+            "X-Pipeline-Degraded": ",".join(pipeline["degraded"]),
+        })
+    return {"user_id": req.user_id, "items": feed["items"], "pipeline": feed["pipeline"]}
+
+@router.get("/stats")
+async def recommendation_stats():
+    """Latência por etapa (p50/p99) e degradações do pipeline neste worker, mais os tempos de SQL."""
+    return {**recommendation_service.stats.summary(), "db": query_stats.summary()}
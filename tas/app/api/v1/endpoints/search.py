@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
+from app.core.wire import IDS_MEDIA_TYPE, binary_response, negotiate
 from app.db.session import get_db
 from app.db.repositories.search_repository import SearchRepository
+from app.services.profile_cache import profile_cache
+from app.services.search_cache import search_cache
 from app.engines.sara.encoders import sara_encoder
 from app.engines.thalamus.filters import ThalamusFilter
 from pydantic import BaseModel
@@ -15,26 +18,37 @@ class SearchRequest(BaseModel):
     limit: int = 10
 
 @router.post("/")
-async def search_vibe(req: SearchRequest, db=Depends(get_db)):
+async def search_vibe(req: SearchRequest, db=Depends(get_db), accept: str = Header(None)):
     repo = SearchRepository(db)
-    
-    # 1. Transforma a pesquisa em vetor (SARA)
-    query_vector = sara_encoder.encode(req.query)
-    
-    # 2. Busca os conteúdos mais próximos no Supabase
-    raw_results = await repo.semantic_search(query_vector, limit=req.limit * 2)
-    
-    # Converter para formato de dicionário para o Thalamus
-    candidates = [
-        {"id": r.id, "title": r.title, "tags": r.tags, "safety": r.safety_label, "author_id": r.author_id}
-        for r in raw_results
-    ]
-    
-    # 3. Thalamus aplica a soberania (remove bloqueados e ilegais)
-    # Por agora usamos perfil vazio, mas o Thalamus já faz o seu trabalho
-    filtered_results = await thalamus.apply(req, candidates)
-    
+
+    # 1. Transforma a pesquisa em vetor (SARA, com cache por texto normalizado)
+    query_vector = await sara_encoder.aencode(req.query)
+
+    # 2. Busca os conteúdos mais próximos no Supabase (ou no cache de buscas populares)
+    async def search():
+        raw_results = await repo.semantic_search(query_vector, limit=req.limit * 2)
+        # Converter para formato de dicionário para o Thalamus
+        return [
+            {"id": r.id, "title": r.title, "tags": r.tags, "safety": r.safety_label, "author_id": r.author_id}
+            for r in raw_results
+        ]
+
+    candidates = await search_cache.get_or_search(query_vector, req.context, req.limit, search)
+
+    # 3. Thalamus aplica a soberania (remove bloqueados e ilegais) — sempre por utilizador, depois do cache
+    user_profile = await profile_cache.get(db, req.user_id)
+    filtered_results = await thalamus.apply(req, candidates, user_profile)
+
+    # Só os IDs, empacotados, para quem pede (a busca não tem score para enviar)
+    if negotiate(accept, offers=(IDS_MEDIA_TYPE,)):
+        return binary_response(IDS_MEDIA_TYPE, [r["id"] for r in filtered_results[:req.limit]])
+
     return {
         "query": req.query,
         "results": filtered_results[:req.limit]
-    }
\ No newline at end of file
+    }
+
+@router.get("/stats")
+async def search_stats():
+    """Taxas de acerto dos caches deste worker (embedding da consulta e resultados)."""
+    return {"embeddings": sara_encoder.hit_rates(), "results": search_cache.hit_rates()}
@@ -3,6 +3,8 @@ from pydantic import BaseModel
 from sqlalchemy.future import select
 from app.db.session import get_db
 from app.db.base_user import UserProfileModel
+from app.db.repositories.profile_repository import ProfileRepository
+from app.services.profile_cache import profile_cache
 
 router = APIRouter()
 
@@ -11,6 +13,7 @@ class ProfileUpdate(BaseModel):
     blacklisted_tags: list = None
     blacklisted_authors: list = None
     priority_interests: list = None
+    followed_authors: list = None
 
 @router.post("/update_profile")
 async def update_profile(data: ProfileUpdate, db=Depends(get_db)):
@@ -23,6 +26,10 @@ async def update_profile(data: ProfileUpdate, db=Depends(get_db)):
     
     if data.blacklisted_tags is not None: profile.blacklisted_tags = data.blacklisted_tags
     if data.blacklisted_authors is not None: profile.blacklisted_authors = data.blacklisted_authors
+    if data.priority_interests is not None: profile.priority_interests = data.priority_interests
+    if data.followed_authors is not None: profile.followed_authors = data.followed_authors
     
     await db.commit()
+    # Write-through: todos os workers passam a ver o perfil novo
+    await profile_cache.put(data.user_id, ProfileRepository.to_dict(profile))
     return {"status": "success", "user_id": data.user_id}
\ No newline at end of file
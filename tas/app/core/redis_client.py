@@ -0,0 +1,13 @@
+import os
+import redis.asyncio as redis
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Um cliente (pool) por processo; None quando o TAS roda sem Redis (dev/testes)
+_client = None
+
+def get_redis():
+    global _client
+    if _client is None and REDIS_URL:
+        _client = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _client
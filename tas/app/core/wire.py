@@ -0,0 +1,41 @@
+import numpy as np
+from fastapi import Response
+
+# Formatos binários negociados pelo header Accept (o JSON continua sendo o padrão)
+IDS_MEDIA_TYPE = "application/x-bird-ids"          # int64 little-endian, um por item
+RANKED_MEDIA_TYPE = "application/x-bird-ranked"    # os mesmos int64 seguidos de um float32 LE (score) por item
+
+def negotiate(accept, offers=(RANKED_MEDIA_TYPE, IDS_MEDIA_TYPE)):
+    """Primeiro formato binário de `offers` que o cliente aceita, ou None (responder em JSON)."""
+    if not accept:
+        return None
+    accepted = {part.split(";")[0].strip() for part in accept.split(",")}
+    return next((media for media in offers if media in accepted), None)
+
+def pack_ids(ids, scores=None):
+    """
+    (corpo, quantidade). IDs não numéricos (ex.: 'test_1') ficam de fora, como o Django
+    já faria ao converter para int; os scores acompanham o mesmo filtro.
+    """
+    try:
+        # Caminho normal: todos numéricos, uma passada só
+        packed = np.fromiter(map(int, ids), dtype="<i8", count=len(ids)).tobytes()
+        keep = None
+    except ValueError:
+        keep = [i for i, content_id in enumerate(ids) if str(content_id).isdigit()]
+        packed = np.asarray([int(ids[i]) for i in keep], dtype="<i8").tobytes()
+    if scores is not None:
+        scores = scores if keep is None else [scores[i] for i in keep]
+        packed += np.asarray(scores, dtype="<f4").tobytes()
+    return packed, len(ids) if keep is None else len(keep)
+
+def binary_response(media_type, ids, scores=None, headers=None):
+    """Resposta binária; sem scores disponíveis o formato "ranked" cai para só IDs."""
+    if media_type == RANKED_MEDIA_TYPE and scores is None:
+        media_type = IDS_MEDIA_TYPE
+    body, count = pack_ids(ids, scores if media_type == RANKED_MEDIA_TYPE else None)
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"X-Item-Count": str(count), **(headers or {})},
+    )
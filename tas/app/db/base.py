@@ -1,10 +1,13 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, String, Integer, JSON, DateTime
+from sqlalchemy import Column, String, Integer, JSON, DateTime, Index
 from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
 import numpy as np
 
 Base = declarative_base()
 
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2 (SARA)
+
 class ContentModel(Base):
     __tablename__ = "contents"
     id = Column(String, primary_key=True)
@@ -12,6 +15,23 @@ class ContentModel(Base):
     tags = Column(JSON)  # Armazena categorias como ["política", "real_life"]
     safety_label = Column(String) # 'safe', 'nsfw_soft', etc.
     author_id = Column(String)
-    # O campo embedding será tratado como ARRAY para busca vetorial
-    embedding = Column(JSON) 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    # Vetor nativo do pgvector: a busca usa o índice HNSW em vez de varrer a tabela
+    embedding = Column(Vector(EMBEDDING_DIM))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Muda a cada reingestão: é o watermark do catch-up do índice ANN (IndexService)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Índice ANN por distância de cosseno (operador <=>)
+        Index(
+            "contents_embedding_hnsw_idx",
+            embedding,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        # Conteúdo recente de autores seguidos (candidate_gen)
+        Index("contents_author_recent_idx", author_id, created_at.desc()),
+        # Catch-up incremental do índice ANN
+        Index("contents_updated_idx", updated_at),
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class EngagementWindowModel(Base):
+    """Contadores de engajamento por janela fixa (tumbling window) de conteúdo ou usuário."""
+    __tablename__ = "engagement_windows"
+    entity_type = Column(String, primary_key=True)   # 'content' | 'user'
+    entity_id = Column(String, primary_key=True)
+    window_start = Column(DateTime(timezone=True), primary_key=True)
+    clicks = Column(Integer, default=0)
+    likes = Column(Integer, default=0)
+    comments = Column(Integer, default=0)
+    shares = Column(Integer, default=0)
+    watch_time = Column(Float, default=0.0)          # Segundos
+
+class ProcessedEventModel(Base):
+    """
+    Entradas do log de eventos já somadas às janelas (id do Redis Stream ou offset do log local).
+    Gravadas na mesma transação do upsert: uma reentrega do lote não conta duas vezes.
+    """
+    __tablename__ = "processed_events"
+    entry_id = Column(String, primary_key=True)
+    processed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("processed_events_at_idx", processed_at),)
@@ -1,9 +1,20 @@
-from sqlalchemy import Column, String, JSON
-from app.db.base import Base
+from sqlalchemy import Column, String, JSON, Float, DateTime
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+from app.db.base import Base, EMBEDDING_DIM
 
 class UserProfileModel(Base):
     __tablename__ = "user_profiles"
     user_id = Column(String, primary_key=True)
     blacklisted_tags = Column(JSON, default=[])      # O que ele NUNCA quer ver
     blacklisted_authors = Column(JSON, default=[])   # Quem ele bloqueou
-    priority_interests = Column(JSON, default=[])    # O que ele quer ver MAIS
\ No newline at end of file
+    priority_interests = Column(JSON, default=[])    # O que ele quer ver MAIS
+    followed_authors = Column(JSON, default=[])      # Quem ele segue (fonte de candidatos)
+
+class UserVectorModel(Base):
+    __tablename__ = "user_vectors"
+    user_id = Column(String, primary_key=True)
+    # Média ponderada (com decaimento) dos embeddings com que o usuário interagiu
+    embedding = Column(Vector(EMBEDDING_DIM))
+    weight = Column(Float, default=0.0)              # Soma dos pesos já decaída até updated_at
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
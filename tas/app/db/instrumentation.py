@@ -0,0 +1,74 @@
+import logging
+import random
+import re
+import time
+from collections import deque
+import numpy as np
+from sqlalchemy import event
+
+STATS_WINDOW = 1000
+_PARAMS = re.compile(r"\$\d+(?:\s*,\s*\$\d+)*")   # IN ($1, $2, ...) de qualquer tamanho vira um "?"
+_SPACES = re.compile(r"\s+")
+
+logger = logging.getLogger(__name__)
+
+def fingerprint(statement: str, size: int = 160) -> str:
+    """Forma da consulta (sem parâmetros nem quebras de linha), para agrupar as métricas."""
+    return _SPACES.sub(" ", _PARAMS.sub("?", statement)).strip()[:size]
+
+class QueryStats:
+    """
+    Tempo das consultas SQL do worker (substitui o echo=True).
+
+    Toda consulta é cronometrada (dois perf_counter); uma amostra (`sample_rate`)
+    entra nos percentis, e as lentas (acima de `slow_ms`) sempre entram e viram um
+    WARNING no log. Nada é escrito por consulta comum: os agregados saem no `summary`.
+    """
+    def __init__(self, sample_rate: float = 0.01, slow_ms: float = 200.0, window: int = STATS_WINDOW):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.window = window
+        self.queries = 0
+        self.slow = 0
+        self._samples = {}   # fingerprint -> deque de ms
+
+    def record(self, statement, ms: float, rows: int = -1):
+        self.queries += 1
+        slow = ms >= self.slow_ms
+        if not slow and random.random() >= self.sample_rate:
+            return
+        self.slow += slow
+        key = fingerprint(statement)
+        self._samples.setdefault(key, deque(maxlen=self.window)).append(ms)
+        if slow:
+            logger.warning("Consulta lenta (%.1fms, %s linhas): %s", ms, rows, key)
+
+    def summary(self, top: int = 20):
+        stats = []
+        for key, values in self._samples.items():
+            p50, p99 = np.percentile(np.fromiter(values, dtype=np.float64), [50, 99])
+            stats.append({"statement": key, "samples": len(values), "p50": round(float(p50), 2), "p99": round(float(p99), 2)})
+        stats.sort(key=lambda s: s["p99"], reverse=True)
+        return {"queries": self.queries, "slow": self.slow, "sample_rate": self.sample_rate, "statements": stats[:top]}
+
+    def instrument(self, engine):
+        """Liga os eventos de cursor no engine (para AsyncEngine, no sync_engine dele)."""
+        target = getattr(engine, "sync_engine", engine)
+
+        @event.listens_for(target, "before_cursor_execute")
+        def _start(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        @event.listens_for(target, "after_cursor_execute")
+        def _stop(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info["query_started"].pop()
+            self.record(statement, (time.perf_counter() - started) * 1000, getattr(cursor, "rowcount", -1))
+
+        @event.listens_for(target, "handle_error")
+        def _error(exception_context):
+            # Consulta que falhou não passa pelo after_cursor_execute: descarta o início pendente
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("query_started"):
+                conn.info["query_started"].pop()
+
+        return engine
@@ -1,4 +1,6 @@
 from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
 from app.db.base import ContentModel
 import traceback
 
@@ -18,5 +20,38 @@ class ContentRepository:
             raise e
 
     async def get_candidates(self, limit=500):
-        result = await self.db.execute(select(ContentModel).limit(limit))
-        return result.scalars().all()
\ No newline at end of file
+        # Sem vetor do usuário: os mais recentes
+        result = await self.db.execute(
+            select(ContentModel).order_by(ContentModel.created_at.desc()).limit(limit)
+        )
+        return result.scalars().all()
+
+    async def get_by_ids(self, ids):
+        if not ids:
+            return []
+        result = await self.db.execute(select(ContentModel).where(ContentModel.id.in_(ids)))
+        return result.scalars().all()
+
+    async def bulk_upsert(self, rows: list):
+        """
+        Grava um lote inteiro em um único INSERT multi-linha (upsert por id),
+        com um só commit. Reingestões (backfill) atualizam a linha existente.
+        """
+        if not rows:
+            return 0
+        stmt = insert(ContentModel).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ContentModel.id],
+            set_={
+                "title": stmt.excluded.title,
+                "tags": stmt.excluded.tags,
+                "safety_label": stmt.excluded.safety_label,
+                "author_id": stmt.excluded.author_id,
+                "embedding": stmt.excluded.embedding,
+                # O catch-up dos outros workers lê por updated_at (created_at não muda)
+                "updated_at": func.now(),
+            },
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+        return len(rows)
@@ -0,0 +1,19 @@
+from app.db.base_user import UserProfileModel
+
+class ProfileRepository:
+    def __init__(self, db_session):
+        self.db = db_session
+
+    @staticmethod
+    def to_dict(profile: UserProfileModel):
+        return {
+            "blacklisted_tags": profile.blacklisted_tags or [],
+            "blacklisted_authors": profile.blacklisted_authors or [],
+            "priority_interests": profile.priority_interests or [],
+            "followed_authors": profile.followed_authors or [],
+        }
+
+    async def get_profile(self, user_id):
+        """Regras de soberania do utilizador (dict para o Thalamus), ou None se não houver perfil."""
+        profile = await self.db.get(UserProfileModel, str(user_id))
+        return self.to_dict(profile) if profile is not None else None
@@ -1,6 +1,5 @@
-from sqlalchemy import text
+from sqlalchemy import select
 from app.db.base import ContentModel
-import json
 
 class SearchRepository:
     def __init__(self, db_session):
@@ -9,18 +8,23 @@ class SearchRepository:
     async def semantic_search(self, query_vector, limit=10):
         """
         Executa busca por similaridade de cosseno diretamente no SQL.
-        Nota: O pgvector no Supabase usa o operador <=> para distância de cosseno.
+        O vetor vai como parâmetro (tipo vector) e o ORDER BY <=> usa o
+        índice HNSW de contents.embedding, sem varrer a tabela inteira.
         """
-        # Transformamos o vetor em string para o SQL
-        vector_str = str(query_vector)
-        
-        # Query otimizada para buscar os mais próximos
-        query = text(f"""
-            SELECT id, title, tags, safety_label, author_id, embedding
-            FROM contents
-            ORDER BY embedding::jsonb <=> :vector::jsonb
-            LIMIT :limit
-        """)
-        
-        result = await self.db.execute(query, {"vector": vector_str, "limit": limit})
-        return result.fetchall()
\ No newline at end of file
+        distance = ContentModel.embedding.cosine_distance(query_vector)
+        query = (
+            select(
+                ContentModel.id,
+                ContentModel.title,
+                ContentModel.tags,
+                ContentModel.safety_label,
+                ContentModel.author_id,
+                ContentModel.embedding,
+            )
+            .where(ContentModel.embedding.is_not(None))
+            .order_by(distance)
+            .limit(limit)
+        )
+
+        result = await self.db.execute(query)
+        return result.fetchall()
@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from uuid import uuid4
 import os
 from dotenv import load_dotenv
+from app.db.instrumentation import QueryStats
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -9,18 +11,74 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL.startswith("postgresql://"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-# A CORREÇÃO: statement_cache_size=0 desativa os prepared statements que o PgBouncer bloqueia
-engine = create_async_engine(
-    DATABASE_URL, 
-    echo=True, 
-    pool_pre_ping=True,
-    connect_args={
-        "statement_cache_size": 0,
-        "prepared_statement_cache_size": 0
+# Conexões do TAS inteiro (todos os workers do gunicorn somados); cada worker fica com uma fatia
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "60"))
+# "pgbouncer": modo transação sem prepared statements (padrão, o pooler do Supabase na 6543)
+# "pgbouncer_prepared": PgBouncer >= 1.21 com max_prepared_statements (mantém o cache)
+# "none": conexão direta ao Postgres
+DB_POOLER = os.getenv("DB_POOLER", "pgbouncer")
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))   # O pooler/firewall derruba conexões ociosas
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "2"))    # Falha rápido em vez de enfileirar requests
+DB_QUERY_SAMPLE_RATE = float(os.getenv("DB_QUERY_SAMPLE_RATE", "0.01"))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+
+query_stats = QueryStats(sample_rate=DB_QUERY_SAMPLE_RATE, slow_ms=DB_SLOW_QUERY_MS)
+
+def pool_limits(workers: int = None, max_connections: int = DB_MAX_CONNECTIONS):
+    """
+    (pool_size, max_overflow) de um worker: a fatia de `max_connections` dividida pelos
+    workers (WEB_CONCURRENCY, exportado pelo gunicorn_conf), então o total fica limitado
+    por mais workers que subam. DB_POOL_SIZE / DB_MAX_OVERFLOW sobrescrevem.
+    """
+    workers = workers or int(os.getenv("WEB_CONCURRENCY", "1"))
+    per_worker = max(max_connections // max(workers, 1), 2)
+    overflow = per_worker // 4
+    return (
+        int(os.getenv("DB_POOL_SIZE", per_worker - overflow)),
+        int(os.getenv("DB_MAX_OVERFLOW", overflow)),
+    )
+
+def statement_cache_args(pooler: str = DB_POOLER):
+    """connect_args do asyncpg para cada tipo de conexão (PgBouncer em modo transação troca o backend a cada transação)."""
+    if pooler == "none":
+        return {}
+    # Nomes únicos: o mesmo backend nunca vê dois "__asyncpg_stmt_1__" de clientes diferentes
+    args = {"prepared_statement_name_func": lambda: f"__asyncpg_{uuid4().hex}__"}
+    if pooler != "pgbouncer_prepared":
+        # Sem o rastreamento do PgBouncer um prepared statement não sobrevive à transação
+        args.update({"statement_cache_size": 0, "prepared_statement_cache_size": 0})
+    return args
+
+def build_engine(url: str = DATABASE_URL, workers: int = None, pooler: str = DB_POOLER, **overrides):
+    pool_size, max_overflow = pool_limits(workers)
+    options = {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+        "connect_args": {
+            **statement_cache_args(pooler),
+            "server_settings": {"application_name": "tas-engine"},
+        },
+        **overrides,
     }
-)
+    return query_stats.instrument(create_async_engine(url, **options))
+
+engine = build_engine()
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+def pool_status():
+    """Conexões deste worker agora e o teto configurado."""
+    pool = engine.sync_engine.pool
+    pool_size, max_overflow = pool_limits()
+    return {
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "limit": pool_size + max_overflow,
+    }
+
 async def get_db():
     async with async_session() as session:
-        yield session
\ No newline at end of file
+        yield session
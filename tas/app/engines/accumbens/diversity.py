@@ -0,0 +1,105 @@
+import numpy as np
+from app.db.base import EMBEDDING_DIM
+from app.engines.sara.vector_search import SaraEngine
+
+# Ajuste por contexto:
+#   relevance  peso da relevância no MMR (1.0 = ordem pura do Accumbens, 0.0 = só diversidade)
+#   window     quantos do topo do ranking entram na re-ordenação
+#   slots      quantas posições do feed o MMR preenche (o resto segue a ordem do score)
+#   author_cap / tag_cap  máximo de itens por autor / por tag dentro dos slots
+DIVERSITY_CONTEXTS = {
+    "YOURLIFE_FEED": {"relevance": 0.7, "window": 200, "slots": 60, "author_cap": 3, "tag_cap": 6},
+    "STUDY": {"relevance": 0.85, "window": 200, "slots": 60, "author_cap": 5, "tag_cap": 12},
+    "GLOBAL_SEARCH": {"relevance": 0.8, "window": 200, "slots": 50, "author_cap": 4, "tag_cap": 8},
+}
+DEFAULT_CONTEXT = "YOURLIFE_FEED"
+
+class DiversityReranker:
+    """
+    Re-ranking por Maximal Marginal Relevance depois do Accumbens.
+
+    A cada passo escolhe o item que maximiza
+        relevance * score - (1 - relevance) * (maior cosseno com os já escolhidos)
+    respeitando os tetos por autor e por tag. Quando todos os restantes já estão acima
+    de algum teto, as contagens recomeçam (um novo bloco de slots com os mesmos tetos),
+    em vez de despejar o resto na ordem do score. A matriz de similaridade da janela é
+    um único produto de matrizes; cada passo do laço é O(janela): uma subtração,
+    um argmax e um máximo corrente.
+    """
+    def __init__(self, contexts=DIVERSITY_CONTEXTS):
+        self.contexts = contexts
+
+    def config(self, context):
+        return self.contexts.get(context) or self.contexts[DEFAULT_CONTEXT]
+
+    @staticmethod
+    def _vectors(candidates):
+        """Linhas já normalizadas pela SARA (sara_vector); sem elas, empilha os embeddings."""
+        if all(c.get("sara_vector") is not None for c in candidates):
+            return np.stack([c["sara_vector"] for c in candidates])
+        return SaraEngine.stack(candidates)[0]
+
+    def rerank(self, candidates, scores, context=None):
+        """
+        Índices dos candidatos na ordem final. `candidates` e `scores` já vêm na ordem
+        do Accumbens (score decrescente).
+        """
+        n = len(candidates)
+        cfg = self.config(context)
+        window = min(n, cfg["window"])
+        slots = min(window, cfg["slots"])
+        if slots <= 1:
+            return np.arange(n)
+
+        top = candidates[:window]
+        vectors = self._vectors(top).reshape(window, EMBEDDING_DIM)
+        lam = cfg["relevance"]
+        # Já escalada por (1 - relevance): o passo do MMR vira uma subtração só
+        penalty = (1 - lam) * (vectors @ vectors.T)
+
+        # Relevância em [0, 1] dentro da janela (o score do Accumbens não tem escala fixa)
+        relevance = np.asarray(scores[:window], dtype=np.float32)
+        spread = relevance.max() - relevance.min()
+        relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones(window, dtype=np.float32)
+        base = lam * relevance
+        gain = base.copy()   # -inf = já escolhido ou acima de algum teto
+
+        # Autores e tags viram grupos de índices da janela (sem autor = sem teto)
+        groups, item_groups = {}, []
+        for i, c in enumerate(top):
+            author = c.get("author_id")
+            keys = [("author", author)] if author is not None else []
+            keys += [("tag", tag) for tag in set(c.get("tags") or ())]
+            for key in keys:
+                groups.setdefault(key, []).append(i)
+            item_groups.append(keys)
+        caps = {"author": cfg["author_cap"], "tag": cfg["tag_cap"]}
+        counts = dict.fromkeys(groups, 0)
+
+        max_penalty = np.zeros(window, dtype=np.float32)
+        mmr = np.empty(window, dtype=np.float32)
+        order = []
+        for _ in range(slots):
+            np.subtract(gain, max_penalty, out=mmr)
+            j = int(mmr.argmax())
+            if mmr[j] == -np.inf:
+                # Todos bloqueados pelos tetos: relaxa zerando as contagens (slots <= janela,
+                # então sempre sobra alguém); seguir a ordem do score juntaria o autor dominante
+                counts = dict.fromkeys(groups, 0)
+                gain = base.copy()
+                gain[order] = -np.inf
+                np.subtract(gain, max_penalty, out=mmr)
+                j = int(mmr.argmax())
+            order.append(j)
+            gain[j] = -np.inf
+            np.maximum(max_penalty, penalty[j], out=max_penalty)
+            for key in item_groups[j]:
+                counts[key] += 1
+                if counts[key] == caps[key[0]]:
+                    gain[groups[key]] = -np.inf
+
+        chosen = np.zeros(n, dtype=bool)
+        chosen[order] = True
+        return np.concatenate([np.asarray(order, dtype=np.intp), np.flatnonzero(~chosen)])
+
+diversity_reranker = DiversityReranker()
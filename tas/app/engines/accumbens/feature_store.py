@@ -0,0 +1,169 @@
+import heapq
+import math
+import time
+from collections import defaultdict, deque
+import numpy as np
+from app.core.redis_client import get_redis
+from app.engines.accumbens.scoring_math import DopamineWeights
+
+FEATURES = ("clicks", "likes", "comments", "shares", "watch_time")
+FEATURE_BY_EVENT = {
+    "click": "clicks",
+    "like": "likes",
+    "comment": "comments",
+    "share": "shares",
+    "watch_time": "watch_time",
+}
+FEATURE_HALF_LIFE = 6 * 3600.0   # Engajamento de 6h atrás vale metade
+EPOCH_SECONDS = 7 * 86400        # Cada época tem suas próprias chaves (evita overflow do exp)
+TRENDING_CACHE_SECONDS = 5.0     # O top do trending é relido no máximo a cada 5s por worker
+RECENT_LIKES_PER_USER = 20
+
+class FeatureStore:
+    """
+    Contadores de engajamento por conteúdo com decaimento exponencial.
+
+    Cada incremento é gravado já escalado por exp(λ·(t - início_da_época)), então a
+    atualização é um HINCRBYFLOAT (sem ler antes, sem corrida entre consumidores) e
+    o valor decaído é lido multiplicando por exp(-λ·(agora - início_da_época)).
+    Lemos a época atual e a anterior; as mais velhas já decaíram para ~0 (2^-28).
+
+    Alimentado pelo consumidor de eventos, também guarda as fontes compartilhadas da
+    geração de candidatos: o trending (ZSET `trend:<época>` com o peso do DopamineWeights,
+    mesma escala e meia-vida) e as últimas curtidas de cada usuário (lista `likes:<user>`).
+    """
+    def __init__(self, half_life: float = FEATURE_HALF_LIFE, redis_client=None):
+        self.decay = math.log(2) / half_life
+        self._redis = redis_client
+        self._local = defaultdict(lambda: defaultdict(float))  # Sem Redis: só este processo
+        self._local_likes = defaultdict(lambda: deque(maxlen=RECENT_LIKES_PER_USER))
+        self._trending = ([], 0.0)
+
+    @property
+    def redis(self):
+        return self._redis or get_redis()
+
+    @staticmethod
+    def _epoch(ts: float) -> int:
+        return int(ts // EPOCH_SECONDS) * EPOCH_SECONDS
+
+    @staticmethod
+    def _key(epoch: int, content_id) -> str:
+        return f"feat:{epoch}:{content_id}"
+
+    @staticmethod
+    def _trend_key(epoch: int) -> str:
+        return f"trend:{epoch}"
+
+    @staticmethod
+    def _likes_key(user_id) -> str:
+        return f"likes:{user_id}"
+
+    async def add(self, events):
+        """Incrementa os contadores, o trending e as curtidas recentes com um lote de eventos (um pipeline)."""
+        increments = defaultdict(float)
+        trending = defaultdict(float)
+        likes = {}   # user_id -> curtidas do lote, da mais nova para a mais antiga
+        for event in events:
+            event_type = event.get("event_type")
+            feature = FEATURE_BY_EVENT.get(event_type)
+            if feature is None:
+                continue
+            ts = event["ts"]
+            epoch = self._epoch(ts)
+            growth = math.exp(self.decay * (ts - epoch))
+            amount = float(event.get("value", 1.0)) if feature == "watch_time" else 1.0
+            increments[(self._key(epoch, event["content_id"]), feature)] += amount * growth
+            trending[(self._trend_key(epoch), str(event["content_id"]))] += \
+                DopamineWeights.for_event(event_type, float(event.get("value", 1.0))) * growth
+            if event_type in ("like", "share"):
+                content_id = str(event["content_id"])
+                user_likes = likes.setdefault(str(event["user_id"]), [])
+                if content_id in user_likes:
+                    user_likes.remove(content_id)
+                user_likes.insert(0, content_id)
+
+        if self.redis is None:
+            for (key, feature), amount in increments.items():
+                self._local[key][feature] += amount
+            for (key, content_id), amount in trending.items():
+                self._local[key][content_id] += amount
+            for user_id, content_ids in likes.items():
+                recent = self._local_likes[user_id]
+                for content_id in reversed(content_ids):
+                    if content_id in recent:
+                        recent.remove(content_id)
+                    recent.appendleft(content_id)
+            return len(increments)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for (key, feature), amount in increments.items():
+                pipe.hincrbyfloat(key, feature, amount)
+            for (key, content_id), amount in trending.items():
+                pipe.zincrby(key, amount, content_id)
+            for key in {key for key, _ in increments} | {key for key, _ in trending}:
+                pipe.expire(key, 2 * EPOCH_SECONDS)
+            for user_id, content_ids in likes.items():
+                key = self._likes_key(user_id)
+                for content_id in content_ids:
+                    pipe.lrem(key, 0, content_id)
+                pipe.lpush(key, *reversed(content_ids))
+                pipe.ltrim(key, 0, RECENT_LIKES_PER_USER - 1)
+                pipe.expire(key, EPOCH_SECONDS)
+            await pipe.execute()
+        return len(increments)
+
+    async def trending(self, limit: int = 100, now: float = None):
+        """IDs com maior engajamento decaído (todos os workers), do mais quente para o mais frio."""
+        cached, computed_at = self._trending
+        if time.time() - computed_at <= TRENDING_CACHE_SECONDS and len(cached) >= limit:
+            return cached[:limit]
+
+        now = now or time.time()
+        current = self._epoch(now)
+        size = max(limit, 100)
+        scores = defaultdict(float)
+        for epoch in (current, current - EPOCH_SECONDS):
+            key = self._trend_key(epoch)
+            if self.redis is None:
+                top = heapq.nlargest(size, self._local[key].items(), key=lambda kv: kv[1]) if key in self._local else []
+            else:
+                top = await self.redis.zrevrange(key, 0, size - 1, withscores=True)
+            scale = math.exp(-self.decay * (now - epoch))
+            for content_id, score in top:
+                content_id = content_id.decode() if isinstance(content_id, bytes) else content_id
+                scores[content_id] += score * scale
+
+        cached = [content_id for content_id, _ in heapq.nlargest(size, scores.items(), key=lambda kv: kv[1])]
+        self._trending = (cached, time.time())
+        return cached[:limit]
+
+    async def recent_likes(self, user_id, limit: int = 5):
+        """Últimas curtidas/compartilhamentos do usuário, da mais nova para a mais antiga."""
+        if self.redis is None:
+            return list(self._local_likes.get(str(user_id), ()))[:limit]
+        raw = await self.redis.lrange(self._likes_key(user_id), 0, limit - 1)
+        return [c.decode() if isinstance(c, bytes) else c for c in raw]
+
+    async def get_many(self, content_ids, now: float = None):
+        """Matriz (n x len(FEATURES)) de contadores decaídos até `now`, em um round trip."""
+        now = now or time.time()
+        current = self._epoch(now)
+        epochs = (current, current - EPOCH_SECONDS)
+        keys = [self._key(epoch, content_id) for content_id in content_ids for epoch in epochs]
+
+        if self.redis is None:
+            raw = [[self._local[key].get(f) if key in self._local else None for f in FEATURES] for key in keys]
+        else:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.hmget(key, *FEATURES)
+                raw = await pipe.execute()
+
+        values = np.array(
+            [[float(v) if v is not None else 0.0 for v in row] for row in raw], dtype=np.float64
+        ).reshape(len(content_ids), len(epochs), len(FEATURES))
+        scale = np.exp(-self.decay * (now - np.array(epochs, dtype=np.float64)))
+        return np.einsum("nef,e->nf", values, scale)
+
+feature_store = FeatureStore()
@@ -0,0 +1,66 @@
+import hashlib
+import numpy as np
+from app.core.redis_client import get_redis
+
+BLOOM_BITS = 1 << 16         # 8 KB por usuário: ~0,5% de falso positivo com 5 mil itens vistos
+BLOOM_HASHES = 4
+BLOOM_TTL = 7 * 86400        # O filtro expira (e zera) uma semana depois da última impressão
+
+class ImpressionFilter:
+    """
+    Filtro de Bloom por usuário com o que ele já viu (Redis bitmap `imp:<user_id>`).
+    A checagem de um lote inteiro é um GET do bitmap e um teste vetorizado no NumPy.
+    """
+    def __init__(self, bits: int = BLOOM_BITS, hashes: int = BLOOM_HASHES, redis_client=None):
+        self.bits = bits
+        self.hashes = hashes
+        self._redis = redis_client
+        self._local = {}  # Sem Redis: só este processo
+
+    @property
+    def redis(self):
+        return self._redis or get_redis()
+
+    @staticmethod
+    def _key(user_id) -> str:
+        return f"imp:{user_id}"
+
+    def _positions(self, content_ids):
+        """Matriz (n x hashes) com as posições de bit de cada item."""
+        digests = b"".join(hashlib.blake2b(str(c).encode(), digest_size=4 * self.hashes).digest() for c in content_ids)
+        return (np.frombuffer(digests, dtype="<u4").reshape(-1, self.hashes) % self.bits).astype(np.int64)
+
+    async def add(self, user_id, content_ids):
+        if not content_ids:
+            return
+        positions = self._positions(content_ids).ravel()
+        if self.redis is None:
+            bitmap = self._local.setdefault(user_id, np.zeros(self.bits, dtype=bool))
+            bitmap[positions] = True
+            return
+        key = self._key(user_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for position in np.unique(positions):
+                pipe.setbit(key, int(position), 1)
+            pipe.expire(key, BLOOM_TTL)
+            await pipe.execute()
+
+    async def seen(self, user_id, content_ids):
+        """Array booleano: True se o item (provavelmente) já foi visto pelo usuário."""
+        if not content_ids:
+            return np.zeros(0, dtype=bool)
+        if self.redis is None:
+            bitmap = self._local.get(user_id)
+            if bitmap is None:
+                return np.zeros(len(content_ids), dtype=bool)
+        else:
+            raw = await self.redis.get(self._key(user_id))
+            if not raw:
+                return np.zeros(len(content_ids), dtype=bool)
+            # SETBIT usa o bit mais significativo primeiro em cada byte
+            bitmap = np.unpackbits(np.frombuffer(raw, dtype=np.uint8))
+            if len(bitmap) < self.bits:
+                bitmap = np.concatenate([bitmap, np.zeros(self.bits - len(bitmap), dtype=np.uint8)])
+        return bitmap[self._positions(content_ids)].astype(bool).all(axis=1)
+
+impression_filter = ImpressionFilter()
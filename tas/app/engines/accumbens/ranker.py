@@ -1,26 +1,56 @@
+import asyncio
+import numpy as np
+from app.engines.accumbens.scoring_math import DopamineWeights
+from app.engines.accumbens.feature_store import FeatureStore, feature_store
+from app.engines.accumbens.impressions import impression_filter
+from app.engines.accumbens.diversity import DiversityReranker, diversity_reranker
+
+SARA_WEIGHT = 50.0          # Afinidade da SARA (0 a 1) vira 0 a 50 pontos
+
 class AccumbensRanker:
     """
     Juiz Final: Decide a ordem baseada em probabilidade de engajamento.
-    Pesos: Share > Comment > Like > Click
+    Pesos: Share > Comment > Like > Click (DopamineWeights)
     """
-    def __init__(self):
-        self.weights = {
-            "share": 10.0,
-            "comment": 5.0,
-            "like": 2.0,
-            "click": 1.0
-        }
+    def __init__(self, features: FeatureStore = feature_store, impressions=impression_filter,
+                 diversity: DiversityReranker = diversity_reranker):
+        self.features = features
+        self.impressions = impressions
+        self.diversity = diversity
+        # Mesma ordem de feature_store.FEATURES; watch_time em "cliques" por WATCH_TIME_UNIT
+        self.weights = np.array([
+            DopamineWeights.CLICK,
+            DopamineWeights.LIKE,
+            DopamineWeights.COMMENT,
+            DopamineWeights.SHARE,
+            DopamineWeights.CLICK / DopamineWeights.WATCH_TIME_UNIT,
+        ])
+
+    async def rank(self, candidates, user_id=None, context=None):
+        """Lê os sinais no Redis (event loop) e ordena numa thread, para o prazo da etapa valer."""
+        if not candidates:
+            return []
+        ids = [str(c["id"]) for c in candidates]
+
+        # Um round trip para os contadores do lote inteiro + um para o filtro de vistos
+        counts = await self.features.get_many(ids)
+        seen = await self.impressions.seen(user_id, ids) if user_id else np.zeros(len(ids), dtype=bool)
+        return await asyncio.to_thread(self.rank_sync, candidates, ids, counts, seen, context)
+
+    def rank_sync(self, candidates, ids, counts, seen, context=None):
+        """Só CPU: score, ordenação e re-ranking de diversidade."""
+        sara = np.array([c.get("sara_score", 0.5) for c in candidates], dtype=np.float64)
+        # log1p: o engajamento soma ao score sem engolir a afinidade em posts virais
+        engagement = np.log1p(counts @ self.weights)
+        scores = sara * SARA_WEIGHT + engagement + seen * DopamineWeights.BOREDOM_PENALTY
 
-    async def rank(self, candidates):
-        for c in candidates:
-            # Cálculo de score baseado em comportamento (simulado por enquanto)
-            engagement_score = (
-                c.get("predicted_shares", 0) * self.weights["share"] +
-                c.get("predicted_likes", 0) * self.weights["like"]
-            )
-            # Soma a afinidade da SARA (0 a 1) multiplicada por um fator de peso
-            c["final_score"] = (c.get("sara_score", 0.5) * 50) + engagement_score
-            
-        return [str(c["id"]) for c in sorted(candidates, key=lambda x: x["final_score"], reverse=True)]
+        order = np.argsort(-scores, kind="stable")
+        for i, c in enumerate(candidates):
+            c["final_score"] = float(scores[i])
+        # MMR + tetos por autor/tag: um autor prolífico não toma o feed inteiro
+        order = order[self.diversity.rerank([candidates[i] for i in order], scores[order], context)]
+        # Vistos só entram pelo consumidor de eventos (impressões que o Bird renderizou de fato):
+        # refresh do cache e requisições hedged não marcam nada
+        return [ids[i] for i in order]
 
-accumbens_ranker = AccumbensRanker()
\ No newline at end of file
+accumbens_ranker = AccumbensRanker()
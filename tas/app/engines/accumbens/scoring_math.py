@@ -3,4 +3,22 @@ class DopamineWeights:
     LIKE = 3.0
     COMMENT = 6.0
     SHARE = 12.0  # Maior recompensa para o motor
-    BOREDOM_PENALTY = -5.0 # Penalidade para conteúdo repetido
\ No newline at end of file
+    IMPRESSION = 0.0  # Só exibido: marca como visto, sem sinal de interesse
+    BOREDOM_PENALTY = -5.0 # Penalidade para conteúdo repetido
+
+    WATCH_TIME_UNIT = 10.0  # Segundos assistidos que valem um clique
+    WATCH_TIME_CAP = 5.0    # Teto (em cliques) de um único evento de watch_time
+
+    @classmethod
+    def for_event(cls, event_type: str, value: float = 1.0) -> float:
+        """Peso de um estímulo do /events/track."""
+        if event_type == "watch_time":
+            return cls.CLICK * min(max(value, 0.0) / cls.WATCH_TIME_UNIT, cls.WATCH_TIME_CAP)
+        weight = {
+            "click": cls.CLICK,
+            "like": cls.LIKE,
+            "comment": cls.COMMENT,
+            "share": cls.SHARE,
+            "impression": cls.IMPRESSION,
+        }.get(event_type, cls.CLICK)
+        return weight * value
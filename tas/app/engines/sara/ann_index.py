@@ -0,0 +1,291 @@
+import os
+import shutil
+import time
+import numpy as np
+from app.db.base import EMBEDDING_DIM
+from app.engines.sara.encoders import normalize
+from app.engines.sara.vector_search import SaraEngine
+
+BRUTE_FORCE_MAX = 20_000   # Abaixo disso uma lista só (busca exata) é mais rápida que o IVF
+KMEANS_SAMPLE = 100_000    # Amostra usada para treinar os centróides
+KMEANS_ITERATIONS = 10
+DEFAULT_NPROBE = 16        # Listas visitadas por busca (recall x latência)
+
+class AnnIndex:
+    """
+    Índice ANN em memória (IVF sobre NumPy) dos embeddings de ContentModel.
+
+    - Base: vetores normalizados agrupados por centróide (k-means esférico), então cada
+      lista invertida é uma fatia contígua da matriz. O snapshot é salvo em .npy e
+      carregado com mmap, compartilhando as páginas entre os workers do gunicorn.
+    - Delta: conteúdos ingeridos depois do snapshot, buscados por força bruta.
+      Reingestões de um id da base marcam a linha antiga como apagada (tombstone).
+    """
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self._reset()
+
+    def _reset(self):
+        self.ids = np.empty(0, dtype=object)
+        self.vectors = np.empty((0, self.dim), dtype=np.float32)
+        self.centroids = np.empty((0, self.dim), dtype=np.float32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.deleted = np.zeros(0, dtype=bool)
+        self.watermark = 0.0   # updated_at (epoch) do conteúdo mais novo já indexado
+        self.version = None    # Snapshot carregado
+        self._id_order = np.empty(0, dtype=np.int64)
+        self._sorted_ids = np.empty(0, dtype=object)
+        self._delta_rows = {}
+        self._delta_ids = []
+        self._delta_vectors = []
+        self._delta_matrix = None
+
+    def __len__(self):
+        return len(self.ids) - int(self.deleted.sum()) + len(self._delta_ids)
+
+    # ----------------------------------------------------
+    # Construção
+    # ----------------------------------------------------
+    def build(self, ids, vectors, watermark: float = 0.0, nlist: int = None):
+        ids = np.asarray(ids, dtype=object)
+        vectors = normalize(vectors).reshape(-1, self.dim)
+        n = len(ids)
+        if n == 0:
+            self._reset()
+            self.watermark = watermark
+            return self
+
+        if nlist is None:
+            nlist = 1 if n <= BRUTE_FORCE_MAX else min(int(4 * np.sqrt(n)), 4096)
+        centroids = self._train(vectors, nlist) if nlist > 1 else vectors.mean(axis=0, keepdims=True)
+        assignments = self._assign(vectors, centroids)
+
+        order = np.argsort(assignments, kind="stable")
+        self._reset()
+        self.ids = ids[order]
+        self.vectors = np.ascontiguousarray(vectors[order])
+        self.centroids = normalize(centroids)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=len(centroids)))])
+        self.deleted = np.zeros(n, dtype=bool)
+        self.watermark = watermark
+        self._index_ids()
+        return self
+
+    @staticmethod
+    def _assign(vectors, centroids, chunk: int = 65_536):
+        if len(centroids) == 1:
+            return np.zeros(len(vectors), dtype=np.int64)
+        return np.concatenate([
+            np.argmax(vectors[i:i + chunk] @ centroids.T, axis=1)
+            for i in range(0, len(vectors), chunk)
+        ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+    def _train(self, vectors, nlist):
+        """K-means esférico (produto escalar) sobre uma amostra."""
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), KMEANS_SAMPLE), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            labels = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            sums[empty] = centroids[empty]  # Lista vazia mantém o centróide anterior
+            centroids = normalize(sums)
+        return centroids
+
+    def _index_ids(self):
+        self._id_order = np.argsort(self.ids).astype(np.int64) if len(self.ids) else np.empty(0, dtype=np.int64)
+        self._sorted_ids = self.ids[self._id_order]
+
+    def _base_row(self, content_id):
+        pos = np.searchsorted(self._sorted_ids, content_id)
+        if pos < len(self._sorted_ids) and self._sorted_ids[pos] == content_id:
+            return self._id_order[pos]
+        return None
+
+    # ----------------------------------------------------
+    # Atualização incremental (ingestão)
+    # ----------------------------------------------------
+    def upsert(self, ids, vectors, watermark: float = None):
+        if not len(ids):
+            return
+        vectors = normalize(vectors).reshape(-1, self.dim)
+        for content_id, vector in zip(ids, vectors):
+            content_id = str(content_id)
+            row = self._base_row(content_id)
+            if row is not None:
+                self.deleted[row] = True
+            if content_id in self._delta_rows:
+                self._delta_vectors[self._delta_rows[content_id]] = vector
+            else:
+                self._delta_rows[content_id] = len(self._delta_ids)
+                self._delta_ids.append(content_id)
+                self._delta_vectors.append(vector)
+        self._delta_matrix = None
+        if watermark:
+            self.watermark = max(self.watermark, watermark)
+
+    # ----------------------------------------------------
+    # Busca
+    # ----------------------------------------------------
+    def get_vectors(self, ids):
+        """Vetores indexados dos ids pedidos (os ausentes são ignorados)."""
+        vectors = []
+        for content_id in ids:
+            content_id = str(content_id)
+            if content_id in self._delta_rows:
+                vectors.append(self._delta_vectors[self._delta_rows[content_id]])
+                continue
+            row = self._base_row(content_id)
+            if row is not None and not self.deleted[row]:
+                vectors.append(np.asarray(self.vectors[row]))
+        return vectors
+
+    def vectors_for(self, ids):
+        """Matriz (n x dim) dos ids pedidos, na mesma ordem, e a máscara dos ausentes (linhas zeradas)."""
+        ids = np.asarray([str(content_id) for content_id in ids], dtype=object)
+        matrix = np.zeros((len(ids), self.dim), dtype=np.float32)
+        missing = np.ones(len(ids), dtype=bool)
+        if len(ids) and len(self._sorted_ids):
+            # Um searchsorted para o lote inteiro
+            pos = np.minimum(np.searchsorted(self._sorted_ids, ids), len(self._sorted_ids) - 1)
+            rows = self._id_order[pos]
+            found = (self._sorted_ids[pos] == ids) & ~self.deleted[rows]
+            matrix[found] = self.vectors[rows[found]]
+            missing[found] = False
+        if self._delta_rows:
+            for i, content_id in enumerate(ids):
+                row = self._delta_rows.get(content_id)
+                if row is not None:
+                    matrix[i] = self._delta_vectors[row]
+                    missing[i] = False
+        return matrix, missing
+
+    def search(self, query, k: int = 500, nprobe: int = DEFAULT_NPROBE):
+        """Top-k (id, score de cosseno) mais próximos do vetor `query`."""
+        if not len(self) or k <= 0:
+            return []
+        q = normalize(query)
+        ids, scores = [], []
+
+        if len(self.ids):
+            probe = SaraEngine.top_k(self.centroids @ q, nprobe)
+            for lst in probe:
+                start, end = self.offsets[lst], self.offsets[lst + 1]
+                if start == end:
+                    continue
+                list_scores = self.vectors[start:end] @ q
+                list_scores[self.deleted[start:end]] = -np.inf
+                ids.append(self.ids[start:end])
+                scores.append(list_scores)
+
+        if self._delta_ids:
+            if self._delta_matrix is None:
+                self._delta_matrix = np.asarray(self._delta_vectors, dtype=np.float32)
+            ids.append(np.asarray(self._delta_ids, dtype=object))
+            scores.append(self._delta_matrix @ q)
+
+        if not ids:
+            return []
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        top = [i for i in SaraEngine.top_k(scores, k) if np.isfinite(scores[i])]
+        return [(ids[i], float(scores[i])) for i in top]
+
+    # ----------------------------------------------------
+    # Snapshot
+    # ----------------------------------------------------
+    @staticmethod
+    def current_version(path):
+        try:
+            with open(os.path.join(path, "CURRENT")) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def compact(self):
+        """Incorpora o delta à base (sem retreinar os centróides)."""
+        if not self._delta_ids and not self.deleted.any():
+            return self
+        keep = ~self.deleted
+        ids = np.concatenate([self.ids[keep], np.asarray(self._delta_ids, dtype=object)])
+        delta = np.asarray(self._delta_vectors, dtype=np.float32).reshape(-1, self.dim)
+        vectors = np.concatenate([self.vectors[keep], delta])
+        centroids, watermark = self.centroids, self.watermark
+        if len(centroids):
+            assignments = self._assign(vectors, centroids)
+            order = np.argsort(assignments, kind="stable")
+            self._reset()
+            self.ids, self.vectors = ids[order], np.ascontiguousarray(vectors[order])
+            self.centroids = centroids
+            self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=len(centroids)))])
+            self.deleted = np.zeros(len(ids), dtype=bool)
+            self.watermark = watermark
+            self._index_ids()
+        else:
+            self.build(ids, vectors, watermark=watermark)
+        return self
+
+    def save(self, path, keep: int = 2):
+        """
+        Grava um snapshot versionado em `path/<versão>/` e troca o ponteiro CURRENT
+        de forma atômica; workers que estão lendo a versão anterior não são afetados.
+        """
+        self.compact()
+        version = f"v{int(time.time() * 1000)}"
+        target = os.path.join(path, version)
+        os.makedirs(target)
+        np.save(os.path.join(target, "ids.npy"), self.ids.astype(str))
+        np.save(os.path.join(target, "vectors.npy"), self.vectors)
+        np.save(os.path.join(target, "centroids.npy"), self.centroids)
+        np.save(os.path.join(target, "offsets.npy"), self.offsets)
+        np.save(os.path.join(target, "watermark.npy"), np.array(self.watermark))
+
+        tmp = os.path.join(path, f"CURRENT.{os.getpid()}")
+        with open(tmp, "w") as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(path, "CURRENT"))
+        self.version = version
+
+        # Mantém só as `keep` versões mais novas
+        old = sorted(d for d in os.listdir(path) if d.startswith("v") and d != version)
+        for d in old[:max(len(old) - (keep - 1), 0)]:
+            shutil.rmtree(os.path.join(path, d), ignore_errors=True)
+        return version
+
+    @classmethod
+    def read(cls, path, dim: int = EMBEDDING_DIM):
+        """Novo índice com o snapshot apontado por CURRENT (vetores via mmap), ou None se não houver."""
+        version = cls.current_version(path)
+        if version is None:
+            return None
+        source = os.path.join(path, version)
+        index = cls(dim)
+        index.ids = np.load(os.path.join(source, "ids.npy")).astype(object)
+        index.vectors = np.load(os.path.join(source, "vectors.npy"), mmap_mode="r")
+        index.centroids = np.load(os.path.join(source, "centroids.npy"))
+        index.offsets = np.load(os.path.join(source, "offsets.npy"))
+        index.watermark = float(np.load(os.path.join(source, "watermark.npy")))
+        index.deleted = np.zeros(len(index.ids), dtype=bool)
+        index.version = version
+        index._index_ids()
+        return index
+
+    def swap(self, other):
+        """
+        Passa a servir o estado de `other` numa única atribuição. Chamado no event loop,
+        depois de `read` ter montado o índice numa thread: nenhuma busca vê o índice pela metade,
+        e quem importou `ann_index` continua com a mesma referência.
+        """
+        self.__dict__ = other.__dict__
+        return self
+
+    def load(self, path):
+        """Carrega o snapshot apontado por CURRENT no próprio índice. False se não houver."""
+        fresh = self.read(path, self.dim)
+        if fresh is None:
+            return False
+        self.swap(fresh)
+        return True
+
+ann_index = AnnIndex()
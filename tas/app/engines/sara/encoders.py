@@ -1,20 +1,171 @@
+import asyncio
+import hashlib
+import re
+import threading
+from collections import OrderedDict
 import numpy as np
-try:
-    from sentence_transformers import SentenceTransformer
-    MODEL = SentenceTransformer('all-MiniLM-L6-v2')
-    print("✅ [SARA] Modelo de IA carregado.")
-except Exception as e:
-    print(f"⚠️ [SARA] Aviso: Falha ao carregar IA ({e}). Usando modo Fallback.")
-    MODEL = None
+import redis.asyncio as redis
+from app.core.redis_client import get_redis
+from app.engines.sara.hashing import hashed_embedder
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+BATCH_WINDOW = 0.005        # Segundos esperando outras chamadas para a mesma passada do modelo
+MAX_BATCH = 64
+CACHE_SIZE = 10_000         # Embeddings de consultas repetidas (LRU por processo)
+CACHE_TTL = 7 * 86400       # Nível Redis, compartilhado entre workers
+
+def normalize(matrix):
+    """Normaliza vetores (linhas) para norma 1; o cosseno vira um simples produto escalar."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+def text_key(text: str) -> str:
+    """Hash do texto normalizado (caixa e espaços não mudam o embedding em cache)."""
+    clean = re.sub(r"\s+", " ", text.strip().lower())
+    return hashlib.blake2b(clean.encode(), digest_size=16).hexdigest()
 
 class SaraEncoder:
-    def encode(self, text: str):
-        if MODEL:
+    """
+    Todos os vetores saem normalizados (norma 1), prontos para o SaraEngine.
+
+    - O modelo é carregado sob demanda (ou no master do gunicorn via `preload`,
+      e os workers o herdam por copy-on-write no fork)
+    - `aencode` junta chamadas concorrentes numa única passada do modelo
+    - Cache LRU + Redis por hash do texto normalizado
+    """
+    def __init__(self):
+        self._model = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._queue = []
+        self._flusher = None
+        self.stats = {"local": 0, "redis": 0, "miss": 0}   # Acertos do cache em aencode
+
+    # ----------------------------------------------------
+    # Modelo
+    # ----------------------------------------------------
+    @property
+    def model(self):
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                        self._model = SentenceTransformer(MODEL_NAME)
+                        print("✅ [SARA] Modelo de IA carregado.")
+                    except Exception as e:
+                        print(f"⚠️ [SARA] Aviso: Falha ao carregar IA ({e}). Usando modo Fallback.")
+                        self._model = None
+                    self._loaded = True
+        return self._model
+
+    def preload(self):
+        """Carrega o modelo agora (gunicorn on_starting, antes do fork dos workers)."""
+        return self.model is not None
+
+    def _forward(self, texts, batch_size: int = MAX_BATCH):
+        if self.model:
             try:
-                return MODEL.encode(text).tolist()
+                return self.model.encode(list(texts), batch_size=batch_size, normalize_embeddings=True).tolist()
             except:
                 pass
-        # Fallback: Gera um vetor determinístico baseado no texto para não quebrar o banco
-        return [float(ord(c)) / 1000 for c in text[:384]] + [0.0]*(384-len(text[:384]))
+        # Fallback: n-gramas com hashing (determinístico, similaridade lexical de verdade)
+        return hashed_embedder.embed(list(texts)).tolist()
+
+    # ----------------------------------------------------
+    # API síncrona
+    # ----------------------------------------------------
+    def encode(self, text: str):
+        key = text_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        vector = self._forward([text])[0]
+        self._cache_put(key, vector)
+        return vector
+
+    def encode_batch(self, texts, batch_size: int = 64):
+        """Codifica vários textos em uma única passada do modelo (ingestão em lote)."""
+        if not texts:
+            return []
+        return self._forward(texts, batch_size=batch_size)
+
+    # ----------------------------------------------------
+    # API assíncrona (micro-lotes + cache compartilhado)
+    # ----------------------------------------------------
+    async def aencode(self, text: str):
+        key = text_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.stats["local"] += 1
+            return cached
+
+        r = get_redis()
+        if r is not None:
+            try:
+                raw = await r.get(f"sara:emb:{key}")
+                if raw:
+                    vector = np.frombuffer(raw, dtype=np.float32).tolist()
+                    self.stats["redis"] += 1
+                    self._cache_put(key, vector)
+                    return vector
+            except redis.RedisError:
+                pass
+
+        self.stats["miss"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((text, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+        vector = await future
+
+        self._cache_put(key, vector)
+        if r is not None:
+            try:
+                await r.set(f"sara:emb:{key}", np.asarray(vector, dtype=np.float32).tobytes(), ex=CACHE_TTL)
+            except redis.RedisError:
+                pass
+        return vector
+
+    async def _flush(self):
+        while self._queue:
+            await asyncio.sleep(BATCH_WINDOW)
+            batch, self._queue = self._queue[:MAX_BATCH], self._queue[MAX_BATCH:]
+            try:
+                # Fora do event loop: a passada do modelo é CPU pura
+                vectors = await asyncio.to_thread(self._forward, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    # ----------------------------------------------------
+    # Cache LRU
+    # ----------------------------------------------------
+    def hit_rates(self):
+        total = sum(self.stats.values())
+        return {
+            **self.stats,
+            "total": total,
+            "hit_rate": (self.stats["local"] + self.stats["redis"]) / total if total else 0.0,
+        }
+
+    def _cache_get(self, key):
+        vector = self._cache.get(key)
+        if vector is not None:
+            self._cache.move_to_end(key)
+        return vector
+
+    def _cache_put(self, key, vector):
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
 
-sara_encoder = SaraEncoder()
\ No newline at end of file
+sara_encoder = SaraEncoder()
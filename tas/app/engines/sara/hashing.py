@@ -0,0 +1,130 @@
+import numpy as np
+
+# Constantes do hash polinomial (mod 2^64: o NumPy faz o wrap de uint64 sozinho)
+_P = np.uint64(0x100000001B3)                    # Primo do FNV-64
+_P_INV = np.uint64(pow(0x100000001B3, -1, 1 << 64))
+_BIGRAM = np.uint64(0x9E3779B97F4A7C15)
+_SALT_WORD = np.uint64(0x1)
+_SALT_BIGRAM = np.uint64(0x2)
+_SALT_CHAR = np.uint64(0x3)
+
+# Bytes que fazem parte de palavra: [0-9a-z] e qualquer byte >= 128 (acentos em UTF-8)
+_WORD_BYTES = np.zeros(256, dtype=bool)
+_WORD_BYTES[ord("0"):ord("9") + 1] = True
+_WORD_BYTES[ord("a"):ord("z") + 1] = True
+_WORD_BYTES[128:] = True
+
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.7
+CHAR_WEIGHT = 0.3
+IDF_BINS = 1 << 18
+
+def _mix(x):
+    """Finalizador do splitmix64: espalha os bits antes de escolher balde e sinal."""
+    with np.errstate(over="ignore"):
+        x = x ^ (x >> np.uint64(30))
+        x = x * np.uint64(0xBF58476D1CE4E5B9)
+        x = x ^ (x >> np.uint64(27))
+        x = x * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+_POWER_TABLES = {}
+
+def _powers(base, n):
+    """base⁰..baseⁿ⁻¹ (mod 2^64), de uma tabela que só cresce (reaproveitada entre lotes)."""
+    table = _POWER_TABLES.get(int(base))
+    if table is None or len(table) < n:
+        size = max(n, 2 * len(table) if table is not None else 1 << 16)
+        powers = np.full(size, base, dtype=np.uint64)
+        powers[0] = 1
+        with np.errstate(over="ignore"):
+            table = _POWER_TABLES[int(base)] = np.cumprod(powers, dtype=np.uint64)
+    return table[:n]
+
+def _buckets(hashes, n):
+    """Balde em [0, n) pelos 32 bits baixos (multiplica e desloca, sem divisão de 64 bits)."""
+    return (((hashes & np.uint64(0xFFFFFFFF)) * np.uint64(n)) >> np.uint64(32)).astype(np.int64)
+
+class HashedNgramEmbedder:
+    """
+    Embedder determinístico sem dependências (modo degradado da SARA).
+
+    Palavras, bigramas de palavras e trigramas de caracteres viram hashes de 64 bits,
+    calculados para o lote inteiro de uma vez sobre os bytes concatenados; cada hash
+    cai num dos `dim` baldes com sinal ±1 (feature hashing), opcionalmente pesado
+    por IDF, e o vetor final é normalizado (L2).
+    """
+    def __init__(self, dim: int = 384, idf=None):
+        self.dim = dim
+        self.idf = idf
+
+    def _features(self, texts):
+        parts = [t.lower().encode() for t in texts]
+        lengths = np.fromiter(map(len, parts), dtype=np.int64, count=len(parts))
+        # \x00 depois de cada texto: nenhuma palavra ou trigrama atravessa dois textos
+        data = np.frombuffer(b"\x00".join(parts) + b"\x00", dtype=np.uint8)
+        doc = np.repeat(np.arange(len(parts)), lengths + 1)
+        b = data.astype(np.uint64)
+
+        docs, hashes, weights = [], [], []
+        with np.errstate(over="ignore"):
+            # Palavras: soma prefixada de b[j]·P⁻ʲ; o trecho [s, e] vezes Pˢ independe da posição
+            word = _WORD_BYTES[data]
+            prev = np.concatenate([[False], word[:-1]])
+            nxt = np.concatenate([word[1:], [False]])
+            starts = np.flatnonzero(word & ~prev)
+            ends = np.flatnonzero(word & ~nxt)
+            if len(starts):
+                prefix = np.concatenate([[np.uint64(0)], np.cumsum(b * _powers(_P_INV, len(b)), dtype=np.uint64)])
+                word_hash = (prefix[ends + 1] - prefix[starts]) * _powers(_P, len(b))[starts]
+                docs.append(doc[starts])
+                hashes.append(word_hash + _SALT_WORD)
+                weights.append(np.full(len(starts), WORD_WEIGHT))
+
+                # Bigramas: palavras vizinhas do mesmo texto
+                same = doc[starts[1:]] == doc[starts[:-1]]
+                if same.any():
+                    bigram = word_hash[:-1][same] * _BIGRAM + word_hash[1:][same]
+                    docs.append(doc[starts[:-1]][same])
+                    hashes.append(bigram + _SALT_BIGRAM)
+                    weights.append(np.full(int(same.sum()), BIGRAM_WEIGHT))
+
+            # Trigramas de caracteres (inclui espaços: capturam início/fim de palavra)
+            if len(b) >= 3:
+                valid = (data[:-2] != 0) & (data[1:-1] != 0) & (data[2:] != 0)
+                tri = (b[:-2] * _P + b[1:-1]) * _P + b[2:]
+                docs.append(doc[:-2][valid])
+                hashes.append(tri[valid] + _SALT_CHAR)
+                weights.append(np.full(int(valid.sum()), CHAR_WEIGHT))
+
+        if not hashes:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint64), np.zeros(0)
+        return np.concatenate(docs), _mix(np.concatenate(hashes)), np.concatenate(weights)
+
+    def fit_idf(self, texts):
+        """Aprende pesos IDF (por balde de hash) a partir de um corpus de referência."""
+        docs, hashes, _ = self._features(texts)
+        bins = _buckets(hashes >> np.uint64(32), IDF_BINS)
+        pairs = np.unique(docs * IDF_BINS + bins)
+        df = np.bincount(pairs % IDF_BINS, minlength=IDF_BINS)
+        self.idf = np.log((1 + len(texts)) / (1 + df)) + 1.0
+        return self
+
+    def embed(self, texts):
+        """Matriz (n x dim) float32, linhas com norma 1 (zeros para texto vazio)."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float64)
+        if not len(texts):
+            return matrix.astype(np.float32)
+        docs, hashes, weights = self._features(texts)
+        if len(hashes):
+            if self.idf is not None:
+                weights = weights * self.idf[_buckets(hashes >> np.uint64(32), IDF_BINS)]
+            # Balde pelos bits baixos, sinal pelo bit mais alto
+            signs = 1.0 - 2.0 * (hashes >> np.uint64(63)).astype(np.float64)
+            matrix = np.bincount(
+                docs * self.dim + _buckets(hashes, self.dim), weights=signs * weights, minlength=len(texts) * self.dim
+            ).reshape(len(texts), self.dim)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0).astype(np.float32)
+
+hashed_embedder = HashedNgramEmbedder()
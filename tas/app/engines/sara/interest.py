@@ -0,0 +1,25 @@
+import math
+import numpy as np
+
+INTEREST_HALF_LIFE = 7 * 86400.0  # Interesses de uma semana atrás valem metade
+
+def decay_factor(elapsed: float, half_life: float = INTEREST_HALF_LIFE) -> float:
+    return math.exp(-math.log(2) * max(elapsed, 0.0) / half_life)
+
+def update_interest(mean, weight, elapsed, content_vectors, event_weights):
+    """
+    Média ponderada com decaimento exponencial:
+        W' = W·d + Σwᵢ
+        m' = (m·W·d + Σwᵢ·cᵢ) / W'
+    `mean` pode ser None (usuário novo). Devolve (m', W').
+    """
+    content_vectors = np.asarray(content_vectors, dtype=np.float32).reshape(-1, len(content_vectors[0]))
+    event_weights = np.asarray(event_weights, dtype=np.float32)
+    decayed = (weight or 0.0) * decay_factor(elapsed)
+    total = decayed + float(event_weights.sum())
+    if total <= 0:
+        return mean, weight
+    acc = event_weights @ content_vectors
+    if mean is not None and decayed > 0:
+        acc += np.asarray(mean, dtype=np.float32) * decayed
+    return acc / total, total
@@ -1,26 +1,75 @@
 import numpy as np
+from app.db.base import EMBEDDING_DIM
+from app.engines.sara.encoders import normalize
+
+NEUTRAL_SCORE = 0.5  # Afinidade de quem não tem vetor (ou de conteúdo sem embedding)
+
 class SaraEngine:
-    async def align(self, user_id, candidates, user_vector=None):
+    @staticmethod
+    def stack(candidates):
+        """
+        Empilha os embeddings dos candidatos numa matriz float32 contígua (n x 384).
+        Os embeddings já chegam normalizados da ingestão; linhas sem embedding ficam zeradas.
+        Retorna (matriz, máscara de quem não tem embedding).
+        """
+        present = [
+            i for i, c in enumerate(candidates)
+            if c.get("embedding") is not None and len(c["embedding"]) == EMBEDDING_DIM
+        ]
+        matrix = np.zeros((len(candidates), EMBEDDING_DIM), dtype=np.float32)
+        missing = np.ones(len(candidates), dtype=bool)
+        if present:
+            matrix[present] = np.asarray([candidates[i]["embedding"] for i in present], dtype=np.float32)
+            missing[present] = False
+        return matrix, missing
+
+    @staticmethod
+    def top_k(scores, k=None):
+        """Índices dos k maiores scores, em ordem decrescente (argpartition + sort só do top-k)."""
+        if k is None or k >= len(scores):
+            return np.argsort(-scores, kind="stable")
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        idx = np.argpartition(-scores, k - 1)[:k]
+        return idx[np.argsort(-scores[idx], kind="stable")]
+
+    def score(self, user_vector, matrix, missing=None):
+        """Cosseno de todos os candidatos com um único produto matriz-vetor."""
+        scores = matrix @ normalize(user_vector)
+        if missing is not None:
+            scores[missing] = NEUTRAL_SCORE
+        return scores
+
+    def align_sync(self, user_id, candidates, user_vector=None, top_k=None):
         """
         Alinha candidatos usando o vetor de interesse real do utilizador.
-        Se o utilizador não tem vetor, usamos um neutro.
+        Se o utilizador não tem vetor, todos recebem afinidade neutra e a ordem é mantida.
+        Só CPU: o pipeline do feed roda esta versão numa thread, com prazo.
         """
-        # Se não houver vetor de interesse, geramos um neutro
-        u_vec = np.array(user_vector) if user_vector else np.random.rand(384)
-        
-        for c in candidates:
-            # Recupera o embedding que salvamos no Supabase durante a ingestão
-            c_vec = np.array(c.get("embedding", np.random.rand(384)))
-            
-            # Cálculo de Similaridade de Cosseno (Afinidade Pura)
-            norm_u = np.linalg.norm(u_vec)
-            norm_c = np.linalg.norm(c_vec)
-            
-            if norm_u > 0 and norm_c > 0:
-                c["sara_score"] = float(np.dot(u_vec, c_vec) / (norm_u * norm_c))
-            else:
-                c["sara_score"] = 0.5
-                
-        return sorted(candidates, key=lambda x: x["sara_score"], reverse=True)
-
-sara_engine = SaraEngine()
\ No newline at end of file
+        if not candidates:
+            return []
+
+        if user_vector is None or len(user_vector) != EMBEDDING_DIM:
+            for c in candidates[:top_k]:
+                c["sara_score"] = NEUTRAL_SCORE
+            return candidates[:top_k]
+
+        matrix, missing = self.stack(candidates)
+        scores = self.score(user_vector, matrix, missing)
+        # Item do feed pré-calculado que saiu do índice: mantém o score gravado, nunca o neutro
+        for i in np.flatnonzero(missing):
+            stored = candidates[i].get("sara_score")
+            if stored is not None:
+                scores[i] = stored
+        aligned = []
+        for i in self.top_k(scores, top_k):
+            c = candidates[i]
+            c["sara_score"] = float(scores[i])
+            c["sara_vector"] = matrix[i]  # Linha normalizada, reaproveitada pelo re-ranking de diversidade
+            aligned.append(c)
+        return aligned
+
+    async def align(self, user_id, candidates, user_vector=None, top_k=None):
+        return self.align_sync(user_id, candidates, user_vector=user_vector, top_k=top_k)
+
+sara_engine = SaraEngine()
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from app.db.base import ContentModel
+from app.db.session import async_session
+from app.db.repositories.content_repository import ContentRepository
+from app.engines.sara.ann_index import ann_index
+from app.engines.accumbens.feature_store import feature_store
+
+SOURCE_BUDGET = 0.08   # Segundos por fonte; fonte atrasada é descartada, não atrasa o feed
+FRESH_WINDOW_DAYS = 7
+
+# Quanto cada fonte contribui (ordem = prioridade na deduplicação)
+SOURCE_QUOTAS = {
+    "ann": 300,
+    "followed": 100,
+    "liked_similar": 100,
+    "trending": 100,
+    "recent": 100,
+}
+
+class CandidateGenerator:
+    """
+    Geração de candidatos multi-fonte: todas as fontes rodam em paralelo, cada uma
+    com seu orçamento de tempo; o resultado é deduplicado e cada item carrega a
+    fonte que o trouxe ("source") e todas as que o encontraram ("sources").
+    """
+    def __init__(self, index=ann_index, features=feature_store, budget: float = SOURCE_BUDGET):
+        self.index = index
+        self.features = features
+        self.budget = budget
+
+    # ----------------------------------------------------
+    # Fontes (cada uma devolve IDs em ordem de relevância)
+    # ----------------------------------------------------
+    async def _ann(self, user_id, user_vector, followed_authors, limit):
+        if user_vector is None or not len(self.index):
+            return []
+        return [content_id for content_id, _ in self.index.search(user_vector, k=limit)]
+
+    async def _followed(self, user_id, user_vector, followed_authors, limit):
+        if not followed_authors:
+            return []
+        since = datetime.now(timezone.utc) - timedelta(days=FRESH_WINDOW_DAYS)
+        # Sessão própria: as fontes rodam em paralelo e a AsyncSession não é concorrente
+        async with async_session() as session:
+            result = await session.execute(
+                select(ContentModel.id)
+                .where(
+                    ContentModel.author_id.in_(list(followed_authors)),
+                    ContentModel.created_at >= since,
+                )
+                .order_by(ContentModel.created_at.desc())
+                .limit(limit)
+            )
+            return list(result.scalars())
+
+    async def _liked_similar(self, user_id, user_vector, followed_authors, limit):
+        liked = await self.features.recent_likes(user_id)
+        vectors = self.index.get_vectors(liked)
+        if not vectors:
+            return []
+        per_item = max(limit // len(vectors), 1)
+        seen, ids = set(liked), []
+        for vector in vectors:
+            for content_id, _ in self.index.search(vector, k=per_item + len(liked)):
+                if content_id not in seen:
+                    seen.add(content_id)
+                    ids.append(content_id)
+        return ids[:limit]
+
+    async def _trending(self, user_id, user_vector, followed_authors, limit):
+        return await self.features.trending(limit)
+
+    async def _recent(self, user_id, user_vector, followed_authors, limit):
+        async with async_session() as session:
+            result = await session.execute(
+                select(ContentModel.id).order_by(ContentModel.created_at.desc()).limit(limit)
+            )
+            return list(result.scalars())
+
+    # ----------------------------------------------------
+    # Orquestração
+    # ----------------------------------------------------
+    async def _run(self, name, user_id, user_vector, followed_authors, limit):
+        source = getattr(self, f"_{name}")
+        try:
+            ids = await asyncio.wait_for(source(user_id, user_vector, followed_authors, limit), self.budget)
+        except asyncio.TimeoutError:
+            print(f"⚠️ [THALAMUS] Fonte '{name}' estourou o orçamento ({self.budget * 1000:.0f}ms).")
+            return []
+        except Exception as e:
+            print(f"⚠️ [THALAMUS] Fonte '{name}' falhou ({e}).")
+            return []
+        return ids
+
+    async def generate(self, session, user_id, user_vector=None, followed_authors=(), limit: int = 500, quotas=None):
+        """Candidatos hidratados do banco, prontos para o Thalamus/SARA. `quotas` escolhe as fontes."""
+        quotas = quotas or SOURCE_QUOTAS
+        names = list(quotas)
+        results = await asyncio.gather(*[
+            self._run(name, user_id, user_vector, followed_authors, quotas[name])
+            for name in names
+        ])
+
+        # Deduplicação: a primeira fonte (na ordem de prioridade) fica como "source"
+        sources = {}
+        for name, ids in zip(names, results):
+            for content_id in ids:
+                sources.setdefault(str(content_id), []).append(name)
+        ids = list(sources)[:limit]
+
+        rows = await ContentRepository(session).get_by_ids(ids)
+        candidates = [
+            {
+                "id": o.id,
+                "tags": o.tags,
+                "safety": o.safety_label,
+                "author_id": o.author_id,
+                "embedding": o.embedding,
+                "created_at": o.created_at.timestamp() if o.created_at else 0.0,
+                "source": sources[o.id][0],
+                "sources": sources[o.id],
+            }
+            for o in rows
+        ]
+        # Mantém a ordem de prioridade das fontes (o IN do banco não garante ordem)
+        position = {content_id: i for i, content_id in enumerate(ids)}
+        candidates.sort(key=lambda c: position[c["id"]])
+        return candidates
+
+candidate_generator = CandidateGenerator()
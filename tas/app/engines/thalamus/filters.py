@@ -1,30 +1,152 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+ILLEGAL_TAGS = ("cp", "terrorism_action")  # Hard rules do sistema: nunca passam
+RULES_CACHE_SIZE = 10_000
+VOCABULARY_MAX = 200_000   # Tags, autores ou padrões distintos antes de recomeçar do zero
+
+class Vocabulary:
+    """Interna strings (tags, autores) em IDs inteiros estáveis dentro do processo."""
+    def __init__(self):
+        self._ids = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def id(self, value):
+        return self._ids.setdefault(value, len(self._ids))
+
+    def ids(self, values):
+        return [self.id(v) for v in values]
+
 class ThalamusFilter:
     """
     Porteiro Soberano: Aplica a lei (hard rules) e a vontade do utilizador.
+
+    As tags de cada candidato viram um bitset (uint64 x palavras); a lei e a lista
+    negra do utilizador viram uma máscara compilada (e cacheada) no mesmo formato.
+    O veto do lote inteiro é uma única operação NumPy: (bitsets & máscara).any().
+
+    Vocabulários e padrões são limitados (VOCABULARY_MAX): ao passar
+    do teto tudo é zerado e reinternado sob demanda, então a memória não cresce sem fim.
+    O pipeline do feed roda o filtro em threads: um lock protege os vocabulários.
     """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.tags = Vocabulary()
+        self.authors = Vocabulary()
+        self._patterns = {}                # tupla de tags -> índice do padrão (muitos posts repetem combinações)
+        self._pattern_bits = np.zeros((0, 1), dtype=np.uint64)  # Linhas = padrões (capacidade dobra), colunas = palavras
+        self._rules = OrderedDict()        # (tags bloqueadas, autores bloqueados) -> regras compiladas
+        self._illegal_ids = self.tags.ids(ILLEGAL_TAGS)
+
+    def _words(self):
+        return max((len(self.tags) + 63) // 64, 1)
+
+    def _mask(self, tag_ids, words):
+        mask = np.zeros(words, dtype=np.uint64)
+        for tag_id in tag_ids:
+            mask[tag_id >> 6] |= np.uint64(1) << np.uint64(tag_id & 63)
+        return mask
+
+    def _grow_pattern_bits(self, rows):
+        """Garante capacidade para `rows` padrões e colunas para todas as tags já internadas."""
+        bits = self._pattern_bits
+        words = self._words()
+        if bits.shape[0] >= rows and bits.shape[1] >= words:
+            return
+        grown = np.zeros((max(rows, 2 * bits.shape[0], 64), max(words, bits.shape[1])), dtype=np.uint64)
+        grown[:bits.shape[0], :bits.shape[1]] = bits
+        self._pattern_bits = grown
+
+    def _add_patterns(self, first, pattern_tags):
+        """Escreve só as linhas dos padrões novos (sem refazer a matriz inteira)."""
+        self._grow_pattern_bits(first + len(pattern_tags))
+        rows = [first + i for i, ids in enumerate(pattern_tags) for _ in ids]
+        ids = np.asarray([t for ids in pattern_tags for t in ids], dtype=np.uint64)
+        if len(ids):
+            np.bitwise_or.at(
+                self._pattern_bits,
+                (np.asarray(rows, dtype=np.intp), (ids >> np.uint64(6)).astype(np.intp)),
+                np.uint64(1) << (ids & np.uint64(63)),
+            )
+
+    def tag_bitsets(self, candidates):
+        """
+        Bitsets de tags do lote: (índice do padrão de cada candidato, matriz padrões x palavras).
+        A linha do candidato i é bits[patterns[i]]; a matriz tem colunas para todas as tags internadas.
+        """
+        patterns = np.empty(len(candidates), dtype=np.intp)
+        first = len(self._patterns)
+        new_tags = []
+        for i, c in enumerate(candidates):
+            key = tuple(c.get("tags") or ())
+            pattern = self._patterns.get(key)
+            if pattern is None:
+                pattern = self._patterns[key] = first + len(new_tags)
+                new_tags.append(self.tags.ids(key))
+            patterns[i] = pattern
+        if new_tags:
+            self._add_patterns(first, new_tags)
+        # Tags novas (da lista negra ou dos padrões) podem pedir mais uma palavra
+        self._grow_pattern_bits(len(self._patterns))
+        return patterns, self._pattern_bits[:len(self._patterns)]
+
+    def compile_rules(self, user_profile=None):
+        """Máscara de tags (lei + lista negra) e IDs dos autores bloqueados, com cache LRU."""
+        b_tags = tuple(sorted(user_profile.get("blacklisted_tags") or ())) if user_profile else ()
+        b_authors = tuple(sorted(map(str, user_profile.get("blacklisted_authors") or ()))) if user_profile else ()
+        key = (b_tags, b_authors)
+
+        rules = self._rules.get(key)
+        if rules is None:
+            tag_ids = self._illegal_ids + self.tags.ids(b_tags)
+            author_ids = np.asarray(self.authors.ids(b_authors), dtype=np.int64)
+            rules = self._rules[key] = (tag_ids, author_ids)
+            if len(self._rules) > RULES_CACHE_SIZE:
+                self._rules.popitem(last=False)
+        else:
+            self._rules.move_to_end(key)
+        return rules
+
+    def allowed(self, request, candidates, user_profile=None):
+        """Máscara booleana dos candidatos que passam pelo Thalamus."""
+        if not candidates:
+            return np.zeros(0, dtype=bool)
+        with self._lock:
+            return self._allowed(request, candidates, user_profile)
+
+    def _allowed(self, request, candidates, user_profile):
+        if max(len(self.tags), len(self.authors), len(self._patterns)) > VOCABULARY_MAX:
+            self._reset()
+        tag_ids, blocked_authors = self.compile_rules(user_profile)
+        patterns, bits = self.tag_bitsets(candidates)
+        # Depois de internar tudo: a matriz já tem uma coluna para cada palavra da máscara
+        mask = self._mask(tag_ids, bits.shape[1])
+
+        # 1 + 2. Soberania (tags bloqueadas) e Lei, num único AND vetorizado (só nas palavras da máscara)
+        words = np.flatnonzero(mask)
+        blocked = (bits[:, words] & mask[words]).any(axis=1)
+        keep = ~blocked[patterns]
+
+        # 1. Autores bloqueados
+        if len(blocked_authors):
+            authors = np.asarray(self.authors.ids(str(c.get("author_id")) for c in candidates), dtype=np.int64)
+            keep &= ~np.isin(authors, blocked_authors)
+
+        # 3. Filtro de Contexto (Bird vs Outros)
+        if request.context == "STUDY":
+            keep &= np.array([c.get("safety") == "safe" for c in candidates], dtype=bool)
+        return keep
+
+    def apply_sync(self, request, candidates, user_profile=None):
+        """Só CPU: o pipeline do feed roda esta versão numa thread, com prazo."""
+        keep = self.allowed(request, candidates, user_profile)
+        return [c for c, ok in zip(candidates, keep) if ok]
+
     async def apply(self, request, candidates, user_profile=None):
-        clean_list = []
-        
-        # Regras de Bloqueio do Utilizador
-        b_tags = set(user_profile.get("blacklisted_tags", [])) if user_profile else set()
-        b_authors = set(user_profile.get("blacklisted_authors", [])) if user_profile else set()
-
-        for c in candidates:
-            # 1. Filtro de Bloqueio (Soberania)
-            if c.get("author_id") in b_authors:
-                continue
-            if any(tag in b_tags for tag in c.get("tags", [])):
-                continue
-                
-            # 2. Filtro Legal (Hard Rules do Sistema)
-            illegal = ["cp", "terrorism_action"]
-            if any(tag in illegal for tag in c.get("tags", [])):
-                continue
-
-            # 3. Filtro de Contexto (Bird vs Outros)
-            if request.context == "STUDY" and c.get("safety") != "safe":
-                continue
-
-            clean_list.append(c)
-            
-        return clean_list
\ No newline at end of file
+        return self.apply_sync(request, candidates, user_profile)
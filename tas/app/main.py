@@ -1,6 +1,10 @@
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from app.api.v1.api import api_router
+from app.services.index_service import index_service
+from app.services.event_log import event_log
+from app.services.profile_cache import profile_cache
+from app.db.session import pool_status, query_stats
 import traceback
 
 app = FastAPI(title="TAS Engine")
@@ -11,6 +15,23 @@ async def global_exception_handler(request: Request, exc: Exception):
     traceback.print_exc()
     return JSONResponse(status_code=500, content={"detail": str(exc), "trace": "Verifique o terminal"})
 
+@app.on_event("startup")
+async def start_engines():
+    await index_service.warm()
+    event_log.start()
+    profile_cache.start()
+
+@app.on_event("shutdown")
+async def stop_engines():
+    await index_service.stop()
+    await event_log.stop()
+    await profile_cache.stop()
+
 app.include_router(api_router, prefix="/api/v1")
 @app.get("/health")
-async def health(): return {"status": "online"}
\ No newline at end of file
+async def health(): return {"status": "online"}
+
+@app.get("/health/db")
+async def health_db():
+    """Pool de conexões e tempos de SQL amostrados deste worker."""
+    return {"pool": pool_status(), "queries": query_stats.summary()}
\ No newline at end of file
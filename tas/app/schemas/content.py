@@ -0,0 +1,21 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class ContentIngest(BaseModel):
+    """Item de ingestão (Bird, vídeo, artigo...). Aceita `title` ou `text`."""
+    content_id: Optional[str] = None
+    title: Optional[str] = None
+    text: Optional[str] = None
+    tags: list[str] = Field(default_factory=list)
+    author_id: Optional[str] = None
+    safety_label: str = "safe"
+    metadata: dict = Field(default_factory=dict)
+
+    @property
+    def body(self) -> str:
+        return self.title or self.text or ""
+
+class IngestResult(BaseModel):
+    content_id: Optional[str] = None
+    status: str  # 'ok' | 'error'
+    error: Optional[str] = None
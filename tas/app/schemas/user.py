@@ -3,5 +3,5 @@ from pydantic import BaseModel
 class UserEvent(BaseModel):
     user_id: str
     content_id: str
-    event_type: str  # 'click', 'like', 'share', 'watch_time'
+    event_type: str  # 'impression', 'click', 'like', 'share', 'watch_time'
     value: float = 1.0
\ No newline at end of file
@@ -0,0 +1,72 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from app.db.base_events import EngagementWindowModel, ProcessedEventModel
+
+WINDOW_SECONDS = 60
+COUNTERS = ("clicks", "likes", "comments", "shares", "watch_time")
+COUNTER_BY_EVENT = {
+    "click": "clicks",
+    "like": "likes",
+    "comment": "comments",
+    "share": "shares",
+    "watch_time": "watch_time",
+}
+
+def aggregate(events, window: int = WINDOW_SECONDS):
+    """
+    Soma os eventos em janelas fixas por conteúdo e por usuário.
+    Retorna {(entity_type, entity_id, window_start): {contador: valor}}.
+    """
+    windows = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for event in events:
+        counter = COUNTER_BY_EVENT.get(event.get("event_type"))
+        if counter is None:
+            continue
+        start = datetime.fromtimestamp(int(event["ts"] // window) * window, tz=timezone.utc)
+        amount = float(event.get("value", 1.0)) if counter == "watch_time" else 1
+        windows[("content", str(event["content_id"]), start)][counter] += amount
+        windows[("user", str(event["user_id"]), start)][counter] += amount
+    return windows
+
+async def claim(session, entry_ids):
+    """
+    Marca as entradas do log como processadas (sem commit) e devolve as que ainda não
+    tinham sido: só elas entram no `persist`, que confirma as duas coisas juntas.
+    """
+    if not entry_ids:
+        return set()
+    stmt = (
+        insert(ProcessedEventModel)
+        .values([{"entry_id": str(entry_id)} for entry_id in entry_ids])
+        .on_conflict_do_nothing(index_elements=[ProcessedEventModel.entry_id])
+        .returning(ProcessedEventModel.entry_id)
+    )
+    return set((await session.execute(stmt)).scalars())
+
+async def purge_processed(session, older_than: timedelta):
+    """Esquece as entradas antigas (o stream já foi aparado ou confirmado bem antes disso)."""
+    cutoff = datetime.now(timezone.utc) - older_than
+    result = await session.execute(delete(ProcessedEventModel).where(ProcessedEventModel.processed_at < cutoff))
+    await session.commit()
+    return result.rowcount
+
+async def persist(session, windows):
+    """Um único upsert somando os contadores às janelas já gravadas (e o commit do `claim`)."""
+    if not windows:
+        await session.commit()
+        return 0
+    rows = [
+        {"entity_type": entity_type, "entity_id": entity_id, "window_start": start, **counters}
+        for (entity_type, entity_id, start), counters in windows.items()
+    ]
+    table = EngagementWindowModel.__table__
+    stmt = insert(EngagementWindowModel).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.entity_type, table.c.entity_id, table.c.window_start],
+        set_={name: table.c[name] + stmt.excluded[name] for name in COUNTERS},
+    )
+    await session.execute(stmt)
+    await session.commit()
+    return len(rows)
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import os
+import redis.asyncio as redis
+
+REDIS_URL = os.getenv("REDIS_URL")
+EVENT_STREAM = os.getenv("EVENT_STREAM", "tas:events")
+DEAD_LETTER_STREAM = os.getenv("EVENT_DEAD_LETTER_STREAM", f"{EVENT_STREAM}:dead")
+EVENT_STREAM_MAXLEN = 5_000_000     # Teto aproximado do stream (XADD MAXLEN ~)
+EVENT_LOG_PATH = os.getenv("EVENT_LOG_PATH", "data/events.log")
+CONSUMER_GROUP = "tas-aggregator"
+
+APPEND_FLUSH_SECONDS = 0.05  # O endpoint só enfileira; a escrita no log é em lote
+APPEND_FLUSH_BATCH = 500
+APPEND_BUFFER_MAX = 100_000  # Acima disso (log fora) os eventos mais antigos são descartados
+
+class BufferedAppender:
+    """
+    `append` só coloca na fila do processo (microssegundos, nada de I/O no event loop);
+    um flusher em segundo plano grava o lote com `_write`. Se a escrita falhar, o
+    lote volta para a fila e é tentado de novo; passando de APPEND_BUFFER_MAX, os
+    mais antigos são descartados, com aviso no log e contados em `stats()`.
+    """
+    errors = (Exception,)   # Falhas de escrita que mantêm os eventos na fila
+
+    def __init__(self):
+        self._buffer = []
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.dropped = 0         # Total descartado por estouro da fila desde o start
+        self._dropping = False   # Avisa uma vez por episódio, não a cada request
+
+    async def _write(self, events):
+        raise NotImplementedError
+
+    def _trim(self):
+        overflow = len(self._buffer) - APPEND_BUFFER_MAX
+        if overflow <= 0:
+            return
+        del self._buffer[:overflow]
+        self.dropped += overflow
+        if not self._dropping:
+            self._dropping = True
+            print(f"⚠️ [EVENTS] Fila cheia ({APPEND_BUFFER_MAX} eventos) com o log fora. Descartando os mais antigos.")
+
+    def stats(self):
+        return {"buffered": len(self._buffer), "dropped": self.dropped}
+
+    def append(self, events):
+        self._buffer.extend(events)
+        self._trim()
+        if len(self._buffer) >= APPEND_FLUSH_BATCH:
+            self._wakeup.set()
+
+    async def flush(self):
+        if not self._buffer:
+            return 0
+        events, self._buffer = self._buffer, []
+        try:
+            await self._write(events)
+        except self.errors:
+            self._buffer = events + self._buffer
+            self._trim()
+            raise
+        if self._dropping:
+            self._dropping = False
+            print(f"✅ [EVENTS] Log de volta. {self.dropped} eventos descartados no total.")
+        return len(events)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), APPEND_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except self.errors as e:
+                print(f"⚠️ [EVENTS] Log indisponível ({e}). {len(self._buffer)} eventos em espera.")
+                await asyncio.sleep(1)
+
+    def start(self):
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except self.errors as e:
+            print(f"⚠️ [EVENTS] {len(self._buffer)} eventos perdidos no shutdown ({e}).")
+
+class RedisEventLog(BufferedAppender):
+    """
+    Log de eventos em um Redis Stream; o flusher manda cada lote num pipeline de XADDs.
+    Leitura por consumer group: cada evento vai para um consumidor e só sai da
+    lista de pendentes depois do XACK (entrega at-least-once).
+    """
+    errors = (redis.RedisError,)
+
+    def __init__(self, url=REDIS_URL, stream=EVENT_STREAM, group=CONSUMER_GROUP):
+        super().__init__()
+        self.redis = redis.Redis.from_url(url, socket_timeout=2, decode_responses=True)
+        self.stream = stream
+        self.group = group
+
+    async def _write(self, events):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.xadd(self.stream, {"e": json.dumps(event)}, maxlen=EVENT_STREAM_MAXLEN, approximate=True)
+            await pipe.execute()
+
+    # ----------------------------------------------------
+    # Consumo
+    # ----------------------------------------------------
+    async def ensure_group(self):
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(self, consumer, count=1000, block_ms=1000):
+        """Lote de (id, evento): primeiro os pendentes deste consumidor (crash anterior), depois novos."""
+        for start in ("0", ">"):
+            response = await self.redis.xreadgroup(
+                self.group, consumer, {self.stream: start},
+                count=count, block=None if start == "0" else block_ms,
+            )
+            entries = response[0][1] if response else []
+            if entries:
+                # Entradas já aparadas pelo MAXLEN voltam sem campos: só são confirmadas
+                return [(entry_id, json.loads(fields["e"]) if fields else None) for entry_id, fields in entries]
+        return []
+
+    async def ack(self, ids):
+        if ids:
+            await self.redis.xack(self.stream, self.group, *ids)
+
+    async def dead_letter(self, entries, reason):
+        """Move um lote que sempre falha para o DEAD_LETTER_STREAM e confirma, liberando o consumidor."""
+        if not entries:
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for entry_id, event in entries:
+                pipe.xadd(DEAD_LETTER_STREAM, {"id": entry_id, "e": json.dumps(event), "error": reason})
+            pipe.xack(self.stream, self.group, *[entry_id for entry_id, _ in entries])
+            await pipe.execute()
+
+class LocalEventLog(BufferedAppender):
+    """
+    Log append-only em arquivo NDJSON, para desenvolvimento e testes (sem Redis).
+    A escrita no arquivo roda numa thread, fora do event loop.
+    Um único consumidor; a posição lida fica em `<arquivo>.offset`.
+    """
+    errors = (OSError,)
+
+    def __init__(self, path=EVENT_LOG_PATH):
+        super().__init__()
+        self.path = path
+        self.offset_path = f"{path}.offset"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _append_lines(self, events):
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(event) + "\n" for event in events))
+
+    async def _write(self, events):
+        await asyncio.to_thread(self._append_lines, events)
+
+    async def ensure_group(self):
+        pass
+
+    def _offset(self):
+        try:
+            with open(self.offset_path) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    async def read(self, consumer, count=1000, block_ms=1000):
+        entries = []
+        try:
+            with open(self.path) as f:
+                f.seek(self._offset())
+                while len(entries) < count:
+                    line = f.readline()
+                    if not line.endswith("\n"):
+                        break  # Linha ainda sendo escrita
+                    entries.append((f.tell(), json.loads(line)))
+        except FileNotFoundError:
+            pass
+        if not entries:
+            await asyncio.sleep(block_ms / 1000)
+        return entries
+
+    async def ack(self, ids):
+        if ids:
+            with open(self.offset_path, "w") as f:
+                f.write(str(max(ids)))
+
+    async def dead_letter(self, entries, reason):
+        if not entries:
+            return
+        with open(f"{self.path}.dead", "a") as f:
+            f.write("".join(json.dumps({"id": entry_id, "e": event, "error": reason}) + "\n" for entry_id, event in entries))
+        await self.ack([entry_id for entry_id, _ in entries])
+
+event_log = RedisEventLog() if REDIS_URL else LocalEventLog()
@@ -0,0 +1,133 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from sqlalchemy import select
+from app.db.base import ContentModel, EMBEDDING_DIM
+from app.db.base_user import UserVectorModel
+from app.db.session import async_session
+from app.engines.sara.encoders import normalize
+from app.services.feed_store import feed_store
+
+ACTIVE_DAYS = 3          # Usuários com interação nesse período ganham feed pré-calculado
+CONTENT_DAYS = 30        # Conteúdo elegível para o feed
+FEED_SIZE = 300
+USER_BLOCK = 256         # Usuários por tarefa do pool
+CONTENT_BLOCK = 16_384   # Colunas por multiplicação (USER_BLOCK x CONTENT_BLOCK float32 = 16 MB)
+FETCH_CHUNK = 5000
+
+_content = None  # Matriz de conteúdo (mmap) de cada processo do pool
+
+def _init_worker(path):
+    global _content
+    _content = np.load(path, mmap_mode="r")
+
+def score_block(users, k: int = FEED_SIZE, content=None):
+    """
+    Top-k (índices, scores) de cada usuário do bloco contra a matriz de conteúdo inteira.
+    Percorre o conteúdo em blocos: uma multiplicação de matrizes por bloco, top-k do bloco
+    por argpartition e fusão com o top-k acumulado (memória fixa, independe do catálogo).
+    """
+    content = _content if content is None else content
+    k = min(k, len(content))
+    best_idx = np.empty((len(users), 0), dtype=np.int64)
+    best = np.empty((len(users), 0), dtype=np.float32)
+    for start in range(0, len(content), CONTENT_BLOCK):
+        scores = users @ content[start:start + CONTENT_BLOCK].T
+        idx = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+        if scores.shape[1] > k:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores, idx = np.take_along_axis(scores, part, 1), np.take_along_axis(idx, part, 1)
+        best, best_idx = np.concatenate([best, scores], axis=1), np.concatenate([best_idx, idx], axis=1)
+        if best.shape[1] > k:
+            part = np.argpartition(-best, k - 1, axis=1)[:, :k]
+            best, best_idx = np.take_along_axis(best, part, 1), np.take_along_axis(best_idx, part, 1)
+    order = np.argsort(-best, axis=1, kind="stable")
+    return np.take_along_axis(best_idx, order, 1), np.take_along_axis(best, order, 1)
+
+async def load_content(days: int = CONTENT_DAYS):
+    """Conteúdo recente com embedding: ids, metadados do Thalamus e matriz normalizada."""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    stmt = (
+        select(ContentModel.id, ContentModel.embedding, ContentModel.author_id, ContentModel.tags, ContentModel.safety_label)
+        .where(ContentModel.embedding.is_not(None), ContentModel.created_at >= since)
+        .execution_options(yield_per=FETCH_CHUNK)
+    )
+    ids, meta, vectors = [], [], []
+    async with async_session() as session:
+        result = await session.stream(stmt)
+        async for rows in result.partitions(FETCH_CHUNK):
+            ids.extend(r.id for r in rows)
+            meta.extend((r.author_id, r.tags or [], r.safety_label) for r in rows)
+            vectors.append(np.asarray([r.embedding for r in rows], dtype=np.float32))
+    matrix = normalize(np.concatenate(vectors)) if vectors else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+    return ids, meta, matrix
+
+async def load_active_users(days: int = ACTIVE_DAYS):
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    stmt = (
+        select(UserVectorModel.user_id, UserVectorModel.embedding)
+        .where(UserVectorModel.embedding.is_not(None), UserVectorModel.updated_at >= since)
+        .execution_options(yield_per=FETCH_CHUNK)
+    )
+    users, vectors = [], []
+    async with async_session() as session:
+        result = await session.stream(stmt)
+        async for rows in result.partitions(FETCH_CHUNK):
+            users.extend(r.user_id for r in rows)
+            vectors.append(np.asarray([r.embedding for r in rows], dtype=np.float32))
+    matrix = normalize(np.concatenate(vectors)) if vectors else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+    return users, matrix
+
+async def precompute_feeds(workers: int = None, active_days: int = ACTIVE_DAYS,
+                           content_days: int = CONTENT_DAYS, feed_size: int = FEED_SIZE):
+    """
+    Calcula e grava no feed_store o feed (top `feed_size` da SARA) de cada usuário ativo.
+    Retorna (usuários, conteúdos, segundos).
+    """
+    started = time.perf_counter()
+    computed_at = time.time()
+    ids, meta, content = await load_content(content_days)
+    users, user_matrix = await load_active_users(active_days)
+    if not ids or not users:
+        return 0, len(ids), time.perf_counter() - started
+
+    workers = workers or os.cpu_count() or 1
+    # Um processo por núcleo: o BLAS de cada um fica com uma thread (sem disputa de CPU)
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, "1")
+
+    def to_feeds(start, idx, scores):
+        return {
+            users[start + row]: [
+                [ids[j], round(float(s), 4), *meta[j]]
+                for j, s in zip(idx[row], scores[row])
+            ]
+            for row in range(len(idx))
+        }
+
+    loop = asyncio.get_running_loop()
+    with tempfile.TemporaryDirectory() as tmp:
+        # A matriz vai para o disco uma vez e cada processo a abre com mmap (páginas compartilhadas)
+        path = os.path.join(tmp, "content.npy")
+        np.save(path, content)
+        with ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(path,),
+        ) as pool:
+            pending = {}
+            for start in range(0, len(users), USER_BLOCK):
+                task = loop.run_in_executor(pool, score_block, user_matrix[start:start + USER_BLOCK], feed_size)
+                pending[task] = start
+                # Limita o que fica em voo (memória) e grava os feeds à medida que ficam prontos
+                while len(pending) >= 2 * workers or (start + USER_BLOCK >= len(users) and pending):
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        idx, scores = task.result()
+                        await feed_store.put_many(to_feeds(pending.pop(task), idx, scores), computed_at)
+
+    return len(users), len(ids), time.perf_counter() - started
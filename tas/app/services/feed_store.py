@@ -0,0 +1,58 @@
+import json
+import os
+import time
+import redis.asyncio as redis
+from app.core.redis_client import get_redis
+
+FEED_TTL = 12 * 3600                                            # A chave some sozinha se o job parar
+FEED_MAX_AGE = float(os.getenv("FEED_MAX_AGE_SECONDS", "7200"))  # Mais velho que isso: pipeline completo
+
+class FeedStore:
+    """
+    Feeds pré-calculados pelo job offline (scripts/precompute_feeds.py), um JSON por
+    usuário em `tas:feed:<user_id>`: quando foi calculado e os itens já ordenados
+    pela SARA, com o que o Thalamus precisa (autor, tags, safety) para filtrar online
+    sem ir ao banco. Sem Redis o store fica desligado e tudo vai pelo pipeline online.
+    """
+    def __init__(self, redis_client=None, max_age: float = FEED_MAX_AGE):
+        self._redis = redis_client
+        self.max_age = max_age
+
+    @property
+    def redis(self):
+        return self._redis or get_redis()
+
+    @staticmethod
+    def _key(user_id):
+        return f"tas:feed:{user_id}"
+
+    async def get(self, user_id):
+        """{"computed_at", "items": [{id, sara_score, author_id, tags, safety}]} ou None (ausente/velho)."""
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(self._key(user_id))
+        except redis.RedisError as e:
+            print(f"⚠️ [FEED] Store de feeds offline ({e}). Pipeline completo.")
+            return None
+        if raw is None:
+            return None
+        feed = json.loads(raw)
+        if time.time() - feed["computed_at"] > self.max_age:
+            return None
+        feed["items"] = [
+            {"id": content_id, "sara_score": score, "author_id": author_id, "tags": tags, "safety": safety}
+            for content_id, score, author_id, tags, safety in feed["items"]
+        ]
+        return feed
+
+    async def put_many(self, feeds, computed_at: float = None):
+        """Grava vários feeds num pipeline. `feeds`: {user_id: [(id, score, author_id, tags, safety), ...]}."""
+        computed_at = computed_at or time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for user_id, items in feeds.items():
+                pipe.set(self._key(user_id), json.dumps({"computed_at": computed_at, "items": items}), ex=FEED_TTL)
+            await pipe.execute()
+        return len(feeds)
+
+feed_store = FeedStore()
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import select
+from app.db.base import ContentModel
+from app.db.session import async_session
+from app.engines.sara.ann_index import AnnIndex, ann_index
+
+SARA_INDEX_DIR = os.getenv("SARA_INDEX_DIR", "data/sara_index")
+SARA_INDEX_REFRESH_SECONDS = int(os.getenv("SARA_INDEX_REFRESH_SECONDS", "60"))
+FETCH_CHUNK = 5000
+WATERMARK_OVERLAP = 5.0  # Segundos relidos a cada catch-up (commits atrasados); o upsert é idempotente
+
+class IndexService:
+    """
+    Mantém o índice ANN do SARA em cada worker:
+    snapshot (scripts/build_sara_index.py) + conteúdos criados ou reingeridos depois dele
+    (por updated_at), lidos do banco a cada SARA_INDEX_REFRESH_SECONDS. A ingestão feita pelo próprio worker entra na hora.
+    """
+    def __init__(self, index=ann_index, path=SARA_INDEX_DIR):
+        self.index = index
+        self.path = path
+        self._task = None
+
+    async def _fetch(self, since: float = 0.0):
+        """Gera lotes (ids, vetores, maior updated_at) em streaming, em ordem de atualização."""
+        stmt = (
+            select(ContentModel.id, ContentModel.embedding, ContentModel.updated_at)
+            .where(ContentModel.embedding.is_not(None))
+            .order_by(ContentModel.updated_at, ContentModel.id)
+            .execution_options(yield_per=FETCH_CHUNK)
+        )
+        if since:
+            since = max(since - WATERMARK_OVERLAP, 0)
+            stmt = stmt.where(ContentModel.updated_at > datetime.fromtimestamp(since, tz=timezone.utc))
+
+        async with async_session() as session:
+            result = await session.stream(stmt)
+            async for rows in result.partitions(FETCH_CHUNK):
+                ids = [r.id for r in rows]
+                vectors = np.asarray([r.embedding for r in rows], dtype=np.float32)
+                yield ids, vectors, rows[-1].updated_at.timestamp()
+
+    async def catch_up(self):
+        added = 0
+        async for ids, vectors, newest in self._fetch(self.index.watermark):
+            self.index.upsert(ids, vectors, watermark=newest)
+            added += len(ids)
+        return added
+
+    async def _load_snapshot(self):
+        """Monta o snapshot numa thread e troca o índice de uma vez, já no event loop."""
+        fresh = await asyncio.to_thread(AnnIndex.read, self.path, self.index.dim)
+        if fresh is None:
+            return False
+        self.index.swap(fresh)
+        return True
+
+    async def warm(self):
+        """Startup do worker: carrega o snapshot (mmap) e lê o que entrou depois dele."""
+        try:
+            loaded = await self._load_snapshot()
+            added = await self.catch_up()
+            origin = f"snapshot {self.index.version}" if loaded else "banco (sem snapshot)"
+            print(f"✅ [SARA] Índice ANN pronto: {len(self.index)} itens ({origin}, +{added} recentes).")
+        except Exception as e:
+            print(f"⚠️ [SARA] Índice ANN indisponível ({e}). Usando candidatos recentes.")
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(SARA_INDEX_REFRESH_SECONDS)
+            try:
+                if self.index.current_version(self.path) not in (None, self.index.version):
+                    await self._load_snapshot()
+                await self.catch_up()
+            except Exception as e:
+                print(f"⚠️ [SARA] Falha ao atualizar o índice ANN ({e}).")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def rebuild(self):
+        """Reconstrói o índice inteiro a partir do banco e grava um novo snapshot."""
+        ids, vectors, newest = [], [], 0.0
+        async for chunk_ids, chunk_vectors, chunk_newest in self._fetch():
+            ids.extend(chunk_ids)
+            vectors.append(chunk_vectors)
+            newest = chunk_newest
+        matrix = np.concatenate(vectors) if vectors else np.empty((0, self.index.dim), dtype=np.float32)
+
+        started = time.perf_counter()
+        self.index.build(ids, matrix, watermark=newest)
+        os.makedirs(self.path, exist_ok=True)
+        version = self.index.save(self.path)
+        return version, len(ids), time.perf_counter() - started
+
+index_service = IndexService()
@@ -0,0 +1,73 @@
+import asyncio
+import uuid
+from pydantic import ValidationError
+from app.schemas.content import ContentIngest
+from app.engines.sara.encoders import sara_encoder
+from app.db.repositories.content_repository import ContentRepository
+from app.engines.sara.ann_index import ann_index
+
+INGEST_BATCH_SIZE = 500  # Itens por passada do encoder + INSERT multi-linha
+
+class IngestionService:
+    """
+    Ingestão em lote: valida cada item, gera todos os embeddings em uma única
+    chamada do SaraEncoder e grava o lote com um único INSERT (upsert).
+    """
+    async def ingest_batch(self, session, raw_items: list) -> list:
+        results = [None] * len(raw_items)
+        valid = []  # (posição, item)
+
+        # 1. Validação item a item (um item ruim não derruba o lote)
+        for pos, raw in enumerate(raw_items):
+            try:
+                item = ContentIngest.model_validate(raw)
+            except ValidationError as e:
+                content_id = raw.get("content_id") if isinstance(raw, dict) else None
+                results[pos] = {"content_id": content_id, "status": "error", "error": e.errors()[0]["msg"]}
+                continue
+            if not item.content_id:
+                item.content_id = uuid.uuid4().hex
+            valid.append((pos, item))
+
+        if not valid:
+            return results
+
+        # 2. SARA: todos os textos em uma passada do modelo (fora do event loop)
+        embeddings = await asyncio.to_thread(sara_encoder.encode_batch, [item.body for _, item in valid])
+
+        # IDs repetidos no mesmo lote: vale o último (o upsert não aceita a mesma linha duas vezes)
+        rows = {
+            item.content_id: {
+                "id": item.content_id,
+                "title": item.body,
+                "tags": item.tags,
+                "safety_label": item.safety_label,
+                "author_id": item.author_id,
+                "embedding": embedding,
+            }
+            for (_, item), embedding in zip(valid, embeddings)
+        }
+        rows = list(rows.values())
+
+        # 3. Um único INSERT para o lote inteiro
+        try:
+            await ContentRepository(session).bulk_upsert(rows)
+            status, error = "ok", None
+            # Entra no índice ANN deste worker na hora; os demais pegam no próximo refresh
+            ann_index.upsert([r["id"] for r in rows], [r["embedding"] for r in rows])
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ [INGEST] Falha no lote de {len(rows)} itens: {e}")
+            status, error = "error", str(e)[:200]
+
+        for pos, item in valid:
+            results[pos] = {"content_id": item.content_id, "status": status, "error": error}
+        return results
+
+    async def ingest(self, session, raw_items: list) -> list:
+        results = []
+        for start in range(0, len(raw_items), INGEST_BATCH_SIZE):
+            results.extend(await self.ingest_batch(session, raw_items[start:start + INGEST_BATCH_SIZE]))
+        return results
+
+ingestion_service = IngestionService()
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+STATS_WINDOW = 1000  # Últimas execuções usadas nos percentis
+
+class PipelineRun:
+    """
+    Uma execução do pipeline (um request). Cada etapa roda com o prazo que declarou,
+    limitado pelo que ainda resta do orçamento total; se estourar ou falhar, devolve
+    o `fallback` e fica registrada como degradada, e quem chamou decide entregar o
+    melhor resultado parcial que já tem.
+
+    Etapas de CPU devem rodar fora do event loop (asyncio.to_thread): é o que deixa o
+    prazo valer mesmo com a CPU saturada, em vez de esperar o cálculo terminar.
+    """
+    def __init__(self, deadlines, budget: float):
+        self.deadlines = deadlines
+        self.budget = budget
+        self.started = time.perf_counter()
+        self.timings = {}
+        self.degraded = {}   # etapa -> motivo ("timeout" ou a exceção)
+
+    def remaining(self) -> float:
+        return self.budget - (time.perf_counter() - self.started)
+
+    async def stage(self, name, fn, *args, fallback=None, **kwargs):
+        deadline = min(self.deadlines[name], self.remaining())
+        started = time.perf_counter()
+        try:
+            if deadline <= 0:
+                raise asyncio.TimeoutError
+            return await asyncio.wait_for(fn(*args, **kwargs), deadline)
+        except asyncio.TimeoutError:
+            self.degraded[name] = "timeout"
+            print(f"⚠️ [PIPELINE] Etapa '{name}' estourou o prazo ({deadline * 1000:.0f}ms). Resultado parcial.")
+            return fallback
+        except Exception as e:
+            self.degraded[name] = str(e) or type(e).__name__
+            print(f"⚠️ [PIPELINE] Etapa '{name}' falhou ({e}). Resultado parcial.")
+            return fallback
+        finally:
+            self.timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def trace(self):
+        return {
+            "stages_ms": self.timings,
+            "degraded": self.degraded,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+        }
+
+class PipelineStats:
+    """Agregado por worker: degradações por etapa e percentis de latência das últimas execuções."""
+    def __init__(self, window: int = STATS_WINDOW):
+        self.requests = 0
+        self.degraded = {}
+        self._totals = deque(maxlen=window)
+        self._stages = {}
+
+    def record(self, run: PipelineRun):
+        trace = run.trace()
+        self.requests += 1
+        for name in run.degraded:
+            self.degraded[name] = self.degraded.get(name, 0) + 1
+        self._totals.append(trace["total_ms"])
+        for name, ms in run.timings.items():
+            self._stages.setdefault(name, deque(maxlen=self._totals.maxlen)).append(ms)
+        return trace
+
+    @staticmethod
+    def _percentiles(values):
+        if not values:
+            return {"p50": 0.0, "p99": 0.0}
+        p50, p99 = np.percentile(np.fromiter(values, dtype=np.float64), [50, 99])
+        return {"p50": round(float(p50), 2), "p99": round(float(p99), 2)}
+
+    def summary(self):
+        return {
+            "requests": self.requests,
+            "degraded": self.degraded,
+            "total_ms": self._percentiles(self._totals),
+            "stages_ms": {name: self._percentiles(values) for name, values in self._stages.items()},
+        }
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+import redis.asyncio as redis
+from app.core.redis_client import get_redis
+from app.db.repositories.profile_repository import ProfileRepository
+
+PROFILE_LOCAL_SIZE = 100_000
+PROFILE_LOCAL_TTL = 60.0          # Rede de segurança caso uma invalidação por pub/sub se perca
+PROFILE_REDIS_TTL = 86400
+INVALIDATION_CHANNEL = "tas:profile:invalidate"
+_MISSING = object()
+
+class ProfileCache:
+    """
+    Cache das regras de soberania (UserProfileModel) em dois níveis:
+    LRU no processo -> Redis (compartilhado entre workers) -> banco.
+
+    O update_profile grava direto no cache (write-through) e publica o user_id em
+    INVALIDATION_CHANNEL; cada worker escuta o canal e descarta a cópia local, então
+    um bloqueio novo vale em todos os workers em milissegundos.
+    """
+    def __init__(self, redis_client=None):
+        self._redis = redis_client
+        self._local = OrderedDict()   # user_id -> (perfil ou None, guardado_em)
+        self._task = None
+
+    @property
+    def redis(self):
+        return self._redis or get_redis()
+
+    @staticmethod
+    def _key(user_id):
+        return f"tas:profile:{user_id}"
+
+    def _remember(self, user_id, profile):
+        self._local[user_id] = (profile, time.monotonic())
+        self._local.move_to_end(user_id)
+        if len(self._local) > PROFILE_LOCAL_SIZE:
+            self._local.popitem(last=False)
+
+    def evict(self, user_id):
+        self._local.pop(str(user_id), None)
+
+    async def get(self, session, user_id):
+        """Perfil do utilizador (dict) ou None; no caminho quente é só um dict lookup."""
+        user_id = str(user_id)
+        cached = self._local.get(user_id)
+        if cached and time.monotonic() - cached[1] < PROFILE_LOCAL_TTL:
+            return cached[0]
+
+        profile = _MISSING
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(self._key(user_id))
+                if raw is not None:
+                    profile = json.loads(raw)
+            except redis.RedisError as e:
+                print(f"⚠️ [THALAMUS] Cache de perfis offline ({e}). Lendo do banco.")
+
+        if profile is _MISSING:
+            profile = await ProfileRepository(session).get_profile(user_id)
+            await self._store(user_id, profile)
+        self._remember(user_id, profile)
+        return profile
+
+    async def _store(self, user_id, profile):
+        if self.redis is None:
+            return
+        try:
+            # Perfil inexistente também é cacheado ("null"), para não ir ao banco a cada feed
+            await self.redis.set(self._key(user_id), json.dumps(profile), ex=PROFILE_REDIS_TTL)
+        except redis.RedisError:
+            pass
+
+    async def put(self, user_id, profile):
+        """Write-through do update_profile: grava nos dois níveis e avisa os outros workers."""
+        user_id = str(user_id)
+        self._remember(user_id, profile)
+        if self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(self._key(user_id), json.dumps(profile), ex=PROFILE_REDIS_TTL)
+                pipe.publish(INVALIDATION_CHANNEL, user_id)
+                await pipe.execute()
+        except redis.RedisError as e:
+            print(f"⚠️ [THALAMUS] Perfil {user_id} não propagado aos workers ({e}).")
+
+    # ----------------------------------------------------
+    # Invalidação entre workers (pub/sub)
+    # ----------------------------------------------------
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Mensagens perdidas enquanto estava desconectado: começa do zero
+                self._local.clear()
+                async for message in pubsub.listen():
+                    data = message.get("data")
+                    self.evict(data.decode() if isinstance(data, bytes) else data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ [THALAMUS] Invalidação de perfis desconectada ({e}). Reconectando...")
+                await asyncio.sleep(1)
+
+    def start(self):
+        if self.redis is not None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+profile_cache = ProfileCache()
@@ -1,28 +1,118 @@
+import asyncio
+import os
 from app.engines.thalamus.filters import ThalamusFilter
 from app.engines.sara.vector_search import SaraEngine
 from app.engines.accumbens.ranker import AccumbensRanker
-from app.db.repositories.content_repository import ContentRepository
+from app.engines.thalamus.candidate_gen import candidate_generator
+from app.engines.sara.ann_index import ann_index
+from app.services.feed_store import feed_store
+from app.services.profile_cache import profile_cache
 from app.db.session import async_session
+from app.services.user_vector_service import user_vector_service
+from app.services.pipeline import PipelineRun, PipelineStats
+
+CANDIDATE_LIMIT = 500
+SARA_TOP_K = 200  # Só os mais afins seguem para o Accumbens
+FRESH_QUOTAS = {"followed": 50, "trending": 50, "recent": 50}  # O que é novo desde o feed pré-calculado
+
+# Orçamento do /recommend/ inteiro (abaixo do TAS_DEADLINE do Django) e prazo de cada etapa
+FEED_BUDGET = float(os.getenv("FEED_BUDGET_SECONDS", "0.6"))
+STAGE_DEADLINES = {
+    "context": 0.10,      # Perfil (Thalamus) + vetor de interesse
+    "candidates": 0.20,   # Fontes em paralelo (cada uma já com SOURCE_BUDGET) + hidratação
+    "thalamus": 0.05,
+    "sara": 0.10,
+    "accumbens": 0.10,
+}
 
 class RecommendationService:
     def __init__(self):
         self.thalamus = ThalamusFilter()
         self.sara = SaraEngine()
         self.accumbens = AccumbensRanker()
+        self.stats = PipelineStats()
+
+    async def get_feed(self, request, user_vector=None):
+        """
+        {"items": IDs ordenados, "scores": score de cada item (ou None),
+         "pipeline": tempos e degradações da execução}.
 
-    async def get_feed(self, request):
+        Cada etapa tem prazo (STAGE_DEADLINES). Se a SARA ou o Accumbens estourarem,
+        o feed sai com a melhor ordem parcial: filtrada pelo Thalamus, por recência
+        (ou na ordem da SARA, se só o Accumbens falhou). Sem o Thalamus nada é entregue.
+        """
+        run = PipelineRun(STAGE_DEADLINES, FEED_BUDGET)
+        # A sessão só vive enquanto há leituras no banco; o resto do pipeline é CPU/Redis
         async with async_session() as session:
-            repo = ContentRepository(session)
-            # Busca candidatos reais do banco
-            raw_objects = await repo.get_candidates()
-            raw_data = [{"id": o.id, "tags": o.tags, "safety": o.safety_label} for o in raw_objects]
-            
-            # Se o banco estiver vazio, usa um fallback para teste
-            if not raw_data:
-                raw_data = [{"id": "test_1", "tags": ["politics"], "safety": "safe"}]
-
-            clean = await self.thalamus.apply(request, raw_data)
-            aligned = await self.sara.align(request.user_id, clean)
-            return await self.accumbens.rank(aligned)
+            context = await run.stage("context", self._context, session, request.user_id, user_vector)
+            if context is None:
+                return self._finish(run, [])
+            user_profile, user_vector = context
+            followed = user_profile["followed_authors"] if user_profile else []
+            raw_data = await run.stage(
+                "candidates", self._candidates, session, request.user_id, user_vector, followed, fallback=[],
+            )
+
+        if not raw_data:
+            if "candidates" in run.degraded:
+                return self._finish(run, [])  # Etapa estourou: o Django cai no fallback dele
+            # Banco vazio de verdade: usa um fallback para teste
+            raw_data = [{"id": "test_1", "tags": ["politics"], "safety": "safe"}]
+
+        clean = await run.stage("thalamus", asyncio.to_thread, self.thalamus.apply_sync, request, raw_data, user_profile)
+        if clean is None:
+            return self._finish(run, [])
+        recency = sorted(clean, key=lambda c: c.get("created_at", 0.0), reverse=True)
+
+        aligned = await run.stage(
+            "sara", asyncio.to_thread, self.sara.align_sync,
+            request.user_id, clean, user_vector=user_vector, top_k=SARA_TOP_K,
+        )
+        if aligned is None:
+            return self._finish(run, [c["id"] for c in recency])
+
+        # rank lê o Redis no loop e faz a conta numa thread (to_thread dentro dele)
+        ranked = await run.stage(
+            "accumbens", self.accumbens.rank, aligned, user_id=request.user_id, context=request.context,
+        )
+        if ranked is None:
+            return self._finish(run, [c["id"] for c in aligned], [c["sara_score"] for c in aligned])
+        by_id = {str(c["id"]): c for c in aligned}
+        return self._finish(run, ranked, [by_id[content_id]["final_score"] for content_id in ranked])
+
+    async def _context(self, session, user_id, user_vector):
+        user_profile = await profile_cache.get(session, user_id)
+        if user_vector is None:
+            # Interesse aprendido dos eventos do /events/track
+            user_vector = await user_vector_service.get(session, user_id)
+        return user_profile, user_vector
+
+    def _finish(self, run, ids, scores=None):
+        return {"items": ids, "scores": scores, "pipeline": self.stats.record(run)}
+
+    async def _candidates(self, session, user_id, user_vector, followed):
+        feed = await feed_store.get(user_id)
+        if feed is None:
+            # Candidatos de várias fontes em paralelo (ANN, seguidos, curtidas, trending, recentes)
+            return await candidate_generator.generate(
+                session, user_id, user_vector=user_vector,
+                followed_authors=followed, limit=CANDIDATE_LIMIT,
+            )
+
+        # Feed pré-calculado (scripts/precompute_feeds.py): só busca o que é novo e junta
+        fresh = await candidate_generator.generate(
+            session, user_id, user_vector=user_vector,
+            followed_authors=followed, limit=CANDIDATE_LIMIT, quotas=FRESH_QUOTAS,
+        )
+        fresh_ids = {c["id"] for c in fresh}
+        stored = [c for c in feed["items"] if c["id"] not in fresh_ids]
+        # Vetores do índice em memória: a SARA reavalia tudo com o vetor de interesse atual.
+        # Quem não está no índice segue sem embedding e a SARA usa o sara_score gravado
+        matrix, missing = ann_index.vectors_for([c["id"] for c in stored])
+        for c, vector, absent in zip(stored, matrix, missing):
+            c["source"] = "precomputed"
+            if not absent:
+                c["embedding"] = vector
+        return stored + fresh
 
 recommendation_service = RecommendationService()
\ No newline at end of file
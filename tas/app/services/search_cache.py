@@ -0,0 +1,110 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+import numpy as np
+import redis.asyncio as redis
+from app.core.redis_client import get_redis
+from app.db.base import EMBEDDING_DIM
+
+SEARCH_LOCAL_SIZE = 5_000
+SEARCH_TTL = 30.0           # Segundos: resultados "frescos o bastante" para buscas populares
+BUCKET_BITS = 64            # Hiperplanos do SimHash que definem o balde do embedding
+
+class SearchCache:
+    """
+    Cache de resultados do /search (nível 2; o nível 1, texto -> embedding, é o
+    cache do SaraEncoder).
+
+    A chave é (balde do embedding, contexto, limite): o balde é o SimHash do vetor,
+    então a mesma consulta com outra caixa/espaços ou um embedding praticamente
+    idêntico cai na mesma entrada. Guarda os candidatos crus, ANTES do Thalamus:
+    o filtro de cada utilizador é aplicado depois do hit, então o cache é
+    compartilhado por todos. LRU no processo -> Redis -> banco.
+    """
+    def __init__(self, redis_client=None, dim: int = EMBEDDING_DIM, ttl: float = SEARCH_TTL):
+        self._redis = redis_client
+        self.ttl = ttl
+        # Hiperplanos fixos (semente constante): todos os workers calculam o mesmo balde
+        self._planes = np.random.default_rng(20).standard_normal((BUCKET_BITS, dim)).astype(np.float32)
+        self._local = OrderedDict()   # chave -> (candidatos, guardado_em)
+        self._inflight = {}           # chave -> Future (uma só busca por chave em andamento)
+        # coalesced: esperou a busca de outra requisição; não é acerto de cache
+        self.stats = {"local": 0, "redis": 0, "coalesced": 0, "miss": 0}
+
+    @property
+    def redis(self):
+        return self._redis or get_redis()
+
+    def bucket(self, vector) -> str:
+        bits = (self._planes @ np.asarray(vector, dtype=np.float32)) > 0
+        return np.packbits(bits).tobytes().hex()
+
+    def key(self, vector, context, limit) -> str:
+        return f"tas:search:{self.bucket(vector)}:{context}:{limit}"
+
+    def _remember(self, key, candidates):
+        self._local[key] = (candidates, time.monotonic())
+        self._local.move_to_end(key)
+        if len(self._local) > SEARCH_LOCAL_SIZE:
+            self._local.popitem(last=False)
+
+    async def get_or_search(self, vector, context, limit, search):
+        """
+        Candidatos crus do cache ou, no miss, de `search()` (corrotina que vai ao banco).
+        Requisições simultâneas para a mesma chave esperam a mesma busca.
+        """
+        key = self.key(vector, context, limit)
+        cached = self._local.get(key)
+        if cached and time.monotonic() - cached[1] < self.ttl:
+            self.stats["local"] += 1
+            return cached[0]
+
+        if key in self._inflight:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            candidates = await self._fetch(key, search)
+            future.set_result(candidates)
+            return candidates
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Marca como lida: ninguém esperando não é erro
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _fetch(self, key, search):
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(key)
+                if raw is not None:
+                    candidates = json.loads(raw)
+                    self.stats["redis"] += 1
+                    self._remember(key, candidates)
+                    return candidates
+            except redis.RedisError as e:
+                print(f"⚠️ [SEARCH] Cache de buscas offline ({e}). Indo ao banco.")
+
+        self.stats["miss"] += 1
+        candidates = await search()
+        self._remember(key, candidates)
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, json.dumps(candidates), ex=max(int(self.ttl), 1))
+            except redis.RedisError:
+                pass
+        return candidates
+
+    def hit_rates(self):
+        total = sum(self.stats.values())
+        return {
+            **self.stats,
+            "total": total,
+            "hit_rate": (self.stats["local"] + self.stats["redis"]) / total if total else 0.0,
+        }
+
+search_cache = SearchCache()
@@ -0,0 +1,133 @@
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from app.db.base import ContentModel
+from app.db.base_user import UserVectorModel
+from app.db.session import async_session
+from app.engines.accumbens.scoring_math import DopamineWeights
+from app.engines.sara.ann_index import ann_index
+from app.engines.sara.interest import update_interest
+
+USER_VECTOR_BATCH = 1000       # Teto da fila (x10) quando o flush falha
+USER_VECTOR_CACHE_SIZE = 50_000
+USER_VECTOR_CACHE_TTL = 30.0   # Outros workers também atualizam o vetor
+
+class UserVectorService:
+    """
+    Vetores de interesse aprendidos online a partir do /events/track.
+    O scripts/event_consumer.py registra cada lote do log (`record`) e chama `flush`,
+    que aplica tudo em uma transação: um SELECT ... FOR UPDATE dos usuários do lote e
+    um único upsert, então vários consumidores não se sobrescrevem. A API só lê (`get`).
+    """
+    def __init__(self, index=ann_index):
+        self.index = index
+        self._pending = []
+        self._cache = OrderedDict()   # user_id -> (vetor, lido_em)
+
+    # ----------------------------------------------------
+    # Escrita (micro-lotes)
+    # ----------------------------------------------------
+    def record(self, user_id, content_id, event_type, value: float = 1.0):
+        weight = DopamineWeights.for_event(event_type, value)
+        if weight <= 0:
+            return
+        self._pending.append((str(user_id), str(content_id), weight))
+
+    async def _content_vectors(self, session, content_ids):
+        vectors = {}
+        missing = []
+        for content_id in content_ids:
+            found = self.index.get_vectors([content_id])
+            if found:
+                vectors[content_id] = found[0]
+            else:
+                missing.append(content_id)
+        if missing:
+            result = await session.execute(
+                select(ContentModel.id, ContentModel.embedding).where(ContentModel.id.in_(missing))
+            )
+            for content_id, embedding in result:
+                if embedding is not None:
+                    vectors[content_id] = embedding
+        return vectors
+
+    async def flush(self):
+        if not self._pending:
+            return 0
+        events, self._pending = self._pending, []
+        try:
+            return await self._apply(events)
+        except Exception:
+            # Devolve o lote à fila (limitada) para a próxima rodada
+            self._pending = (events + self._pending)[-USER_VECTOR_BATCH * 10:]
+            raise
+
+    async def _apply(self, events):
+        async with async_session() as session:
+            vectors = await self._content_vectors(session, {content_id for _, content_id, _ in events})
+            by_user = defaultdict(lambda: ([], []))
+            for user_id, content_id, weight in events:
+                if content_id in vectors:
+                    by_user[user_id][0].append(vectors[content_id])
+                    by_user[user_id][1].append(weight)
+            if not by_user:
+                return 0
+
+            result = await session.execute(
+                select(UserVectorModel)
+                .where(UserVectorModel.user_id.in_(list(by_user)))
+                .with_for_update()
+            )
+            current = {row.user_id: row for row in result.scalars()}
+
+            now = datetime.now(timezone.utc)
+            rows = []
+            for user_id, (content_vectors, weights) in by_user.items():
+                row = current.get(user_id)
+                mean, weight, elapsed = None, 0.0, 0.0
+                if row is not None and row.embedding is not None:
+                    mean, weight = row.embedding, row.weight
+                    elapsed = (now - row.updated_at).total_seconds() if row.updated_at else 0.0
+                mean, weight = update_interest(mean, weight, elapsed, content_vectors, weights)
+                rows.append({"user_id": user_id, "embedding": mean, "weight": weight, "updated_at": now})
+
+            stmt = insert(UserVectorModel).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserVectorModel.user_id],
+                set_={
+                    "embedding": stmt.excluded.embedding,
+                    "weight": stmt.excluded.weight,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+        for row in rows:
+            self._remember(row["user_id"], row["embedding"])
+        return len(rows)
+
+    # ----------------------------------------------------
+    # Leitura
+    # ----------------------------------------------------
+    def _remember(self, user_id, vector):
+        self._cache[user_id] = (vector, time.monotonic())
+        self._cache.move_to_end(user_id)
+        if len(self._cache) > USER_VECTOR_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def get(self, session, user_id):
+        """Vetor de interesse do usuário, ou None se ele ainda não interagiu com nada."""
+        user_id = str(user_id)
+        cached = self._cache.get(user_id)
+        if cached and time.monotonic() - cached[1] < USER_VECTOR_CACHE_TTL:
+            return cached[0]
+        row = await session.get(UserVectorModel, user_id)
+        vector = np.asarray(row.embedding, dtype=np.float32) if row is not None and row.embedding is not None else None
+        self._remember(user_id, vector)
+        return vector
+
+user_vector_service = UserVectorService()
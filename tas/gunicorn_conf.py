@@ -1,11 +1,27 @@
 import multiprocessing
+import os
 
 # Configurações de Performance para Produção
 bind = "0.0.0.0:8000"
-workers = multiprocessing.cpu_count() * 2 + 1  # Escalabilidade baseada no CPU
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))  # Escalabilidade baseada no CPU
+# O pool de conexões de cada worker é DB_MAX_CONNECTIONS / WEB_CONCURRENCY (app/db/session.py)
+os.environ["WEB_CONCURRENCY"] = str(workers)
 worker_class = "uvicorn.workers.UvicornWorker"
 timeout = 120
 keepalive = 5
 loglevel = "info"
 errorlog = "-"
-accesslog = "-"
\ No newline at end of file
+accesslog = "-"
+
+# O modelo da SARA é carregado uma vez no master; os workers herdam a memória
+# por copy-on-write no fork em vez de cada um carregar a sua cópia
+preload_app = True
+
+def on_starting(server):
+    from app.engines.sara.encoders import sara_encoder
+    sara_encoder.preload()
+
+def post_fork(server, worker):
+    # Conexões herdadas do master não podem ser usadas por dois processos
+    from app.db.session import engine
+    engine.sync_engine.dispose(close=False)
@@ -0,0 +1,15 @@
+import asyncio
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.index_service import index_service
+
+async def build():
+    print(f"⏳ [SARA] Reconstruindo índice ANN em {index_service.path}...")
+    version, total, elapsed = await index_service.rebuild()
+    print(f"✅ [SARA] Snapshot {version}: {total} itens indexados em {elapsed:.1f}s.")
+
+if __name__ == "__main__":
+    asyncio.run(build())
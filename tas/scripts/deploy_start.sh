@@ -11,6 +11,10 @@ echo "🗄️ Sincronizando Schema no Supabase..."
 python scripts/init_db.py
 python scripts/sync_user_db.py
 
-# 3. Inicia o Gunicorn (O Servidor Industrial)
+# 3. Snapshot do índice ANN (os workers carregam no startup)
+echo "🧭 Gerando snapshot do índice SARA..."
+python scripts/build_sara_index.py
+
+# 4. Inicia o Gunicorn (O Servidor Industrial)
 echo "🔥 TAS Online. Gerindo conexões via Gunicorn..."
 exec gunicorn -c gunicorn_conf.py app.main:app
\ No newline at end of file
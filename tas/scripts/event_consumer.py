@@ -0,0 +1,102 @@
+"""
+Consumidor do log de eventos do /events/track.
+
+Lê lotes do Redis Stream (ou do log local), soma em janelas de
+engajamento por conteúdo/usuário, grava tudo em um upsert, atualiza os
+contadores decaídos do Accumbens, o filtro de vistos e os vetores de
+interesse, e só então confirma (XACK) o lote.
+
+Idempotente: os ids das entradas são gravados (processed_events) na mesma
+transação do upsert, e uma reentrega só processa o que ainda não entrou.
+Um lote que falha EVENT_MAX_ATTEMPTS vezes vai para o stream de dead-letter
+(tas:events:dead) em vez de travar o consumidor.
+
+Uso: python scripts/event_consumer.py [--consumer nome] [--batch 1000]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import async_session
+from app.engines.accumbens.feature_store import feature_store
+from app.engines.accumbens.impressions import impression_filter
+from app.services.event_aggregator import aggregate, claim, persist, purge_processed
+from app.services.event_log import event_log
+from app.services.user_vector_service import user_vector_service
+
+EVENT_MAX_ATTEMPTS = int(os.getenv("EVENT_MAX_ATTEMPTS", "5"))
+PROCESSED_RETENTION = timedelta(days=7)   # Bem mais que o tempo de vida de um pendente
+PURGE_SECONDS = 3600
+
+async def consume(consumer, batch_size):
+    await event_log.ensure_group()
+    print(f"🎧 [EVENTS] Consumidor '{consumer}' ouvindo...")
+    failures = {}        # primeira entrada do lote -> tentativas que falharam
+    purged_at = 0.0
+    while True:
+        batch = await event_log.read(consumer, count=batch_size)
+        if not batch:
+            continue
+        started = time.perf_counter()
+
+        try:
+            async with async_session() as session:
+                # Só as entradas ainda não processadas (reentrega depois de um crash no meio do lote)
+                fresh = await claim(session, [entry_id for entry_id, event in batch if event])
+                events = [event for entry_id, event in batch if event and str(entry_id) in fresh]
+                windows = await persist(session, aggregate(events))
+        except Exception as e:
+            key = batch[0][0]
+            failures[key] = failures.get(key, 0) + 1
+            if failures[key] >= EVENT_MAX_ATTEMPTS:
+                del failures[key]
+                await event_log.dead_letter(batch, str(e) or type(e).__name__)
+                print(f"❌ [EVENTS] Lote de {len(batch)} eventos falhou {EVENT_MAX_ATTEMPTS}x ({e}). Movido para o dead-letter.")
+                continue
+            # Sem XACK: o lote volta como pendente na próxima leitura
+            print(f"⚠️ [EVENTS] Falha ao gravar janelas ({e}). Tentativa {failures[key]}/{EVENT_MAX_ATTEMPTS}.")
+            await asyncio.sleep(failures[key])
+            continue
+        failures.clear()
+
+        if time.monotonic() - purged_at > PURGE_SECONDS:
+            purged_at = time.monotonic()
+            try:
+                async with async_session() as session:
+                    await purge_processed(session, PROCESSED_RETENTION)
+            except Exception as e:
+                print(f"⚠️ [EVENTS] Limpeza de processed_events adiada ({e}).")
+
+        try:
+            # Contadores decaídos do Accumbens + itens exibidos (impression) ou com interação contam como vistos
+            await feature_store.add(events)
+            seen = {}
+            for event in events:
+                seen.setdefault(event["user_id"], set()).add(event["content_id"])
+            for user_id, content_ids in seen.items():
+                await impression_filter.add(user_id, list(content_ids))
+        except Exception as e:
+            print(f"⚠️ [ACCUMBENS] Features não atualizadas ({e}).")
+
+        for event in events:
+            user_vector_service.record(event["user_id"], event["content_id"], event["event_type"], event.get("value", 1.0))
+        try:
+            await user_vector_service.flush()
+        except Exception as e:
+            print(f"⚠️ [SARA] Vetores de interesse adiados ({e}).")
+
+        await event_log.ack([entry_id for entry_id, _ in batch])
+        print(f"✅ [EVENTS] {len(events)} eventos -> {windows} janelas em {(time.perf_counter() - started) * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--consumer", default=socket.gethostname())
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(consume(args.consumer, args.batch))
@@ -5,13 +5,41 @@ import os
 # Adiciona a raiz do projeto ao sys.path para evitar ModuleNotFoundError
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import text
 from app.db.base import Base
+import app.db.base_events # Janelas de engajamento (event_consumer)
 from app.db.session import engine
 
 async def init_models():
     print("⏳ [SUPABASE] Criando tabelas...")
     async with engine.begin() as conn:
+        # pgvector precisa existir antes da coluna contents.embedding (vector)
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         await conn.run_sync(Base.metadata.create_all)
+        # create_all não cria índices novos em tabelas que já existem
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS contents_author_recent_idx ON contents (author_id, created_at DESC)"
+        ))
+        # Nem colunas novas: updated_at (watermark do catch-up do índice ANN) parte do created_at
+        await conn.execute(text("ALTER TABLE contents ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ"))
+        await conn.execute(text("UPDATE contents SET updated_at = created_at WHERE updated_at IS NULL"))
+        await conn.execute(text("ALTER TABLE contents ALTER COLUMN updated_at SET DEFAULT now()"))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS contents_updated_idx ON contents (updated_at)"
+        ))
+        # Índice ANN: sem ele o /search volta a varrer a tabela. Bases antigas com
+        # embedding em JSON passam antes pelo migrate_embeddings_to_vector.
+        embedding_type = await conn.scalar(text(
+            "SELECT udt_name FROM information_schema.columns "
+            "WHERE table_name = 'contents' AND column_name = 'embedding'"
+        ))
+        if embedding_type == "vector":
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS contents_embedding_hnsw_idx ON contents "
+                "USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+            ))
+        else:
+            print("⚠️ [SUPABASE] contents.embedding ainda não é vector: rode scripts/migrate_embeddings_to_vector.py.")
     print("✅ [SUPABASE] Tabelas sincronizadas com sucesso!")
 
 if __name__ == "__main__":
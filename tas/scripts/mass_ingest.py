@@ -1,7 +1,7 @@
 import requests
-import time
 
 BASE_URL = "http://127.0.0.1:8000/api/v1/events/ingest"
+BATCH_SIZE = 500  # Itens por POST (o TAS gera os embeddings do lote de uma vez)
 
 TEST_DATA = [
     {"title": "Operação Policial: Realidade nua e crua", "tags": ["real_life", "police"], "author_id": "rep_01", "safety_label": "restricted"},
@@ -10,19 +10,24 @@ TEST_DATA = [
     {"title": "IA e Automação de Sistemas", "tags": ["tech", "coding"], "author_id": "dev_master", "safety_label": "safe"}
 ]
 
-def run():
-    print("📥 Injetando dados de teste...")
-    for item in TEST_DATA:
+def run(items=TEST_DATA):
+    print(f"📥 Injetando {len(items)} itens em lotes de {BATCH_SIZE}...")
+    session = requests.Session()  # Keep-alive entre os lotes
+    for start in range(0, len(items), BATCH_SIZE):
+        batch = items[start:start + BATCH_SIZE]
         try:
-            r = requests.post(BASE_URL, json=item)
-            if r.status_code == 200:
-                print(f"✅ Ingerido: {item['title']}")
-            else:
-                print(f"❌ Erro em '{item['title']}': {r.status_code} - {r.text}")
+            r = session.post(BASE_URL, json=batch, timeout=120)
         except Exception as e:
             print(f"❗ Servidor offline? Erro: {e}")
             break
-        time.sleep(0.3)
+        if r.status_code != 200:
+            print(f"❌ Erro no lote {start // BATCH_SIZE}: {r.status_code} - {r.text}")
+            continue
+        for item, result in zip(batch, r.json()["results"]):
+            if result["status"] == "ok":
+                print(f"✅ Ingerido: {item['title']}")
+            else:
+                print(f"❌ Erro em '{item['title']}': {result['error']}")
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
@@ -0,0 +1,123 @@
+"""
+Migra contents.embedding de JSON para vector(384) (pgvector) com índice HNSW.
+
+Etapas (o script pode ser interrompido e rodado de novo; retoma de onde parou):
+1. CREATE EXTENSION vector + coluna temporária embedding_vec
+2. Converte os JSONs em lotes pequenos (cada lote é uma transação curta)
+3. Troca as colunas (embedding_json fica como backup até o --drop-json)
+4. CREATE INDEX CONCURRENTLY (HNSW, cosseno) sem travar a ingestão
+
+Uso: python scripts/migrate_embeddings_to_vector.py [--chunk-size 2000] [--drop-json]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.base import EMBEDDING_DIM
+from app.db.session import engine
+
+
+async def column_type(conn, column):
+    result = await conn.execute(text("""
+        SELECT udt_name FROM information_schema.columns
+        WHERE table_name = 'contents' AND column_name = :column
+    """), {"column": column})
+    return result.scalar()
+
+
+async def prepare():
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        if await column_type(conn, "embedding") == "vector":
+            return False  # Já migrado
+        await conn.execute(text(
+            f"ALTER TABLE contents ADD COLUMN IF NOT EXISTS embedding_vec vector({EMBEDDING_DIM})"
+        ))
+    return True
+
+
+async def convert(chunk_size):
+    """Converte em lotes por id (keyset); vetores com dimensão errada ficam NULL para reingestão."""
+    converted, skipped, last_id = 0, 0, ""
+    while True:
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            result = await conn.execute(text("""
+                WITH chunk AS (
+                    SELECT id, embedding FROM contents
+                    WHERE id > :last_id AND embedding IS NOT NULL AND embedding_vec IS NULL
+                    ORDER BY id
+                    LIMIT :chunk_size
+                ), updated AS (
+                    UPDATE contents c
+                    SET embedding_vec = (chunk.embedding::text)::vector
+                    FROM chunk
+                    WHERE c.id = chunk.id AND json_array_length(chunk.embedding) = :dim
+                    RETURNING c.id
+                )
+                SELECT (SELECT max(id) FROM chunk), (SELECT count(*) FROM chunk), (SELECT count(*) FROM updated)
+            """), {"last_id": last_id, "chunk_size": chunk_size, "dim": EMBEDDING_DIM})
+            max_id, seen, updated = result.one()
+
+        if not seen:
+            break
+        last_id = max_id
+        converted += updated
+        skipped += seen - updated
+        print(f"🔄 [MIGRATE] {converted} convertidos, {skipped} ignorados (até id={last_id}, {time.perf_counter() - started:.2f}s)")
+
+    return converted, skipped
+
+
+async def swap():
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE contents RENAME COLUMN embedding TO embedding_json"))
+        await conn.execute(text("ALTER TABLE contents RENAME COLUMN embedding_vec TO embedding"))
+
+
+async def build_index():
+    # CONCURRENTLY não roda dentro de transação
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS contents_embedding_hnsw_idx
+            ON contents USING hnsw (embedding vector_cosine_ops)
+            WITH (m = 16, ef_construction = 64)
+        """))
+
+
+async def drop_json():
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE contents DROP COLUMN IF EXISTS embedding_json"))
+
+
+async def main(chunk_size, drop):
+    if await prepare():
+        print("⏳ [MIGRATE] Convertendo embeddings JSON -> vector...")
+        converted, skipped = await convert(chunk_size)
+        await swap()
+        print(f"✅ [MIGRATE] Coluna trocada: {converted} vetores, {skipped} sem dimensão {EMBEDDING_DIM} (reingerir).")
+    else:
+        print("ℹ️ [MIGRATE] contents.embedding já é vector.")
+
+    print("⏳ [MIGRATE] Criando índice HNSW (CONCURRENTLY)...")
+    await build_index()
+    print("✅ [MIGRATE] Índice contents_embedding_hnsw_idx pronto.")
+
+    if drop:
+        await drop_json()
+        print("🗑️ [MIGRATE] Backup embedding_json removido.")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--drop-json", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.chunk_size, args.drop_json))
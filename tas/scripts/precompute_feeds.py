@@ -0,0 +1,37 @@
+"""
+Job offline de feeds: calcula o top da SARA de cada usuário ativo contra o
+conteúdo recente (multiplicações de matrizes em blocos, num pool de processos)
+e grava no store de feeds (Redis). O /recommend/ desses usuários passa a só
+filtrar (Thalamus), juntar conteúdo novo e ordenar (Accumbens).
+
+Rodar antes dos horários de pico (cron), por exemplo a cada hora.
+Uso: python scripts/precompute_feeds.py [--workers N] [--active-days 3] [--content-days 30] [--size 300]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import feed_precompute
+from app.services.feed_store import feed_store
+
+async def run(args):
+    if feed_store.redis is None:
+        print("❌ [FEED] REDIS_URL não configurado: não há onde gravar os feeds.")
+        return
+    print("⏳ [FEED] Pré-calculando feeds dos usuários ativos...")
+    users, contents, elapsed = await feed_precompute.precompute_feeds(
+        workers=args.workers, active_days=args.active_days,
+        content_days=args.content_days, feed_size=args.size,
+    )
+    print(f"✅ [FEED] {users} feeds ({contents} conteúdos elegíveis) em {elapsed:.1f}s.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--active-days", type=int, default=feed_precompute.ACTIVE_DAYS)
+    parser.add_argument("--content-days", type=int, default=feed_precompute.CONTENT_DAYS)
+    parser.add_argument("--size", type=int, default=feed_precompute.FEED_SIZE)
+    asyncio.run(run(parser.parse_args()))
@@ -3,6 +3,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import text
 from app.db.base import Base
 import app.db.base_user # Força o carregamento do modelo de perfil
 from app.db.session import engine
@@ -11,6 +12,10 @@ async def sync():
     print("⏳ [SUPABASE] Criando tabelas de Soberania do Utilizador...")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # Colunas novas em tabelas já existentes
+        await conn.execute(text(
+            "ALTER TABLE user_profiles ADD COLUMN IF NOT EXISTS followed_authors JSON DEFAULT '[]'"
+        ))
     print("✅ [SUPABASE] Tabelas de Utilizador integradas!")
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+import numpy as np
+
+from app.engines.accumbens.diversity import DiversityReranker
+
+def test_caps_relax_instead_of_falling_back_to_score_order():
+    # Todos com a tag 'x'; o autor 'a' tem os 10 primeiros (tetos do feed: autor 3, tag 6)
+    candidates = [
+        {"id": str(i), "author_id": "a" if i < 10 else f"b{i}", "tags": ["x"]}
+        for i in range(30)
+    ]
+    scores = np.linspace(1.0, 0.0, 30)
+
+    order = DiversityReranker().rerank(candidates, scores, "YOURLIFE_FEED").tolist()
+
+    assert sorted(order) == list(range(30))
+    assert order[:6] == [0, 1, 2, 10, 11, 12]
+    # O autor 'a' continua espaçado depois que os tetos estouram, sem bloco 3..9 no meio
+    positions = [order.index(i) for i in range(10)]
+    runs = max(len(run) for run in np.split(positions, np.flatnonzero(np.diff(positions) != 1) + 1))
+    assert runs <= 3
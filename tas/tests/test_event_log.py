@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+
+from app.services import event_log
+from app.services.event_log import BufferedAppender
+
+class FailingLog(BufferedAppender):
+    errors = (OSError,)
+
+    async def _write(self, events):
+        raise OSError("fora do ar")
+
+def test_overflow_is_counted_and_reported(monkeypatch, capsys):
+    monkeypatch.setattr(event_log, "APPEND_BUFFER_MAX", 10)
+    log = FailingLog()
+    log.append([{"n": i} for i in range(8)])
+    with pytest.raises(OSError):
+        asyncio.run(log.flush())
+    log.append([{"n": i} for i in range(8, 15)])
+
+    assert log.stats() == {"buffered": 10, "dropped": 5}
+    assert capsys.readouterr().out.count("Fila cheia") == 1
@@ -0,0 +1,15 @@
+import logging
+
+from app.db.instrumentation import QueryStats
+
+def test_only_slow_queries_are_logged(capsys, caplog):
+    stats = QueryStats(sample_rate=1.0, slow_ms=100)
+    with caplog.at_level(logging.WARNING, logger="app.db.instrumentation"):
+        stats.record("SELECT * FROM contents WHERE id IN ($1, $2)", 5.0)
+        stats.record("SELECT * FROM contents WHERE id IN ($1)", 250.0, 1)
+
+    assert capsys.readouterr().out == ""
+    assert len(caplog.records) == 1
+    summary = stats.summary()
+    assert summary["queries"] == 2 and summary["slow"] == 1
+    assert summary["statements"][0]["samples"] == 2   # Os dois IN viram o mesmo fingerprint
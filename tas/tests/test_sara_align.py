@@ -0,0 +1,20 @@
+import numpy as np
+
+from app.engines.sara.vector_search import NEUTRAL_SCORE, SaraEngine
+
+def test_precomputed_item_missing_from_index_keeps_stored_score():
+    user_vector = np.zeros(384, dtype=np.float32)
+    user_vector[0] = 1.0
+    close = np.zeros(384, dtype=np.float32)
+    close[0] = 0.3
+    close[1] = 1.0
+    candidates = [
+        {"id": "fresh", "embedding": close},
+        {"id": "stored", "sara_score": 0.1},   # Feed pré-calculado, fora do índice
+    ]
+
+    aligned = SaraEngine().align_sync("u", candidates, user_vector=user_vector)
+
+    assert [c["id"] for c in aligned] == ["fresh", "stored"]
+    assert aligned[1]["sara_score"] == np.float32(0.1)
+    assert aligned[1]["sara_score"] != NEUTRAL_SCORE
@@ -0,0 +1,24 @@
+import asyncio
+
+from app.services import search_cache
+from app.services.search_cache import SearchCache
+
+def test_coalesced_requests_are_not_counted_as_hits(monkeypatch):
+    monkeypatch.setattr(search_cache, "get_redis", lambda: None)
+    cache = SearchCache(dim=4)
+    calls = []
+
+    async def search():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return [{"id": "a"}]
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_search([1, 0, 0, 0], "home", 10, search) for _ in range(3)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1 and all(r == [{"id": "a"}] for r in results)
+    rates = cache.hit_rates()
+    assert rates["miss"] == 1 and rates["coalesced"] == 2 and rates["local"] == 0
+    assert rates["hit_rate"] == 0.0
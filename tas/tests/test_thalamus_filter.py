@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+from app.engines.thalamus import filters
+from app.engines.thalamus.filters import ThalamusFilter
+
+FEED = SimpleNamespace(context="YOURLIFE_FEED")
+
+def candidates(n, tag_prefix="t"):
+    return [{"id": str(i), "tags": [f"{tag_prefix}{i}"], "author_id": f"a{i}", "safety": "safe"} for i in range(n)]
+
+def test_blacklisted_tag_interned_after_patterns_gets_a_new_word():
+    # 62 tags + 2 ilegais enchem a primeira palavra; a tag da lista negra cai na segunda
+    thalamus = ThalamusFilter()
+    batch = candidates(62)
+    assert thalamus.allowed(FEED, batch).all()
+
+    profile = {"blacklisted_tags": ["brand_new_tag"], "blacklisted_authors": []}
+    assert thalamus.allowed(FEED, batch, profile).all()
+
+    batch.append({"id": "x", "tags": ["brand_new_tag"], "author_id": "b", "safety": "safe"})
+    keep = thalamus.allowed(FEED, batch, profile)
+    assert keep[:-1].all() and not keep[-1]
+
+def test_new_patterns_keep_earlier_bits():
+    thalamus = ThalamusFilter()
+    profile = {"blacklisted_tags": ["t3", "u70"], "blacklisted_authors": ["a5"]}
+    first = candidates(10)
+    second = candidates(100, tag_prefix="u")
+    assert list(thalamus.allowed(FEED, first, profile)).count(False) == 2
+    assert list(thalamus.allowed(FEED, second, profile)).count(False) == 2
+    assert list(thalamus.allowed(FEED, first, profile)).count(False) == 2
+
+def test_illegal_tags_and_vocabulary_reset(monkeypatch):
+    monkeypatch.setattr(filters, "VOCABULARY_MAX", 50)
+    thalamus = ThalamusFilter()
+    for round_ in range(5):
+        batch = candidates(40, tag_prefix=f"r{round_}_") + [{"id": "bad", "tags": ["cp"], "author_id": "z"}]
+        keep = thalamus.allowed(FEED, batch, {"blacklisted_tags": [], "blacklisted_authors": ["a1"]})
+        assert not keep[-1] and not keep[1] and keep.sum() == 39
+    assert len(thalamus._patterns) <= 2 * 50
@@ -0,0 +1,27 @@
+import struct
+
+from app.core.wire import IDS_MEDIA_TYPE, RANKED_MEDIA_TYPE, binary_response, negotiate, pack_ids
+
+def test_ids_are_int64_little_endian_followed_by_float32_scores():
+    body, count = pack_ids(["7", "9000000000"], [0.5, 0.25])
+
+    assert count == 2
+    assert body == struct.pack("<2q2f", 7, 9000000000, 0.5, 0.25)
+
+def test_non_numeric_ids_drop_their_scores_too():
+    body, count = pack_ids(["1", "test_1", "3"], [0.9, 0.8, 0.7])
+
+    assert count == 2
+    assert body == struct.pack("<2q2f", 1, 3, 0.9, 0.7)
+
+def test_item_count_header_matches_the_body():
+    response = binary_response(RANKED_MEDIA_TYPE, ["1", "x", "2"])   # Sem scores: cai para só IDs
+
+    assert response.media_type == IDS_MEDIA_TYPE
+    assert response.headers["x-item-count"] == "2"
+    assert len(response.body) == 8 * 2
+
+def test_json_stays_the_default():
+    assert negotiate(None) is None
+    assert negotiate("application/json") is None
+    assert negotiate(f"{IDS_MEDIA_TYPE}, application/json;q=0.5") == IDS_MEDIA_TYPE